@@ -1,10 +1,70 @@
 from __future__ import annotations
 import logging
-from typing import List
+import re
+from collections import namedtuple
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+
+TELEGRAM_MESSAGE_MAX_LENGTH = 4096
+RENDERED_MESSAGES_CACHE_SIZE = 128
+VOTES_UP_PATTERN = re.compile(r'↑(\d+)')
+VOTES_DOWN_PATTERN = re.compile(r'↓(\d+)')
+VOTES_SCORE_PATTERN = re.compile(r'([+\-–−]?)(\d+)\s*$')
+VIEWS_PATTERN = re.compile(r'(\d+(?:[.,]\d+)?)\s*([KkMmКкМм]?)\s*$')
+VIEWS_MULTIPLIERS = {'k': 1_000, 'к': 1_000, 'm': 1_000_000, 'м': 1_000_000}
+MARKDOWN_SPECIAL_CHARACTERS_PATTERN = re.compile(r'([_*`\[])')
+
+# details from article page, fetched in background after article is parsed from hub page
+ArticleDetails = namedtuple('ArticleDetails', ['tags', 'reading_time', 'author', 'lead'])
+
+
+def parse_votes(votes: str) -> Tuple[int, int, int]:
+    """
+    Parse habr votes string.
+    Example: "Всего голосов 10: ↑7 и ↓3  +4" -> (4, 7, 3), "Рейтинг  0" -> (0, 0, 0)
+
+    :param votes: votes string from habr page
+    :return: tuple with score, upvotes and downvotes, zeros for unknown format
+    """
+    score_match = VOTES_SCORE_PATTERN.search(votes)
+    if not score_match:
+        logging.warning('Unknown votes format: %s', votes)
+        return 0, 0, 0
+    sign, score = score_match.groups()
+    up_match = VOTES_UP_PATTERN.search(votes)
+    down_match = VOTES_DOWN_PATTERN.search(votes)
+    return (
+        -int(score) if sign and sign != '+' else int(score),
+        int(up_match.group(1)) if up_match else 0,
+        int(down_match.group(1)) if down_match else 0,
+    )
+
+
+def parse_views(views: str) -> int:
+    """
+    Parse habr views string.
+    Example: "Просмотры  8.2K" -> 8200, "Просмотры  379" -> 379
+
+    :param views: views string from habr page
+    :return: views count, zero for unknown format
+    """
+    views_match = VIEWS_PATTERN.search(views)
+    if not views_match:
+        logging.warning('Unknown views format: %s', views)
+        return 0
+    number, suffix = views_match.groups()
+    multiplier = VIEWS_MULTIPLIERS.get(suffix.lower(), 1)
+    return int(round(float(number.replace(',', '.')) * multiplier))
 
 
 class Article:
-    """Class with information about habr articles"""
+    """
+    Immutable class with information about habr articles.
+    Numeric votes and views are parsed once on creation, original strings are kept for messages.
+    """
+
+    __slots__ = ('title', 'link', 'votes', 'views', 'score', 'upvotes', 'downvotes', 'views_count')
 
     def __init__(self, title: str, link: str, votes: str, views: str):
         """
@@ -19,10 +79,16 @@ class Article:
         if not all(isinstance(argument, str) for argument in (title, link, votes, views)):
             logging.critical('One of params are not a string')
             raise ValueError
-        self.title = title
-        self.link = link
-        self.votes = votes
-        self.views = views
+        score, upvotes, downvotes = parse_votes(votes)
+        set_attribute = super().__setattr__
+        set_attribute('title', title)
+        set_attribute('link', link)
+        set_attribute('votes', votes)
+        set_attribute('views', views)
+        set_attribute('score', score)
+        set_attribute('upvotes', upvotes)
+        set_attribute('downvotes', downvotes)
+        set_attribute('views_count', parse_views(views))
 
     @classmethod
     def build_from_list(cls, article_fields: list) -> Article:
@@ -57,11 +123,22 @@ class Article:
         article = cls(article_title, article_link, articles_votes, articles_views)
         return article
 
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{self.__class__.__name__} is immutable')
+
+    def __reduce__(self):
+        return self.__class__, (self.title, self.link, self.votes, self.views)
+
     def __repr__(self):
         _repr = f'{self.__class__.__name__}({self.title}, {self.link}, {self.votes}, {self.views})'
         return _repr
 
     def __eq__(self, other: Article):
+        if not isinstance(other, Article):
+            return NotImplemented
         outcome = (
                 self.title == other.title
                 and self.link == other.link
@@ -70,6 +147,42 @@ class Article:
         )
         return outcome
 
+    def __hash__(self):
+        return hash((self.title, self.link, self.votes, self.views))
+
+
+def escape_markdown(text: str) -> str:
+    """
+    Escape telegram markdown special characters in text from article page.
+
+    :param text: plain text
+    :return: markdown text
+    """
+    return MARKDOWN_SPECIAL_CHARACTERS_PATTERN.sub(r'\\\1', text)
+
+
+def render_article(article: Article, details: Optional[ArticleDetails] = None) -> str:
+    """
+    Render one article for telegram message, details are rendered if provided.
+
+    :param article: article to render
+    :param details: article details, not empty fields are rendered
+    :return: markdown text
+    """
+    article_text = f'[{article.title}]({article.link})\n' \
+                   f'Количество голосов: {article.votes}\n' \
+                   f'Количество просмотров: {article.views}\n'
+    if details is not None:
+        if details.author:
+            article_text += f'Автор: {escape_markdown(details.author)}\n'
+        if details.reading_time:
+            article_text += f'Время чтения: {escape_markdown(details.reading_time)}\n'
+        if details.tags:
+            article_text += f"Теги: {escape_markdown(', '.join(details.tags))}\n"
+        if details.lead:
+            article_text += f'{escape_markdown(details.lead)}\n'
+    return article_text + '\n'
+
 
 def prepare_message_for_telegram(articles_list: List[Article]) -> str:
     """
@@ -85,16 +198,61 @@ def prepare_message_for_telegram(articles_list: List[Article]) -> str:
     if not isinstance(articles_list, list):
         logging.critical('Not string type param provided: %s', articles_list)
         raise ValueError
-    result_message = ''
-    if not articles_list:
-        return result_message
-
-    logging.info('Start prepare message text for telegram')
-    for article in articles_list:
-        message_text = f'[{article.title}]({article.link})\n' \
-                       f'Количество голосов: {article.votes}\n' \
-                       f'Количество просмотров: {article.views}\n\n'
-        result_message += message_text
-    logging.info('Finish prepare message text for telegram')
-
-    return result_message
+    logging.info('Prepare message text for telegram')
+    return ''.join(render_article(article) for article in articles_list)
+
+
+def prepare_messages_for_telegram(
+        articles_list: List[Article],
+        details_list: Optional[List[Optional[ArticleDetails]]] = None,
+        max_length: int = TELEGRAM_MESSAGE_MAX_LENGTH
+) -> List[str]:
+    """
+    Aggregate information from list of articles info into text messages not longer than
+    telegram message length limit. Messages are cached by articles content and details,
+    so the same articles are rendered once and rendered again when their details are fetched.
+
+    :raise ValueError if not list param provided
+    :param articles_list: list with articles
+    :param details_list: details of every article, None for article without details
+    :param max_length: max message length, less than telegram limit if text is added to message
+    :return: list with messages texts, empty list if no articles provided
+    """
+    if not isinstance(articles_list, list):
+        logging.critical('Not list type param provided: %s', articles_list)
+        raise ValueError
+    return list(render_messages(tuple(articles_list), tuple(details_list or ()), max_length))
+
+
+@lru_cache(maxsize=RENDERED_MESSAGES_CACHE_SIZE)
+def render_messages(
+        articles: Tuple[Article, ...],
+        details: Tuple[Optional[ArticleDetails], ...] = (),
+        max_length: int = TELEGRAM_MESSAGE_MAX_LENGTH
+) -> Tuple[str, ...]:
+    """
+    Render articles into messages split by message length limit.
+    Article is never split between messages unless it is longer than limit itself.
+
+    :param articles: tuple with articles, used as cache key
+    :param details: tuple with details of every article or empty tuple, used as cache key
+    :param max_length: max message length
+    :return: tuple with messages texts
+    """
+    logging.info('Render %s articles for telegram', len(articles))
+    messages = []
+    message_parts: List[str] = []
+    message_length = 0
+    for index, article in enumerate(articles):
+        article_text = render_article(article, details[index] if details else None)
+        if message_parts and message_length + len(article_text) > max_length:
+            messages.append(''.join(message_parts))
+            message_parts, message_length = [], 0
+        while len(article_text) > max_length:
+            messages.append(article_text[:max_length])
+            article_text = article_text[max_length:]
+        message_parts.append(article_text)
+        message_length += len(article_text)
+    if message_parts:
+        messages.append(''.join(message_parts))
+    return tuple(messages)
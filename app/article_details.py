@@ -0,0 +1,270 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from bs4 import BeautifulSoup
+
+from app.article import Article, ArticleDetails
+from app.articles_cache import ArticlesCache
+from app.articles_parser import get_habr_page
+from app.helpers import parse_config
+from app.metrics import metrics
+from app.parser_backends import STRAINED_TREE_FEATURES
+from app.rate_limit import TokenBucket
+
+PATH_TO_CONFIG_FILE = 'config.yaml'
+config = parse_config(PATH_TO_CONFIG_FILE)
+
+LEAD_MAX_LENGTH = 200
+MAX_TAGS = 5
+
+
+def get_article_page_html(link: str) -> str:
+    """
+    Get article page HTML. Article pages have their own circuit breaker, so failing
+    article pages do not stop requests of hub pages and search.
+
+    :raises ValueError if not sting param provided,
+    ConnectionError if external service not available
+    :param link: article link
+    :return: HTML page
+    """
+    if not isinstance(link, str):
+        logging.critical('Not string link param provided: %s', link)
+        raise ValueError
+    return get_habr_page(link, breaker_key=f'{urlsplit(link).netloc} articles').text
+
+
+def parse_article_details(html_data: str) -> ArticleDetails:
+    """
+    Parse habr article page, lead is the first paragraph of article. Missing fields are empty.
+    Example: ArticleDetails(("python", "asyncio"), "7 мин", "username", "Первый абзац статьи...")
+
+    :raise ValueError if not string param provided
+    :param html_data: habr article HTML page
+    :return: article tags, reading time, author and lead shortened to LEAD_MAX_LENGTH
+    """
+    if not isinstance(html_data, str):
+        logging.critical('Not string type param provided: %s', html_data)
+        raise ValueError
+    soup = BeautifulSoup(html_data, STRAINED_TREE_FEATURES)
+    tags = tuple(
+        tag_link.get_text(strip=True)
+        for tag_link in soup.find_all('a', attrs={'class': 'tm-tags-list__link'})[:MAX_TAGS]
+    )
+    reading_time = soup.find('span', attrs={'class': 'tm-article-reading-time__label'})
+    author = soup.find('a', attrs={'class': 'tm-user-info__username'})
+    body = soup.find('div', attrs={'id': 'post-content-body'})
+    lead = ''
+    if body is not None:
+        lead_element = body.find('p') or body
+        lead = ' '.join(lead_element.get_text().split())
+        if len(lead) > LEAD_MAX_LENGTH:
+            lead = lead[:LEAD_MAX_LENGTH].rsplit(' ', 1)[0] + '…'
+    return ArticleDetails(
+        tags=tags,
+        reading_time=reading_time.get_text(strip=True) if reading_time is not None else '',
+        author=author.get_text(strip=True) if author is not None else '',
+        lead=lead
+    )
+
+
+class ArticleEnricher:
+    """
+    Fetches article pages in background and caches their details by article link.
+    At most max_concurrent pages are fetched at the same time and at most max_pending
+    pages wait for fetch, requests to one host are limited with token bucket.
+    Listing replies never wait for details, details are shown once they are cached.
+    """
+
+    def __init__(
+            self,
+            fetch_page: Callable[[str], str],
+            max_concurrent: int,
+            max_pending: int,
+            host_rate: float,
+            host_burst: int,
+            ttl: float,
+            max_entries: int,
+            sleep: Callable[[float], None] = time.sleep,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Init cache and worker pool.
+
+        :raise ValueError if max_concurrent, max_pending, host_rate, host_burst, ttl or
+        max_entries is not positive
+        :param fetch_page: function which returns article page HTML by link
+        :param max_concurrent: max number of pages fetched at the same time
+        :param max_pending: max number of pages queued or fetched, new links are skipped over it
+        :param host_rate: requests per second to one host
+        :param host_burst: max burst of requests to one host
+        :param ttl: seconds while cached details are considered fresh
+        :param max_entries: max number of cached details
+        :param sleep: sleep function, used in tests
+        :param clock: monotonic time function of rate limits, used in tests
+        """
+        if (
+                max_concurrent < 1 or max_pending < 1 or host_rate <= 0 or host_burst < 1
+                or ttl <= 0 or max_entries < 1
+        ):
+            logging.critical('Invalid article enricher params provided')
+            raise ValueError
+        self.fetch_page = fetch_page
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.sleep = sleep
+        self.clock = clock
+        self._cache: ArticlesCache[ArticleDetails] = ArticlesCache(
+            self._load, ttl=ttl, max_entries=max_entries
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent, thread_name_prefix='article-enricher'
+        )
+        self._pending_slots = threading.BoundedSemaphore(max_pending)
+        self._pending_links = set()
+        self._host_buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._counters = {'scheduled': 0, 'skipped': 0, 'fetched': 0, 'failed': 0}
+        self._fetches = 0
+        self._total_fetch_time = 0.0
+        self._max_fetch_time = 0.0
+
+    @classmethod
+    def from_config(cls, enrichment_config: dict, fetch_page: Callable[[str], str]):
+        """
+        Create new enricher from "enrichment" section of config.yaml.
+
+        :param enrichment_config: dict with max_concurrent, max_pending, host_rate, host_burst,
+        ttl_seconds and max_entries
+        :param fetch_page: function which returns article page HTML by link
+        :return: new ArticleEnricher() instance
+        """
+        return cls(
+            fetch_page,
+            max_concurrent=enrichment_config['max_concurrent'],
+            max_pending=enrichment_config['max_pending'],
+            host_rate=enrichment_config['host_rate'],
+            host_burst=enrichment_config['host_burst'],
+            ttl=enrichment_config['ttl_seconds'],
+            max_entries=enrichment_config['max_entries']
+        )
+
+    def details(self, link: str) -> Optional[ArticleDetails]:
+        """
+        Get cached details without fetching article page.
+
+        :param link: article link
+        :return: article details or None if they are not fetched yet
+        """
+        return self._cache.peek(link)
+
+    def enrich(self, articles: List[Article]) -> None:
+        """
+        Fetch details of articles in background, articles with fresh details are skipped.
+
+        :param articles: articles to enrich
+        """
+        for article in articles:
+            if self._cache.is_fresh(article.link):
+                continue
+            with self._lock:
+                if article.link in self._pending_links:
+                    continue
+                if not self._pending_slots.acquire(blocking=False):
+                    self._counters['skipped'] += 1
+                    continue
+                self._pending_links.add(article.link)
+                self._counters['scheduled'] += 1
+            self._executor.submit(self._fetch, article.link)
+
+    def on_articles(self, _: str, articles: List[Article]) -> None:
+        """
+        Articles listener, enriches every parsed article.
+
+        :param _: habr url
+        :param articles: parsed articles
+        """
+        self.enrich(articles)
+
+    def stats(self) -> dict:
+        """
+        Enricher counters.
+
+        :return: dict with scheduled, skipped over max_pending, fetched and failed pages,
+        average and max seconds of article page fetch and parse, pending pages and cache size
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['average_fetch_time'] = (
+                self._total_fetch_time / self._fetches if self._fetches else 0.0
+            )
+            stats['max_fetch_time'] = self._max_fetch_time
+            stats['pending'] = len(self._pending_links)
+        stats['cached'] = self._cache.stats()['size']
+        return stats
+
+    def shutdown(self) -> None:
+        """Wait for pending pages and stop worker threads"""
+        self._executor.shutdown(wait=True)
+
+    def _fetch(self, link: str) -> None:
+        """
+        Fetch and cache details of one article within host rate limit.
+
+        :param link: article link
+        """
+        succeeded = False
+        try:
+            self._wait_for_host(urlsplit(link).netloc)
+            self._cache.refresh(link)
+            succeeded = True
+        except Exception as exception:  # pylint: disable=broad-except
+            logging.error('Article %s enrichment failed. Reason: %s', link, exception)
+        finally:
+            with self._lock:
+                self._counters['fetched' if succeeded else 'failed'] += 1
+                self._pending_links.discard(link)
+                self._pending_slots.release()
+
+    def _wait_for_host(self, host: str) -> None:
+        """
+        Sleep until request to host is allowed by its token bucket.
+
+        :param host: host with port if provided in link
+        """
+        while True:
+            with self._lock:
+                bucket = self._host_buckets.get(host)
+                if bucket is None:
+                    bucket = self._host_buckets[host] = TokenBucket(
+                        self.host_rate, self.host_burst, self.clock
+                    )
+                if bucket.try_acquire():
+                    return
+                wait_time = bucket.wait_time()
+            self.sleep(wait_time)
+
+    def _load(self, link: str) -> ArticleDetails:
+        """
+        Cache loader, fetches and parses article page, measures time of both.
+
+        :param link: article link
+        :return: article details
+        """
+        started_at = time.perf_counter()
+        try:
+            with metrics.timer('enrich_seconds'):
+                return parse_article_details(self.fetch_page(link))
+        finally:
+            fetch_time = time.perf_counter() - started_at
+            with self._lock:
+                self._fetches += 1
+                self._total_fetch_time += fetch_time
+                self._max_fetch_time = max(self._max_fetch_time, fetch_time)
+
+
+article_enricher = ArticleEnricher.from_config(config['enrichment'], get_article_page_html)
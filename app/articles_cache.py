@@ -0,0 +1,227 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+from app.article import Article
+from app.articles_parser import fetch_habr_articles
+from app.helpers import parse_config
+from app.single_flight import SingleFlight
+
+PATH_TO_CONFIG_FILE = 'config.yaml'
+config = parse_config(PATH_TO_CONFIG_FILE)
+
+CacheEntry = namedtuple('CacheEntry', ['value', 'stored_at'])
+CachedValue = TypeVar('CachedValue')
+
+
+class ArticlesCache(Generic[CachedValue]):
+    """
+    In-process TTL + LRU cache of parsed articles lists with stale-while-revalidate.
+    Value type is generic, so the cache also keeps other values parsed from habr pages.
+    """
+
+    def __init__(
+            self,
+            loader: Callable[[str], CachedValue],
+            ttl: float,
+            max_entries: int,
+            stale_ttl: float = 0,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Init empty cache.
+
+        :raise ValueError if ttl or max_entries is not positive or stale_ttl is negative
+        :param loader: function which fetches and parses articles by key (usually url)
+        :param ttl: seconds while cached list is considered fresh
+        :param max_entries: max number of cached lists, least recently used are evicted
+        :param stale_ttl: seconds after ttl while stale list is served and refreshed in background
+        :param clock: monotonic time source
+        """
+        if ttl <= 0 or max_entries < 1 or stale_ttl < 0:
+            logging.critical('Invalid articles cache params provided')
+            raise ValueError
+        self.loader = loader
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._single_flight = SingleFlight('articles cache refresh')
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0, 'refreshes': 0,
+            'stale_served': 0,
+        }
+
+    @classmethod
+    def from_config(cls, loader: Callable[[str], CachedValue], cache_config: dict):
+        """
+        Create new cache from cache section of config.yaml.
+
+        :param loader: function which fetches and parses articles by key
+        :param cache_config: dict with ttl_seconds, max_entries and stale_seconds
+        :return: new ArticlesCache() instance
+        """
+        return cls(
+            loader,
+            ttl=cache_config['ttl_seconds'],
+            max_entries=cache_config['max_entries'],
+            stale_ttl=cache_config.get('stale_seconds', 0)
+        )
+
+    def get(self, key: str) -> CachedValue:
+        """
+        Get articles from cache. Fresh entry returned as is, stale entry returned immediately
+        with one background refresh, missing or expired entry loaded synchronously.
+
+        :param key: cache key, usually habr url
+        :return: list with articles
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.stored_at
+                if age < self.ttl:
+                    self._counters['hits'] += 1
+                    self._entries.move_to_end(key)
+                    return entry.value
+                if age < self.ttl + self.stale_ttl:
+                    self._counters['stale_hits'] += 1
+                    self._entries.move_to_end(key)
+                    self._start_background_refresh(key)
+                    return entry.value
+            self._counters['misses'] += 1
+        return self.refresh(key)
+
+    def get_or_stale(self, key: str) -> Tuple[CachedValue, Optional[float]]:
+        """
+        Get articles from cache like get(). If loading failed with ConnectionError,
+        the last cached articles are returned regardless of their age.
+
+        :raises ConnectionError if loading failed and key is not cached
+        :param key: cache key, usually habr url
+        :return: tuple with list of articles and their age in seconds if stale articles
+        are served because of failure, None otherwise
+        """
+        try:
+            return self.get(key), None
+        except ConnectionError:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    raise
+                self._counters['stale_served'] += 1
+            age = self._clock() - entry.stored_at
+            logging.warning('Serve %s seconds old articles of %s after failure', int(age), key)
+            return entry.value, age
+
+    def refresh(self, key: str) -> CachedValue:
+        """
+        Load articles with loader and store them in cache.
+        Concurrent refreshes of the same key share one loader call.
+
+        :param key: cache key, usually habr url
+        :return: list with freshly loaded articles
+        """
+        return self._single_flight.do(key, self._load, key)
+
+    def _load(self, key: str) -> CachedValue:
+        """
+        Load articles with loader and store them in cache.
+
+        :param key: cache key, usually habr url
+        :return: list with freshly loaded articles
+        """
+        value = self.loader(key)
+        self.put(key, value)
+        return value
+
+    def put(self, key: str, value: CachedValue) -> None:
+        """
+        Store articles in cache, evicting least recently used entries over max_entries.
+
+        :param key: cache key, usually habr url
+        :param value: list with articles
+        """
+        with self._lock:
+            self._entries[key] = CacheEntry(value, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+                logging.info('Evict %s from articles cache', evicted_key)
+
+    def peek(self, key: str) -> Optional[CachedValue]:
+        """
+        Get cached articles regardless of their age without touching counters and LRU order.
+
+        :param key: cache key, usually habr url
+        :return: list with articles or None if key is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def is_fresh(self, key: str) -> bool:
+        """
+        Check if key is cached and not older than ttl, counters and LRU order are not changed.
+
+        :param key: cache key, usually habr url
+        :return: True if fresh entry is cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry is not None and self._clock() - entry.stored_at < self.ttl
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Cache counters.
+
+        :return: dict with hits, stale hits, misses, evictions, background refreshes,
+        stale articles served after failures, loads coalesced with in-flight ones and size
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._entries)
+        stats['coalesced'] = self._single_flight.stats()['coalesced']
+        return stats
+
+    def _start_background_refresh(self, key: str) -> None:
+        """
+        Start refresh of the key in daemon thread if it is not refreshing already.
+        Must be called with lock acquired.
+
+        :param key: cache key, usually habr url
+        """
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        self._counters['refreshes'] += 1
+        thread = threading.Thread(
+            target=self._background_refresh, args=(key,), name='articles-cache-refresh', daemon=True
+        )
+        thread.start()
+
+    def _background_refresh(self, key: str) -> None:
+        """
+        Refresh stale key, keep serving stale value if refresh failed.
+
+        :param key: cache key, usually habr url
+        """
+        try:
+            self.refresh(key)
+        except Exception as exception:  # pylint: disable=broad-except
+            logging.error('Background refresh of %s failed. Reason: %s', key, exception)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+hub_articles_cache: ArticlesCache[List[Article]] = ArticlesCache.from_config(
+    fetch_habr_articles, config['articles_cache']
+)
@@ -1,70 +1,160 @@
 import logging
-from typing import List, Union, Tuple
+from urllib.parse import quote, urlsplit
+from typing import Callable, Dict, Iterator, List, Optional, Union
 
 import requests
-from bs4 import BeautifulSoup, ResultSet
 
 from app.article import Article
-from app.helpers import parse_config
+from app.helpers import normalize_search_query, parse_config
+from app.http_client import http_client
+from app.metrics import metrics
+from app.parse_executor import ParseExecutor
+from app.parser_backends import get_parser_backend
+from app.resilience import (
+    CircuitBreakers, CircuitOpenError, ClientStatusError, RetryAfterError, RetryPolicy,
+    parse_retry_after
+)
+from app.response_cache import response_cache
+from app.single_flight import SingleFlight
+from app.stream_parser import HabrArticlesStreamParser
 
 HABR_BASE_URL = 'https://habr.com'
+# request timeout and too many requests, other client errors are permanent
+RETRIED_CLIENT_STATUS_CODES = (408, 429)
 PATH_TO_CONFIG_FILE = 'config.yaml'
 config = parse_config(PATH_TO_CONFIG_FILE)
+parser_backend = get_parser_backend(config['html_parser_backend'])
+parse_executor = (
+    ParseExecutor.from_config(config['html_parser_backend'], config['parse_executor'])
+    if config['parse_executor']['enabled'] else None
+)
+search_single_flight = SingleFlight('habr search')
+retry_policy = RetryPolicy.from_config(config['fetch_policy'])
+circuit_breakers = CircuitBreakers.from_config(config['fetch_policy'])
+articles_listeners: List[Callable[[str, List[Article]], None]] = []
 
 
-def get_habr_articles_html(url: str) -> str:
+def get_habr_page(
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        breaker_key: Optional[str] = None
+) -> requests.Response:
     """
-    Get page HTML from habr.
+    Get page response from habr through shared pooled http client.
+    Failed requests, "5xx", "408" and "429" responses are retried with backoff,
+    "429" response is retried not earlier than its "Retry-After". Every such failure is recorded
+    by circuit breaker of habr host (or of provided key), requests are not sent while it is open.
+    Other error responses are not retried and not counted by circuit breaker.
 
     :raises ValueError if not sting param provided,
-    ConnectionError if external service not available
+    ConnectionError if external service not available,
+    CircuitOpenError (subclass of ConnectionError) if circuit breaker is open,
+    ClientStatusError (subclass of ConnectionError) if habr rejected request
     :param url: habr url
-    :return: HTML page
+    :param headers: extra request headers
+    :param stream: do not download response body until it is read
+    :param breaker_key: circuit breaker key, host of url by default
+    :return: habr response
     """
     if not isinstance(url, str):
         logging.critical('Not string url param provided: %s', url)
         raise ValueError
 
+    hub = hub_label(url)
+    circuit_breaker = circuit_breakers.get(breaker_key or urlsplit(url).netloc)
+    if not circuit_breaker.allow_request():
+        logging.warning('Circuit breaker of %s is open, skip request', circuit_breaker.name)
+        metrics.inc('habr_requests_total', hub=hub, status='circuit_open')
+        raise CircuitOpenError
+    succeeded = False
+    try:
+        response = retry_policy.call(request_habr_page, url, headers, stream, hub)
+        succeeded = True
+    except ClientStatusError:
+        # host is available, it rejected only this request
+        succeeded = True
+        raise
+    finally:
+        if succeeded:
+            circuit_breaker.record_success()
+        else:
+            circuit_breaker.record_failure()
+    return response
+
+
+def request_habr_page(
+        url: str, headers: Optional[Dict[str, str]], stream: bool, hub: str
+) -> requests.Response:
+    """
+    Send one request to habr.
+
+    :raises ConnectionError if external service not available or responded with error status,
+    RetryAfterError (subclass of ConnectionError) if it responded with "429" status,
+    ClientStatusError (subclass of ConnectionError) if it responded with not retried status
+    :param url: habr url
+    :param headers: extra request headers
+    :param stream: do not download response body until it is read
+    :param hub: hub name for metrics labels
+    :return: habr response
+    """
     try:
         logging.info('Request to habr by url %s', url)
-        response = requests.get(url)
+        with metrics.timer('habr_request_seconds', command=metrics.current_command(), hub=hub):
+            response = http_client.get(url, headers=headers, stream=stream)
     except requests.exceptions.RequestException as exception:
         logging.error("Can't connect to habr. Reason: %s", exception)
+        metrics.inc('habr_requests_total', hub=hub, status='error')
         raise ConnectionError from exception
+    metrics.inc('habr_requests_total', hub=hub, status=str(response.status_code))
+    if not 200 <= response.status_code < 300 and response.status_code != 304:
+        logging.error('Habr responded with %s status', response.status_code)
+        response.close()
+        if response.status_code == 429:
+            raise RetryAfterError(parse_retry_after(response.headers.get('Retry-After')))
+        if response.status_code < 500 and response.status_code not in RETRIED_CLIENT_STATUS_CODES:
+            raise ClientStatusError(response.status_code)
+        raise ConnectionError
 
-    html_data = response.text
-    return html_data
+    return response
 
 
-def parse_habr_maegapost(article: ResultSet) -> Tuple[str, str]:
+def hub_label(url: str) -> str:
     """
-    Parse habr "magapost" articles.
+    Hub name of habr url for metrics labels.
 
-    :param article: ResultSet() class exemplar from bs4 lib
-    :return: tuple with article title and link.
-    Example: (РСХБ на рейде: собираем профессиональную гильдию тестировщиков, /ru/article/598441/)
+    :param url: habr url
+    :return: hub name from config, "search" for search url or "other"
     """
-    article_megapost_snippet = article.find('div', attrs={'class': 'tm-megapost-snippet'})
-    megapost_snippet_wrapper = article_megapost_snippet.find(
-        'div', attrs={'class': 'tm-megapost-snippet__wrapper'}
-    )
-    title_div = megapost_snippet_wrapper.find(
-        'div', attrs={'class': 'tm-megapost-snippet__tint'}
-    )
-    article_title_link = title_div.find(
-        'a', attrs={'class': 'tm-megapost-snippet__link tm-megapost-snippet__card'}
-    )
-    article_title = article_title_link.find('h2').get_text()
-    article_link = article_title_link['href']
+    for hub, hub_config in config['hubs'].items():
+        if url.startswith(hub_config['url']):
+            return hub
+    if url.startswith(config['habr_articles_search_url']):
+        return 'search'
+    return 'other'
 
-    return article_title, article_link
+
+def get_habr_articles_html(url: str) -> str:
+    """
+    Get page HTML from habr through shared pooled http client.
+
+    :raises ValueError if not sting param provided,
+    ConnectionError if external service not available
+    :param url: habr url
+    :return: HTML page
+    """
+    response = get_habr_page(url)
+    html_data = response.text
+    return html_data
 
 
 def parse_habr_articles_content(html_data: str) -> Union[list, List[Article]]:
     """
-    Parse provided HTML page BeautifulSoup lib. Find article title, link, votes and views.
+    Parse provided HTML page with parser backend selected in config.yaml.
+    Find article title, link, votes and views.
     If on page no articles blocks return empty list.
     For special articles used extend parsing functions.
+    If parse executor is enabled page is parsed in worker process.
 
     :raise ValueError if not string param provided
     :param html_data: habr HTML page
@@ -73,42 +163,192 @@ def parse_habr_articles_content(html_data: str) -> Union[list, List[Article]]:
     if not isinstance(html_data, str):
         logging.critical('Not string html_data param provided: %s', html_data)
         raise ValueError
-    result_articles_list = []
-    logging.info('Start parsing html data')
-    page_soup = BeautifulSoup(html_data, features='html.parser')
-    articles_page = page_soup.find('div', attrs={'class': 'tm-articles-list'})
-    if not articles_page:
-        logging.warning("Return empty list, can't find articles block while parsing html data")
-        return result_articles_list
-    articles_data = articles_page.find_all('article')
-
-    for article in articles_data:
-        article_snippet = article.find('div', attrs={'class': 'tm-article-snippet'})
-
-        if not article_snippet:
-            logging.warning('Megapost article found')
-            article_title, article_link = parse_habr_maegapost(article)
-            logging.info('Finish parsing megapost article')
-        else:
-            article_header = article_snippet.find('h2')
-            article_title = article_header.find('a').get_text()
-            article_link = article_header.find('a')['href']
-
-        article_icons = article.find('div', attrs={'class': 'tm-data-icons'})
-        article_votes = article_icons.find(
-            'div', attrs={'class': 'tm-votes-meter tm-data-icons__item'}
-        ).get_text()
-        article_views = article_icons.find(
-            'span', attrs={'class': 'tm-icon-counter tm-data-icons__item'}
-        ).get_text()
-        new_article = Article.build_from_list(
-            [
-                article_title,
-                f"{config['habr_base_url']}{article_link}",
-                article_votes, article_views
-            ]
-        )
-        result_articles_list.append(new_article)
+    logging.info('Start parsing html data with %s parser backend', parser_backend.name)
+    parser = parser_backend if parse_executor is None else parse_executor
+    result_articles_list = [
+        build_article(article_fields) for article_fields in parser.parse(html_data)
+    ]
     logging.info('Finish parsing html data')
 
     return result_articles_list
+
+
+def build_article(article_fields: tuple) -> Article:
+    """
+    Create article from parsed fields, relative link is turned into absolute.
+
+    :param article_fields: tuple with article title, relative link, votes and views
+    :return: new Article() instance
+    """
+    article_title, article_link, article_votes, article_views = article_fields
+    return Article.build_from_list(
+        [article_title, f"{config['habr_base_url']}{article_link}", article_votes, article_views]
+    )
+
+
+def iter_response_articles(response: requests.Response) -> Iterator[Article]:
+    """
+    Read habr response by chunks and yield articles as soon as they are parsed.
+    Parsing stops at the end of articles list block, the rest of response is drained
+    so keep-alive connection goes back to pool.
+
+    :raises ConnectionError if connection was broken while reading
+    :param response: habr response requested with stream=True
+    :return: articles generator
+    """
+    if response.encoding is None:
+        response.encoding = 'utf-8'
+    stream_parser = HabrArticlesStreamParser()
+    try:
+        for chunk in response.iter_content(
+                chunk_size=config['streaming']['chunk_size'], decode_unicode=True
+        ):
+            stream_parser.feed(chunk)
+            for article_fields in stream_parser.pop_articles():
+                yield build_article(article_fields)
+            if stream_parser.finished:
+                logging.info('End of articles list reached, stop parsing response')
+                drain_response(response, config['streaming']['max_drain_bytes'])
+                break
+    except requests.exceptions.RequestException as exception:
+        logging.error("Can't read habr response. Reason: %s", exception)
+        raise ConnectionError from exception
+    finally:
+        response.close()
+    if not stream_parser.found_articles_list:
+        logging.warning("Can't find articles block while stream parsing html data")
+
+
+def drain_response(response: requests.Response, max_bytes: int) -> None:
+    """
+    Read the rest of partly read response without parsing. Fully read response returns
+    its keep-alive connection to pool on close, response with more than max_bytes left
+    is closed with its connection, because reading it costs more than new connection.
+
+    :raises requests.exceptions.RequestException if connection was broken while reading
+    :param response: habr response requested with stream=True
+    :param max_bytes: max number of bytes to read
+    """
+    drained_bytes = 0
+    for chunk in response.iter_content(
+            chunk_size=config['streaming']['chunk_size'], decode_unicode=False
+    ):
+        drained_bytes += len(chunk)
+        if drained_bytes > max_bytes:
+            logging.info('Response rest is longer than %s bytes, drop connection', max_bytes)
+            return
+
+
+def iter_habr_articles(url: str) -> Iterator[Article]:
+    """
+    Stream page from habr by url and yield articles as soon as they are parsed.
+
+    :raises ValueError if not sting param provided,
+    ConnectionError if external service not available
+    :param url: habr url
+    :return: articles generator
+    """
+    response = get_habr_page(url, stream=True)
+    yield from iter_response_articles(response)
+
+
+def register_articles_listener(listener: Callable[[str, List[Article]], None]) -> None:
+    """
+    Register function which is called with url and articles every time page is fetched
+    from habr and parsed. Not called when previously parsed articles are reused.
+
+    :param listener: function with url and articles list params
+    """
+    articles_listeners.append(listener)
+
+
+def notify_articles_listeners(url: str, articles: List[Article]) -> None:
+    """
+    Call all registered listeners with freshly parsed articles, listener errors are logged.
+
+    :param url: habr url
+    :param articles: parsed articles
+    """
+    for listener in articles_listeners:
+        try:
+            listener(url, articles)
+        except Exception:  # pylint: disable=broad-except
+            logging.exception('Articles listener %s failed', listener)
+
+
+def fetch_habr_articles(url: str) -> Union[list, List[Article]]:
+    """
+    Get page from habr by url and parse articles from it.
+    If response cache is enabled conditional request is sent and on "304 Not Modified"
+    previously parsed articles are returned without parsing.
+    If streaming is enabled page is parsed while it is downloaded, unless parse executor
+    is enabled: it parses whole pages in worker processes.
+    Freshly parsed articles are passed to registered articles listeners.
+    Page without articles is not stored in response cache and not passed to listeners,
+    only search page may have no articles.
+
+    :raises ValueError if not sting param provided,
+    ConnectionError if external service not available or hub page has no articles
+    :param url: habr url
+    :return: list contains Article() classes
+    """
+    streaming = config['streaming']['enabled'] and parse_executor is None
+    cached_response = None
+    if response_cache is not None and isinstance(url, str):
+        cached_response = response_cache.get(url)
+    headers = {}
+    if cached_response:
+        if cached_response.etag:
+            headers['If-None-Match'] = cached_response.etag
+        if cached_response.last_modified:
+            headers['If-Modified-Since'] = cached_response.last_modified
+    response = get_habr_page(url, headers=headers, stream=streaming)
+    if response.status_code == 304 and cached_response:
+        logging.info('Habr page %s not modified, reuse parsed articles', url)
+        response.close()
+        return cached_response.articles
+
+    with metrics.timer(
+            'parse_seconds',
+            command=metrics.current_command(),
+            hub=hub_label(url),
+            backend='stream' if streaming else parser_backend.name
+    ):
+        if streaming:
+            html_data = None
+            articles = list(iter_response_articles(response))
+        else:
+            html_data = response.text
+            articles = parse_habr_articles_content(html_data)
+    if not articles:
+        logging.warning('No articles on habr page %s, page is not cached', url)
+        if not url.startswith(config['habr_articles_search_url']):
+            raise ConnectionError
+        return articles
+    if response_cache is not None:
+        response_cache.put(
+            url,
+            response.headers.get('ETag'),
+            response.headers.get('Last-Modified'),
+            html_data,
+            articles
+        )
+    notify_articles_listeners(url, articles)
+    return articles
+
+
+def search_habr_articles(search_url: str, user_query: str) -> Union[list, List[Article]]:
+    """
+    Search articles on habr. Query is normalized and url encoded. Concurrent searches
+    with the same normalized query share one request to habr.
+
+    :raises ValueError if not sting params provided,
+    ConnectionError if external service not available
+    :param search_url: habr search url without query
+    :param user_query: search query from user message
+    :return: list contains Article() classes
+    """
+    query = normalize_search_query(user_query)
+    return search_single_flight.do(
+        query, fetch_habr_articles, f"{search_url}{quote(query, safe='')}"
+    )
@@ -1,17 +1,151 @@
 from abc import ABC, abstractmethod
+from functools import partial
 import logging
+from queue import Full
+import threading
+from typing import List, Optional, Tuple
 
-from telegram.ext import Updater, CallbackContext, CommandHandler
-from telegram import Update
+from telegram.error import BadRequest
+from telegram.ext import (
+    Updater, CallbackContext, CallbackQueryHandler, CommandHandler, InlineQueryHandler
+)
+from telegram import (
+    InlineKeyboardButton, InlineKeyboardMarkup, InlineQueryResultArticle,
+    InputTextMessageContent, Update
+)
 from telegram import ParseMode
 
-from app.articles_parser import parse_habr_articles_content, get_habr_articles_html
-from app.article import prepare_message_for_telegram
+from app.article_details import article_enricher
+from app.articles_parser import (
+    circuit_breakers, hub_label, parse_executor, register_articles_listener
+)
+from app.articles_cache import hub_articles_cache
+from app.article import (
+    TELEGRAM_MESSAGE_MAX_LENGTH, Article, prepare_messages_for_telegram, render_article
+)
+from app.command_executor import CommandExecutor
 from app.helpers import parse_config
+from app.http_client import http_client
+from app.hub_news import (
+    hub_news_fetcher, hub_page_number, merge_articles, parse_news_command_args
+)
+from app.inline_search import inline_debouncer, inline_search
+from app.metrics import MetricsServer, metrics
+from app.prefetch import HubPrefetcher
+from app.result_pages import (
+    PAGE_CALLBACK_PREFIX, ResultPage, page_callback_data, parse_page_callback_data, result_pages
+)
+from app.search_cache import search_results_cache
+from app.search_index import search_index
+from app.send_queue import PRIORITY_BROADCAST, send_queue
+from app.storage import ArticleStore
+from app.subscriptions import SubscriptionManager
+from app.webhook import WebhookServer
 
 PATH_TO_CONFIG_FILE = 'config.yaml'
 config = parse_config(PATH_TO_CONFIG_FILE)
 
+HABR_UNAVAILABLE_TEXT = 'Хабр сейчас недоступен, попробуйте позже'
+EMPTY_RESULT_TEXT = 'Статей не найдено'
+EXPIRED_RESULT_TEXT = 'Результаты устарели, повторите команду'
+PAGE_CUT_TEXT = 'Остальные статьи страницы не поместились в сообщение\n\n'
+
+
+def stale_articles_text(age: float) -> str:
+    """
+    Warning sent before articles which are served from cache because habr is not available.
+
+    :param age: articles age in seconds
+    :return: warning text
+    """
+    return f'Хабр сейчас недоступен, показаны статьи, загруженные {int(age // 60)} мин. назад'
+
+
+def reply(update: Update, text: str, **kwargs) -> None:
+    """
+    Queue reply to chat of update, reply is sent by send queue within telegram rate limits.
+
+    :param update: telegram.ext Updater class
+    :param text: message text
+    :param kwargs: telegram send_message keyword params, e.g. parse_mode
+    """
+    if not send_queue.put(update.effective_chat.id, text, **kwargs):
+        logging.error('Reply to chat %s is dropped', update.effective_chat.id)
+
+
+def render_articles(
+        articles: List[Article], max_length: int = TELEGRAM_MESSAGE_MAX_LENGTH
+) -> List[str]:
+    """
+    Render articles to telegram messages and observe rendering time by command and hub.
+    If enrichment is enabled, fetched details are rendered and missing ones are fetched
+    in background for the next messages.
+
+    :param articles: articles to send
+    :param max_length: max message length
+    :return: list with markdown messages
+    """
+    details = None
+    if config['enrichment']['enabled']:
+        article_enricher.enrich(articles)
+        details = [article_enricher.details(article.link) for article in articles]
+    with metrics.timer(
+            'render_seconds', command=metrics.current_command(), hub=metrics.current_hub()
+    ):
+        return prepare_messages_for_telegram(articles, details, max_length)
+
+
+def render_page(page: ResultPage) -> Tuple[str, InlineKeyboardMarkup]:
+    """
+    Render page of result set with "prev/next" buttons. Page is one message, so articles
+    which do not fit telegram message length limit are cut from page text.
+
+    :param page: page of result set
+    :return: tuple with markdown message and inline keyboard
+    """
+    footer = f'Страница {page.number + 1} из {page.pages_count}'
+    messages = render_articles(
+        page.articles, TELEGRAM_MESSAGE_MAX_LENGTH - len(PAGE_CUT_TEXT) - len(footer)
+    )
+    text = messages[0] if messages else ''
+    if len(messages) > 1:
+        logging.warning('Page of %s articles is longer than message, cut it', len(page.articles))
+        text += PAGE_CUT_TEXT
+    buttons = []
+    if page.number > 0:
+        buttons.append(InlineKeyboardButton(
+            '« Назад', callback_data=page_callback_data(page.token, page.number - 1)
+        ))
+    if page.number < page.pages_count - 1:
+        buttons.append(InlineKeyboardButton(
+            'Вперёд »', callback_data=page_callback_data(page.token, page.number + 1)
+        ))
+    return f'{text}{footer}', InlineKeyboardMarkup([buttons])
+
+
+def send_articles(update: Update, articles: List[Article], empty_text: str) -> None:
+    """
+    Reply with articles. Results longer than one page are stored in result pages and sent
+    as the first page with paging buttons, shorter results are sent as is.
+
+    :param update: telegram.ext Updater class
+    :param articles: articles to send
+    :param empty_text: reply text if there are no articles
+    """
+    if config['pagination']['enabled'] and len(articles) > result_pages.page_size:
+        text, keyboard = render_page(result_pages.put(articles))
+        logging.info('Send the first page of %s articles to user', len(articles))
+        reply(update, text, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
+        return
+    messages = render_articles(articles)
+    if not messages:
+        logging.info('Send message with empty search result text')
+        reply(update, empty_text)
+    else:
+        logging.info('Send %s messages with articles to user', len(messages))
+        for message in messages:
+            reply(update, message, parse_mode=ParseMode.MARKDOWN)
+
 
 class BotCommandStrategy(ABC):
     """Strategy pattern class for different bot commands"""
@@ -27,23 +161,23 @@ class ReplayCommandStrategy(BotCommandStrategy):
     @classmethod
     def bot_command(cls, update: Update, context: CallbackContext, url: str) -> None:
         """
-        Command realisation. Takes habr page with provided url, parse it and prepare message with
-        articles data: title, link, views and rating
+        Command realisation. Takes parsed habr page with provided url from cache (page is fetched
+        and parsed on cache miss) and prepare message with articles data: title, link, views and
+        rating
 
         :param update: telegram.ext Updater class
         :param context: telegram.ext CallbackContext class
         :param url: url to habr section
         """
-        empty_search_result_text = 'Статей не найдено'
-        html_data = get_habr_articles_html(url)
-        articles = parse_habr_articles_content(html_data)
-        message = prepare_message_for_telegram(articles)
-        if not message:
-            logging.info('Send message with empty search result text')
-            update.message.reply_text(empty_search_result_text)
-        else:
-            logging.info('Send message with articles to user')
-            update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
+        try:
+            articles, stale_age = hub_articles_cache.get_or_stale(url)
+        except ConnectionError:
+            logging.error('Habr is not available and %s is not cached', url)
+            reply(update, HABR_UNAVAILABLE_TEXT)
+            return
+        if stale_age is not None:
+            reply(update, stale_articles_text(stale_age))
+        send_articles(update, articles, EMPTY_RESULT_TEXT)
 
 
 class SearchCommandStrategy(BotCommandStrategy):
@@ -52,8 +186,10 @@ class SearchCommandStrategy(BotCommandStrategy):
     @classmethod
     def bot_command(cls, update: Update, context: CallbackContext, url: str) -> None:
         """
-        Command realisation. Takes user query from message with command and search it on habr
-        website. If nothing found send to user corresponding text.
+        Command realisation. Takes user query from message with command and search it in local
+        search index. If index has not enough articles search it on habr website through search
+        results cache, found articles are added to index. If nothing found send to user
+        corresponding text.
 
         :param update: telegram.ext Updater class
         :param context: telegram.ext CallbackContext class
@@ -64,37 +200,109 @@ class SearchCommandStrategy(BotCommandStrategy):
         user_query_words_list = context.args
         if user_query_words_list:
             user_query = ' '.join(user_query_words_list)
-            search_url = f'{url}{user_query}'
-            html_data = get_habr_articles_html(search_url)
-            articles = parse_habr_articles_content(html_data)
-            message = prepare_message_for_telegram(articles)
-
-            if not message:
-                logging.info('Send message with empty search result text')
-                update.message.reply_text(empty_search_result_text)
-            else:
-                logging.info('Send message with articles to user')
-                update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
+            articles = []
+            if config['search_index']['enabled']:
+                articles = search_index.search(user_query, config['search_index']['max_results'])
+            if len(articles) < config['search_index']['min_hits']:
+                try:
+                    articles = search_results_cache.get(url, user_query)
+                except ConnectionError:
+                    if not articles:
+                        logging.error('Habr is not available, search index has no results')
+                        reply(update, HABR_UNAVAILABLE_TEXT)
+                        return
+                    logging.warning('Habr is not available, send search index results only')
+            send_articles(update, articles, empty_search_result_text)
 
         else:
             logging.warning(
                 'User did not pass any query to %s command',
-                config['search_articles_command']
+                config['bot_commands']['search_articles_command']
             )
-            update.message.reply_text(empty_user_query_text)
+            reply(update, empty_user_query_text)
 
 
 class Bot:
     """Main bot class with all commands and actions"""
 
-    def __init__(self, bot_token: str):
+    def __init__(self, bot_token: str, webhook_secret: Optional[str] = None):
         """
         Init method.
 
         :param bot_token: telegram bot token. More info - https://core.telegram.org/bots/api
+        :param webhook_secret: secret url path of webhook, required in webhook mode
         """
-        self.updater = Updater(bot_token)
+        self.updater = Updater(bot_token, base_url=config['telegram_api_url'])
+        self.webhook_secret = webhook_secret
+        self.webhook_server: Optional[WebhookServer] = None
         self.dispatcher = self.updater.dispatcher
+        hub_urls = {hub: hub_config['url'] for hub, hub_config in config['hubs'].items()}
+        self.prefetcher = HubPrefetcher.from_config(
+            hub_articles_cache,
+            list(hub_urls.values()),
+            config['prefetch']
+        )
+        self.command_executor = CommandExecutor.from_config(config['command_executor'])
+        self.subscriptions = SubscriptionManager.from_config(
+            hub_urls, self.send_markdown_message, config['subscriptions']
+        )
+        self.article_store = (
+            ArticleStore(config['storage']['path']) if config['storage']['enabled'] else None
+        )
+
+    def store_articles(self, url: str, articles: list) -> None:
+        """
+        Articles listener, saves parsed articles with their hub to article store.
+        Articles of every hub page are saved with hub and rank in hub listing,
+        e.g. pages fetched by /news.
+
+        :param url: habr url
+        :param articles: parsed articles
+        """
+        hub = hub_label(url)
+        if hub not in config['hubs']:
+            self.article_store.upsert_articles(articles)
+            return
+        page_number = hub_page_number(config['hubs'][hub]['url'], url)
+        self.article_store.upsert_articles(
+            articles, hub=hub, page_offset=(page_number - 1) * len(articles)
+        )
+
+    def compact_article_store(self, _: CallbackContext) -> None:
+        """
+        Retention job, deletes old articles from article store.
+
+        :param _: telegram.ext CallbackContext class, required param for job
+        """
+        self.article_store.compact(
+            max_age=config['storage']['retention_days'] * 24 * 60 * 60,
+            max_articles=config['storage']['max_articles']
+        )
+
+    def poll_subscribed_hubs(self, _: CallbackContext) -> None:
+        """
+        Subscriptions job used when prefetch is disabled, refreshes hubs which have
+        subscribers, so new articles reach subscriptions listener.
+
+        :param _: telegram.ext CallbackContext class, required param for job
+        """
+        for hub, url in self.subscriptions.hubs.items():
+            if self.subscriptions.subscribers(hub):
+                self.prefetcher.refresh(url)
+
+    @staticmethod
+    def send_markdown_message(chat_id: int, text: str) -> None:
+        """
+        Queue markdown text broadcast message to chat, replies are sent before broadcasts.
+
+        :raise Full if send queue is full
+        :param chat_id: telegram chat id
+        :param text: message text
+        """
+        if not send_queue.put(
+                chat_id, text, priority=PRIORITY_BROADCAST, parse_mode=ParseMode.MARKDOWN
+        ):
+            raise Full
 
     @staticmethod
     def start_command(update: Update, _: CallbackContext) -> None:
@@ -105,7 +313,8 @@ class Bot:
         :param _: telegram.ext CallbackContext class, required param for command
         """
         logging.info('Subscribe on bot')
-        update.message.reply_text(
+        reply(
+            update,
             'Бот помогает отслеживать свежие новости на HABR.\nСписок доступных команд - /help'
         )
 
@@ -119,46 +328,70 @@ class Bot:
         :param _: telegram.ext CallbackContext class, required param for command
         """
         logging.info('Calling "/help" command')
-        update.message.reply_text(
+        hub_commands_text = ''.join(
+            f"/{hub_config['command']} - {hub_config['description']}\n"
+            for hub_config in config['hubs'].values()
+        )
+        reply(
+            update,
             '/help - показать это сообщение\n'
-            '/get_testing_news - получить список свежих статей про тестирование\n'
-            '/get_python_news - получить список свежих статей про python\n'
+            f'{hub_commands_text}'
+            '/news хаб,хаб pages=число sort=recency|score - свежие статьи нескольких хабов\n'
             '/search_articles поисковый запрос - поиск стайте на хабре\n'
+            '/subscribe хаб - подписаться на новые статьи хаба\n'
+            '/unsubscribe хаб - отписаться от новых статей хаба\n'
         )
 
     @staticmethod
-    def get_testing_articles(update: Update, context: CallbackContext) -> None:
+    def get_hub_articles(hub: str, update: Update, context: CallbackContext) -> None:
         """
-        Get fresh articles about testing from habr.
-        This is articles from first page https://habr.com/ru/hub/it_testing/
+        Get fresh articles of hub from habr.
+        This is articles from first page of hub url from config,
+        e.g. https://habr.com/ru/hub/python/
 
+        :param hub: hub name from config
         :param update: telegram.ext Updater class, required param for command
         :param context: telegram.ext CallbackContext class, required param for command
         """
-        logging.info('Start parsing habr website for testing articles')
-        ReplayCommandStrategy.bot_command(
-            update,
-            context,
-            config['habr_articles_about_testing_url']
-        )
+        logging.info('Start parsing habr website for %s articles', hub)
+        with metrics.hub_context(hub):
+            ReplayCommandStrategy.bot_command(
+                update,
+                context,
+                config['hubs'][hub]['url']
+            )
         logging.info('Finish parsing habr website')
 
     @staticmethod
-    def get_python_articles(update: Update, context: CallbackContext) -> None:
+    def news_command(update: Update, context: CallbackContext) -> None:
         """
-        Get fresh articles about python from habr.
-        This is articles from first page https://habr.com/ru/hub/python/
+        Get merged articles of several pages of several hubs, pages are fetched concurrently.
+        Example: /news python,testing pages=3 sort=score
 
         :param update: telegram.ext Updater class, required param for command
         :param context: telegram.ext CallbackContext class, required param for command
         """
-        logging.info('Start parsing habr website for python articles')
-        ReplayCommandStrategy.bot_command(
-            update,
-            context,
-            config['habr_articles_about_python_url']
-        )
-        logging.info('Finish parsing habr website')
+        logging.info('Calling "/news" command with args %s', context.args)
+        try:
+            hub_pages, sort_by = parse_news_command_args(
+                context.args, config['hubs'], config['hub_news']['default_pages']
+            )
+        except ValueError:
+            reply(
+                update,
+                f"Формат: /news хаб,хаб pages=число sort=recency|score. "
+                f"Доступные хабы: {', '.join(config['hubs'])}"
+            )
+            return
+        with metrics.hub_context(','.join(hub_label(hub_url) for hub_url, _ in hub_pages)):
+            try:
+                hubs_articles, stale_age = hub_news_fetcher.fetch(hub_pages)
+            except ConnectionError:
+                reply(update, HABR_UNAVAILABLE_TEXT)
+                return
+            if stale_age is not None:
+                reply(update, stale_articles_text(stale_age))
+            send_articles(update, merge_articles(hubs_articles, sort_by), EMPTY_RESULT_TEXT)
 
     @staticmethod
     def search_articles(update: Update, context: CallbackContext) -> None:
@@ -170,15 +403,155 @@ class Bot:
         :param context: telegram.ext CallbackContext class, required param for command
         """
         logging.info('Start parsing habr website for searching articles')
-        SearchCommandStrategy.bot_command(
+        with metrics.hub_context(hub_label(config['habr_articles_search_url'])):
+            SearchCommandStrategy.bot_command(
+                update,
+                context,
+                config['habr_articles_search_url']
+            )
+        logging.info('Finish parsing habr website')
+
+    @staticmethod
+    def page_button(update: Update, _: CallbackContext) -> None:
+        """
+        Edit message with articles to page from "prev/next" button, page is taken from
+        result pages without requests to habr.
+
+        :param update: telegram.ext Updater class, required param for button callback
+        :param _: telegram.ext CallbackContext class, required param for button callback
+        """
+        query = update.callback_query
+        try:
+            token, number = parse_page_callback_data(query.data)
+        except ValueError:
+            logging.warning('Invalid page button data: %s', query.data)
+            query.answer()
+            return
+        page = result_pages.get_page(token, number)
+        if page is None:
+            logging.info('Result set %s is expired', token)
+            query.answer(EXPIRED_RESULT_TEXT)
+            return
+        query.answer()
+        text, keyboard = render_page(page)
+        try:
+            query.edit_message_text(text, parse_mode=ParseMode.MARKDOWN, reply_markup=keyboard)
+        except BadRequest as exception:
+            # repeated press of the same button does not change message
+            logging.warning('Page message is not edited. Reason: %s', exception)
+
+    def inline_query(self, update: Update, context: CallbackContext) -> None:
+        """
+        Debounce inline queries of user, the last query typed within debounce delay
+        is answered in worker pool.
+
+        :param update: telegram.ext Updater class, required param for inline query
+        :param context: telegram.ext CallbackContext class, required param for inline query
+        """
+        inline_debouncer.call(
+            update.inline_query.from_user.id,
+            self.command_executor.submit,
+            'inline',
+            self.answer_inline_query,
             update,
-            context,
-            config['habr_articles_search_url']
+            context
         )
-        logging.info('Finish parsing habr website')
+
+    @staticmethod
+    def answer_inline_query(update: Update, _: CallbackContext) -> None:
+        """
+        Answer inline query with articles, telegram caches answer for cache_time_seconds.
+        Example: @habr_news_bot python asyncio
+
+        :param update: telegram.ext Updater class, required param for inline query
+        :param _: telegram.ext CallbackContext class, required param for inline query
+        """
+        query = update.inline_query
+        articles = inline_search.find(query.query)[0]
+        results = [
+            InlineQueryResultArticle(
+                id=str(index),
+                title=article.title,
+                input_message_content=InputTextMessageContent(
+                    render_article(article, article_enricher.details(article.link)),
+                    parse_mode=ParseMode.MARKDOWN
+                ),
+                url=article.link,
+                description=f'Рейтинг {article.score}, просмотров {article.views_count}'
+            )
+            for index, article in enumerate(articles)
+        ]
+        try:
+            query.answer(
+                results,
+                cache_time=config['inline_mode']['cache_time_seconds'],
+                is_personal=config['inline_mode']['is_personal']
+            )
+        except BadRequest as exception:
+            # query is answered after telegram deadline
+            logging.warning('Inline query is not answered. Reason: %s', exception)
+
+    def subscribe_command(self, update: Update, context: CallbackContext) -> None:
+        """
+        Subscribe chat to new articles of hub from command argument.
+
+        :param update: telegram.ext Updater class, required param for command
+        :param context: telegram.ext CallbackContext class, required param for command
+        """
+        logging.info('Calling "/subscribe" command')
+        self.change_subscription(update, context, subscribe=True)
+
+    def unsubscribe_command(self, update: Update, context: CallbackContext) -> None:
+        """
+        Unsubscribe chat from new articles of hub from command argument.
+
+        :param update: telegram.ext Updater class, required param for command
+        :param context: telegram.ext CallbackContext class, required param for command
+        """
+        logging.info('Calling "/unsubscribe" command')
+        self.change_subscription(update, context, subscribe=False)
+
+    def change_subscription(
+            self, update: Update, context: CallbackContext, subscribe: bool
+    ) -> None:
+        """
+        Subscribe or unsubscribe chat and reply with result.
+
+        :param update: telegram.ext Updater class
+        :param context: telegram.ext CallbackContext class
+        :param subscribe: subscribe if True, unsubscribe otherwise
+        """
+        available_hubs_text = f"Доступные хабы: {', '.join(config['hubs'])}"
+        if not context.args:
+            reply(update, f'Укажите хаб! {available_hubs_text}')
+            return
+        hub = context.args[0].lower()
+        chat_id = update.effective_chat.id
+        try:
+            if subscribe:
+                changed = self.subscriptions.subscribe(chat_id, hub)
+            else:
+                changed = self.subscriptions.unsubscribe(chat_id, hub)
+        except ValueError:
+            reply(update, f'Неизвестный хаб {hub}. {available_hubs_text}')
+            return
+        if subscribe:
+            reply_text = (
+                f'Вы подписались на новые статьи хаба {hub}' if changed
+                else f'Вы уже подписаны на хаб {hub}'
+            )
+        else:
+            reply_text = (
+                f'Вы отписались от хаба {hub}' if changed else f'Вы не подписаны на хаб {hub}'
+            )
+        reply(update, reply_text)
 
     def start_bot(self) -> None:
-        """Bot entrypoint. Add all commands and launch bot"""
+        """
+        Bot entrypoint. Add all commands and launch bot.
+        Cheap commands are answered in dispatcher thread, commands which request habr
+        run in bounded worker pool.
+        """
         logging.info('Starting bot instance...')
         self.dispatcher.add_handler(
             CommandHandler(config['bot_commands']['start_command'], self.start_command)
@@ -187,19 +560,105 @@ class Bot:
             CommandHandler(config['bot_commands']['help_command'], self.help_command)
         )
         self.dispatcher.add_handler(
-            CommandHandler(
-                config['bot_commands']['get_testing_news_command'], self.get_testing_articles
-            )
+            CommandHandler(config['bot_commands']['subscribe_command'], self.subscribe_command)
         )
         self.dispatcher.add_handler(
             CommandHandler(
-                config['bot_commands']['get_python_news_command'], self.get_python_articles
+                config['bot_commands']['unsubscribe_command'], self.unsubscribe_command
             )
         )
+        slow_commands = [
+            (hub_config['command'], partial(self.get_hub_articles, hub))
+            for hub, hub_config in config['hubs'].items()
+        ]
+        slow_commands.append((config['bot_commands']['news_command'], self.news_command))
+        slow_commands.append(
+            (config['bot_commands']['search_articles_command'], self.search_articles)
+        )
+        for command_name, callback in slow_commands:
+            self.dispatcher.add_handler(
+                CommandHandler(command_name, self.command_executor.wrap(command_name, callback))
+            )
         self.dispatcher.add_handler(
-            CommandHandler(
-                config['bot_commands']['search_articles_command'], self.search_articles
+            CallbackQueryHandler(
+                self.command_executor.wrap('page', self.page_button),
+                pattern=f'^{PAGE_CALLBACK_PREFIX}:'
             )
         )
-        self.updater.start_polling()
+        if config['inline_mode']['enabled']:
+            self.dispatcher.add_handler(InlineQueryHandler(self.inline_query))
+        register_articles_listener(self.subscriptions.on_articles)
+        if config['enrichment']['enabled']:
+            register_articles_listener(article_enricher.on_articles)
+        if config['search_index']['enabled']:
+            if self.article_store is not None:
+                search_index.add_articles(self.article_store.all_articles())
+                logging.info('Search index loaded with %s articles', len(search_index))
+            register_articles_listener(search_index.on_articles)
+        if self.article_store is not None:
+            register_articles_listener(self.store_articles)
+            self.updater.job_queue.run_repeating(
+                self.compact_article_store,
+                interval=config['storage']['compaction_interval_seconds']
+            )
+        send_queue.start(self.updater.bot.send_message)
+        if parse_executor is not None:
+            parse_executor.start()
+        if config['prefetch']['enabled']:
+            self.prefetcher.start()
+        else:
+            # prefetch refreshes feed subscriptions, without it hubs are polled by job
+            self.updater.job_queue.run_repeating(
+                self.poll_subscribed_hubs,
+                interval=config['subscriptions']['poll_interval_seconds']
+            )
+        if config['updates_mode'] == 'webhook':
+            self.start_webhook()
+        else:
+            self.updater.start_polling()
+        if metrics.enabled:
+            self.start_metrics_server()
         self.updater.idle()
+
+    def start_metrics_server(self) -> None:
+        """Export stats of caches, queues and pools as gauges and start Prometheus endpoint"""
+        metrics.register_collector('articles_cache', hub_articles_cache.stats)
+        metrics.register_collector('search_cache', search_results_cache.stats)
+        metrics.register_collector('http_client', http_client.stats)
+        metrics.register_collector('circuit_breaker', circuit_breakers.stats, 'host')
+        metrics.register_collector('send_queue', send_queue.stats)
+        metrics.register_collector('result_pages', result_pages.stats)
+        metrics.register_collector('inline_search', inline_search.stats)
+        metrics.register_collector('inline_debouncer', inline_debouncer.stats)
+        metrics.register_collector('article_enricher', article_enricher.stats)
+        metrics.register_collector('command_executor', self.command_executor.stats, 'command')
+        if parse_executor is not None:
+            metrics.register_collector('parse_executor', parse_executor.stats)
+        if self.webhook_server is not None:
+            metrics.register_collector('webhook', self.webhook_server.stats)
+        MetricsServer(metrics, config['metrics']['listen'], config['metrics']['port']).start()
+
+    def start_webhook(self) -> None:
+        """
+        Receive updates with built-in webhook server instead of long polling.
+        Dispatcher and job queue are started here, updater is marked as running,
+        so they are stopped by updater on stop signal.
+
+        :raise ValueError if webhook secret is not provided
+        """
+        self.webhook_server = WebhookServer.from_config(
+            config['webhook'],
+            self.webhook_secret,
+            self.updater.update_queue,
+            lambda data: Update.de_json(data, self.updater.bot)
+        )
+        self.updater.job_queue.start()
+        threading.Thread(target=self.dispatcher.start, name='dispatcher', daemon=True).start()
+        self.webhook_server.start()
+        self.updater.running = True
+        self.updater.user_sig_handler = lambda *_: self.webhook_server.stop()
+        self.updater.bot.set_webhook(
+            url=f"{config['webhook']['url'].rstrip('/')}{self.webhook_server.url_path}",
+            max_connections=config['webhook']['max_connections']
+        )
+        logging.info('Webhook is set, waiting for updates')
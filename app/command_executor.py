@@ -0,0 +1,205 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import CallbackContext
+
+from app.metrics import metrics
+from app.send_queue import send_queue
+
+BUSY_TEXT = 'Бот сейчас перегружен, попробуйте повторить запрос позже'
+
+
+class CommandStats:
+    """Queue and wait time counters of one bot command"""
+
+    def __init__(self):
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def as_dict(self) -> dict:
+        """
+        Counters as dict.
+
+        :return: dict with queue depth, running, completed, failed and rejected commands count,
+        average and max seconds waited in queue
+        """
+        started = self.completed + self.failed + self.running
+        return {
+            'queued': self.queued,
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'average_wait_time': self.total_wait_time / started if started else 0.0,
+            'max_wait_time': self.max_wait_time,
+        }
+
+
+class CommandExecutor:
+    """
+    Bounded worker pool for slow bot commands. Commands are rejected with busy reply
+    when pool queue is full or command reached its concurrency limit, so dispatcher thread
+    is never blocked and cheap commands are not queued behind slow ones.
+    """
+
+    def __init__(
+            self,
+            max_workers: int,
+            max_queue_size: int,
+            command_limits: Optional[Dict[str, int]] = None,
+            busy_text: str = BUSY_TEXT
+    ):
+        """
+        Init worker pool.
+
+        :raise ValueError if max_workers or max_queue_size is not positive
+        :param max_workers: number of worker threads
+        :param max_queue_size: max number of commands queued or running in pool
+        :param command_limits: max number of queued or running commands by command name,
+        commands without limit are limited by max_queue_size only
+        :param busy_text: text of reply to rejected commands
+        """
+        if max_workers < 1 or max_queue_size < 1:
+            logging.critical('Invalid command executor params provided')
+            raise ValueError
+        self.max_queue_size = max_queue_size
+        self.command_limits = dict(command_limits or {})
+        self.busy_text = busy_text
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='bot-command'
+        )
+        self._in_flight = 0
+        self._stats: Dict[str, CommandStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, executor_config: dict):
+        """
+        Create new executor from "command_executor" section of config.yaml.
+
+        :param executor_config: dict with max_workers, max_queue_size and command_limits
+        :return: new CommandExecutor() instance
+        """
+        return cls(
+            max_workers=executor_config['max_workers'],
+            max_queue_size=executor_config['max_queue_size'],
+            command_limits=executor_config.get('command_limits')
+        )
+
+    def wrap(
+            self, command_name: str, callback: Callable[[Update, CallbackContext], None]
+    ) -> Callable[[Update, CallbackContext], None]:
+        """
+        Wrap command or button callback, so it runs in worker pool.
+        Busy reply to rejected command is queued to send queue like any other reply,
+        rejected button presses are answered with busy text instead of message.
+
+        :param command_name: bot command name
+        :param callback: command callback
+        :return: callback for telegram.ext CommandHandler or CallbackQueryHandler
+        """
+        def run_in_pool(update: Update, context: CallbackContext) -> None:
+            if not self.submit(command_name, callback, update, context):
+                if update.message is not None:
+                    with metrics.command_context(command_name):
+                        if not send_queue.put(update.effective_chat.id, self.busy_text):
+                            logging.error(
+                                'Busy reply to chat %s is dropped', update.effective_chat.id
+                            )
+                else:
+                    update.callback_query.answer(self.busy_text)
+        return run_in_pool
+
+    def submit(
+            self,
+            command_name: str,
+            callback: Callable[[Update, CallbackContext], None],
+            update: Update,
+            context: CallbackContext
+    ) -> bool:
+        """
+        Queue command callback to worker pool.
+
+        :param command_name: bot command name
+        :param callback: command callback
+        :param update: telegram.ext Updater class
+        :param context: telegram.ext CallbackContext class
+        :return: True if command was queued, False if it was rejected
+        """
+        with self._lock:
+            command_stats = self._stats.setdefault(command_name, CommandStats())
+            command_limit = self.command_limits.get(command_name, self.max_queue_size)
+            command_in_flight = command_stats.queued + command_stats.running
+            if self._in_flight >= self.max_queue_size or command_in_flight >= command_limit:
+                command_stats.rejected += 1
+                logging.warning('Reject %s command, worker pool is busy', command_name)
+                return False
+            self._in_flight += 1
+            command_stats.queued += 1
+        self._executor.submit(
+            self._run, command_name, callback, update, context, time.monotonic()
+        )
+        return True
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Queue depth and wait time by command.
+
+        :return: dict with command name and its counters
+        """
+        with self._lock:
+            return {name: command_stats.as_dict() for name, command_stats in self._stats.items()}
+
+    def shutdown(self) -> None:
+        """Wait for queued commands and stop worker threads"""
+        self._executor.shutdown(wait=True)
+
+    def _run(
+            self,
+            command_name: str,
+            callback: Callable[[Update, CallbackContext], None],
+            update: Update,
+            context: CallbackContext,
+            queued_at: float
+    ) -> None:
+        """
+        Run command callback in worker thread and update counters.
+
+        :param command_name: bot command name
+        :param callback: command callback
+        :param update: telegram.ext Updater class
+        :param context: telegram.ext CallbackContext class
+        :param queued_at: monotonic time when command was queued
+        """
+        wait_time = time.monotonic() - queued_at
+        with self._lock:
+            command_stats = self._stats[command_name]
+            command_stats.queued -= 1
+            command_stats.running += 1
+            command_stats.total_wait_time += wait_time
+            command_stats.max_wait_time = max(command_stats.max_wait_time, wait_time)
+        succeeded = False
+        try:
+            with metrics.command_context(command_name), \
+                    metrics.timer('command_seconds', command=command_name):
+                callback(update, context)
+            succeeded = True
+        except Exception:  # pylint: disable=broad-except
+            logging.exception('Command %s failed', command_name)
+        finally:
+            with self._lock:
+                command_stats.running -= 1
+                if succeeded:
+                    command_stats.completed += 1
+                else:
+                    command_stats.failed += 1
+                self._in_flight -= 1
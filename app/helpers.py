@@ -14,3 +14,17 @@ def parse_config(path_to_config_file: str):
     with open(path_to_config_file, 'r', encoding='utf 8') as file:
         config_data = yaml.safe_load(file)
     return config_data
+
+
+def normalize_search_query(user_query: str) -> str:
+    """
+    Normalize user search query: lowercase, strip and collapse whitespaces.
+    Example: "  Python   Asyncio " -> "python asyncio"
+
+    :raise ValueError if not string query provided
+    :param user_query: search query from user message
+    :return: normalized query
+    """
+    if not isinstance(user_query, str):
+        raise ValueError
+    return ' '.join(user_query.lower().split())
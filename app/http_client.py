@@ -0,0 +1,149 @@
+import logging
+import threading
+from typing import Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from app.helpers import parse_config
+
+PATH_TO_CONFIG_FILE = 'config.yaml'
+config = parse_config(PATH_TO_CONFIG_FILE)
+
+try:
+    import brotli  # noqa: F401 pylint: disable=unused-import
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter which counts opened connections. Pooled connection dropped by server
+    is opened again by the same connection object, so connects are counted, not objects.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.connects = 0
+        self._connects_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': self._counting_pool_class(HTTPConnectionPool),
+            'https': self._counting_pool_class(HTTPSConnectionPool),
+        }
+
+    def _count_connect(self) -> None:
+        """Count opened connection"""
+        with self._connects_lock:
+            self.connects += 1
+
+    def _counting_pool_class(self, pool_class: type) -> type:
+        """
+        Connection pool class which connections count every connect.
+
+        :param pool_class: urllib3 connection pool class
+        :return: pool class subclass
+        """
+        count_connect = self._count_connect
+
+        class CountingConnection(pool_class.ConnectionCls):
+            def connect(self):
+                super().connect()
+                count_connect()
+
+        return type(pool_class.__name__, (pool_class,), {'ConnectionCls': CountingConnection})
+
+
+class HttpClient:
+    """Shared HTTP client with pooled keep-alive connections to habr"""
+
+    def __init__(
+            self,
+            pool_connections: int,
+            pool_maxsize: int,
+            connect_timeout: float,
+            read_timeout: float,
+            pool_block: bool = True
+    ):
+        """
+        Init client with its own requests session and connection pools.
+
+        :raise ValueError if pool size or timeout is not positive
+        :param pool_connections: number of per-host connection pools to keep
+        :param pool_maxsize: max number of keep-alive connections per host
+        :param connect_timeout: seconds to wait for TCP+TLS connection
+        :param read_timeout: seconds to wait for server response
+        :param pool_block: wait for free connection instead of opening extra one over the limit
+        """
+        if min(pool_connections, pool_maxsize) < 1 or min(connect_timeout, read_timeout) <= 0:
+            logging.critical('Invalid http client pool size or timeout provided')
+            raise ValueError
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self._adapter = CountingHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+        self.session.headers.update({'Accept-Encoding': ACCEPT_ENCODING})
+        self._requests_count = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, client_config: dict):
+        """
+        Create new client from "http_client" section of config.yaml.
+
+        :param client_config: dict with pool and timeout settings
+        :return: new HttpClient() instance
+        """
+        return cls(
+            pool_connections=client_config['pool_connections'],
+            pool_maxsize=client_config['pool_maxsize'],
+            connect_timeout=client_config['connect_timeout'],
+            read_timeout=client_config['read_timeout'],
+            pool_block=client_config.get('pool_block', True)
+        )
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send GET request through pooled session. Default timeouts are used if not provided.
+
+        :raises requests.exceptions.RequestException if request failed
+        :param url: url to request
+        :param kwargs: extra params for requests.Session.get
+        :return: server response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        with self._lock:
+            self._requests_count += 1
+        return self.session.get(url, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Connection pools reuse statistics.
+
+        :return: dict with requests count, opened connections count including reconnects
+        and reused connections count
+        """
+        with self._lock:
+            requests_count = self._requests_count
+        new_connections = self._adapter.connects
+        return {
+            'requests': requests_count,
+            'new_connections': new_connections,
+            'reused_connections': max(requests_count - new_connections, 0),
+        }
+
+    def close(self) -> None:
+        """Close all pooled connections"""
+        self.session.close()
+
+
+http_client = HttpClient.from_config(config['http_client'])
@@ -0,0 +1,183 @@
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.article import Article
+from app.articles_cache import hub_articles_cache
+from app.helpers import parse_config
+
+PATH_TO_CONFIG_FILE = 'config.yaml'
+config = parse_config(PATH_TO_CONFIG_FILE)
+
+SORT_BY_RECENCY = 'recency'
+SORT_BY_SCORE = 'score'
+SORT_ORDERS = (SORT_BY_RECENCY, SORT_BY_SCORE)
+HUB_PAGE_PATTERN = re.compile(r'page(\d+)/?')
+
+
+def hub_page_url(hub_url: str, page_number: int) -> str:
+    """
+    Url of hub page.
+    Example: ("https://habr.com/ru/hub/python/", 2) -> "https://habr.com/ru/hub/python/page2/"
+
+    :raise ValueError if page number is less than 1
+    :param hub_url: url of hub first page
+    :param page_number: page number starting from 1
+    :return: page url
+    """
+    if page_number < 1:
+        raise ValueError
+    return hub_url if page_number == 1 else f'{hub_url}page{page_number}/'
+
+
+def hub_page_number(hub_url: str, page_url: str) -> int:
+    """
+    Number of hub page by its url, reverse of hub_page_url().
+    Example: ("https://habr.com/ru/hub/python/", "https://habr.com/ru/hub/python/page2/") -> 2
+
+    :param hub_url: url of hub first page
+    :param page_url: url of hub page
+    :return: page number starting from 1, 1 if url is not hub page url
+    """
+    if not page_url.startswith(hub_url):
+        return 1
+    page_match = HUB_PAGE_PATTERN.fullmatch(page_url[len(hub_url):])
+    return int(page_match.group(1)) if page_match is not None else 1
+
+
+def parse_news_command_args(
+        args: List[str], hubs_config: Dict[str, dict], default_pages: int
+) -> Tuple[List[Tuple[str, int]], str]:
+    """
+    Parse arguments of news command.
+    Example: ["python,testing", "pages=3", "sort=score"] ->
+    ([(python url, 3), (testing url, 3)], "score")
+    All hubs are used if hubs are not provided, pages are limited by max_pages of each hub.
+
+    :raise ValueError if unknown hub, sort order or invalid pages count provided
+    :param args: command arguments
+    :param hubs_config: "hubs" section of config.yaml
+    :param default_pages: pages count if it is not provided
+    :return: tuple with list of hub url and pages count tuples and sort order
+    """
+    hub_names = list(hubs_config)
+    pages = default_pages
+    sort_by = SORT_BY_RECENCY
+    for arg in args:
+        name, separator, value = arg.partition('=')
+        if not separator:
+            hub_names = [hub.strip().lower() for hub in arg.split(',') if hub.strip()]
+        elif name == 'pages' and value.isdigit() and int(value) > 0:
+            pages = int(value)
+        elif name == 'sort' and value in SORT_ORDERS:
+            sort_by = value
+        else:
+            logging.warning('Invalid news command argument provided: %s', arg)
+            raise ValueError
+    if not hub_names or any(hub not in hubs_config for hub in hub_names):
+        logging.warning('Unknown hub provided: %s', hub_names)
+        raise ValueError
+    hub_pages = [
+        (hubs_config[hub]['url'], min(pages, hubs_config[hub]['max_pages'])) for hub in hub_names
+    ]
+    return hub_pages, sort_by
+
+
+def merge_articles(hubs_articles: List[List[Article]], sort_by: str) -> List[Article]:
+    """
+    Merge articles of several hubs, articles from several hubs are kept once.
+    By recency hubs are interleaved by article position, because hub pages are ordered by
+    publication time. By score articles are sorted by votes score.
+
+    :raise ValueError if unknown sort order provided
+    :param hubs_articles: list with articles of all requested pages of each hub
+    :param sort_by: "recency" or "score"
+    :return: list with merged articles
+    """
+    if sort_by not in SORT_ORDERS:
+        raise ValueError
+    positioned_articles = sorted(
+        (
+            (position, hub_index, article)
+            for hub_index, hub_articles in enumerate(hubs_articles)
+            for position, article in enumerate(hub_articles)
+        ),
+        key=lambda positioned_article: positioned_article[:2]
+    )
+    seen_links = set()
+    merged_articles = []
+    for _, _, article in positioned_articles:
+        if article.link not in seen_links:
+            seen_links.add(article.link)
+            merged_articles.append(article)
+    if sort_by == SORT_BY_SCORE:
+        merged_articles.sort(key=lambda article: article.score, reverse=True)
+    return merged_articles
+
+
+class HubNewsFetcher:
+    """Fetches several pages of several hubs concurrently on bounded thread pool"""
+
+    def __init__(
+            self,
+            load_page: Callable[[str], Tuple[List[Article], Optional[float]]],
+            max_workers: int
+    ):
+        """
+        Init thread pool.
+
+        :raise ValueError if max_workers is not positive
+        :param load_page: function which returns parsed articles of page by url and their age
+        in seconds if stale articles are served because of failure, None otherwise
+        :param max_workers: max number of pages fetched at the same time
+        """
+        if max_workers < 1:
+            logging.critical('Invalid hub news fetcher params provided')
+            raise ValueError
+        self.load_page = load_page
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hub-news')
+
+    def fetch(
+            self, hub_pages: List[Tuple[str, int]]
+    ) -> Tuple[List[List[Article]], Optional[float]]:
+        """
+        Fetch and parse all pages concurrently. Failed pages are skipped.
+
+        :raise ConnectionError if all pages failed
+        :param hub_pages: list with hub url and pages count tuples
+        :return: tuple with list with articles of all pages of each hub in hub_pages order
+        and age in seconds of the oldest stale page, None if no stale pages are served
+        """
+        futures = [
+            [
+                self._executor.submit(self.load_page, hub_page_url(hub_url, page_number))
+                for page_number in range(1, pages + 1)
+            ]
+            for hub_url, pages in hub_pages
+        ]
+        hubs_articles = []
+        failed_pages = 0
+        max_stale_age = None
+        for hub_futures in futures:
+            hub_articles = []
+            for future in hub_futures:
+                try:
+                    page_articles, stale_age = future.result()
+                except Exception as exception:  # pylint: disable=broad-except
+                    failed_pages += 1
+                    logging.error('Hub page fetch failed. Reason: %s', exception)
+                    continue
+                hub_articles.extend(page_articles)
+                if stale_age is not None:
+                    max_stale_age = max(stale_age, max_stale_age or 0.0)
+            hubs_articles.append(hub_articles)
+        if failed_pages and failed_pages == sum(len(hub_futures) for hub_futures in futures):
+            raise ConnectionError
+        return hubs_articles, max_stale_age
+
+
+# pages are served from cache after habr failures, even if they are expired
+hub_news_fetcher = HubNewsFetcher(
+    hub_articles_cache.get_or_stale, config['hub_news']['max_workers']
+)
@@ -0,0 +1,268 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.article import Article
+from app.articles_cache import hub_articles_cache
+from app.helpers import parse_config
+from app.hub_news import SORT_BY_RECENCY, merge_articles
+from app.search_cache import search_results_cache
+from app.search_index import search_index, tokenize
+
+PATH_TO_CONFIG_FILE = 'config.yaml'
+config = parse_config(PATH_TO_CONFIG_FILE)
+
+SOURCE_HUBS = 'hubs'
+SOURCE_SEARCH_CACHE = 'search_cache'
+SOURCE_LOCAL = 'local'
+SOURCE_REMOTE = 'remote'
+
+
+class Debouncer:
+    """
+    Delays calls by key, a new call with the same key cancels the pending one.
+    Used for inline queries: telegram sends query on every typed character, only the last
+    query typed within delay is answered.
+    """
+
+    def __init__(self, delay: float):
+        """
+        :raise ValueError if delay is negative
+        :param delay: seconds call waits for newer call with the same key
+        """
+        if delay < 0:
+            logging.critical('Invalid debouncer params provided')
+            raise ValueError
+        self.delay = delay
+        self._timers: Dict[Hashable, threading.Timer] = {}
+        self._lock = threading.Lock()
+        self._counters = {'scheduled': 0, 'superseded': 0}
+
+    def call(self, key: Hashable, function: Callable[..., None], *args) -> None:
+        """
+        Call function after delay unless function is called again with the same key.
+
+        :param key: debouncing key, e.g. user id
+        :param function: function to call
+        :param args: function params
+        """
+        with self._lock:
+            pending_timer = self._timers.get(key)
+            if pending_timer is not None:
+                pending_timer.cancel()
+                self._counters['superseded'] += 1
+            timer = threading.Timer(self.delay, self._run, args=(key, function, args))
+            timer.daemon = True
+            self._timers[key] = timer
+            self._counters['scheduled'] += 1
+            timer.start()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Debouncer counters.
+
+        :return: dict with scheduled calls, calls cancelled by newer ones and pending calls
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['pending'] = len(self._timers)
+        return stats
+
+    def _run(self, key: Hashable, function: Callable[..., None], args: tuple) -> None:
+        """
+        Call function if it was not superseded while timer was firing.
+
+        :param key: debouncing key
+        :param function: function to call
+        :param args: function params
+        """
+        with self._lock:
+            if self._timers.get(key) is not threading.current_thread():
+                return
+            del self._timers[key]
+        function(*args)
+
+
+class InlineSearch:
+    """
+    Finds articles for inline queries in warm in-memory data: hub pages, cached habr search
+    results and local search index. Habr search is a fallback with bounded concurrency and
+    time budget, so the answer fits telegram inline query deadline.
+    """
+
+    def __init__(
+            self,
+            hub_snapshots: Callable[[], List[List[Article]]],
+            cached_search: Callable[[str], Optional[List[Article]]],
+            local_search: Callable[[str, int], List[Article]],
+            remote_search: Callable[[str], List[Article]],
+            max_results: int,
+            min_results: int,
+            remote_timeout: float,
+            remote_max_concurrent: int
+    ):
+        """
+        Init remote search pool.
+
+        :raise ValueError if max_results, remote_timeout or remote_max_concurrent is not positive
+        or min_results is negative
+        :param hub_snapshots: function returning cached articles of every hub
+        :param cached_search: function returning cached habr search results by query or None
+        :param local_search: function searching articles in local index by query and limit
+        :param remote_search: function searching articles on habr by query
+        :param max_results: max number of articles in answer, telegram allows 50
+        :param min_results: habr is searched if local data has less articles
+        :param remote_timeout: seconds to wait for habr search
+        :param remote_max_concurrent: max number of habr searches at the same time
+        """
+        if max_results < 1 or min_results < 0 or remote_timeout <= 0 or remote_max_concurrent < 1:
+            logging.critical('Invalid inline search params provided')
+            raise ValueError
+        self.hub_snapshots = hub_snapshots
+        self.cached_search = cached_search
+        self.local_search = local_search
+        self.remote_search = remote_search
+        self.max_results = max_results
+        self.min_results = min_results
+        self.remote_timeout = remote_timeout
+        self.remote_max_concurrent = remote_max_concurrent
+        self._executor = ThreadPoolExecutor(
+            max_workers=remote_max_concurrent, thread_name_prefix='inline-search'
+        )
+        self._remote_in_flight = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            SOURCE_HUBS: 0, SOURCE_SEARCH_CACHE: 0, SOURCE_LOCAL: 0, SOURCE_REMOTE: 0,
+            'remote_skipped': 0, 'remote_timeouts': 0, 'remote_errors': 0,
+        }
+
+    @classmethod
+    def from_config(
+            cls,
+            hub_snapshots: Callable[[], List[List[Article]]],
+            cached_search: Callable[[str], Optional[List[Article]]],
+            local_search: Callable[[str, int], List[Article]],
+            remote_search: Callable[[str], List[Article]],
+            inline_config: dict
+    ):
+        """
+        Create new inline search from "inline_mode" section of config.yaml.
+
+        :param hub_snapshots: function returning cached articles of every hub
+        :param cached_search: function returning cached habr search results by query or None
+        :param local_search: function searching articles in local index by query and limit
+        :param remote_search: function searching articles on habr by query
+        :param inline_config: dict with max_results, min_results, remote_timeout_seconds
+        and remote_max_concurrent
+        :return: new InlineSearch() instance
+        """
+        return cls(
+            hub_snapshots,
+            cached_search,
+            local_search,
+            remote_search,
+            max_results=inline_config['max_results'],
+            min_results=inline_config['min_results'],
+            remote_timeout=inline_config['remote_timeout_seconds'],
+            remote_max_concurrent=inline_config['remote_max_concurrent']
+        )
+
+    def find(self, query: str) -> Tuple[List[Article], str]:
+        """
+        Find articles. Empty query is answered with fresh hub articles, other queries with
+        cached habr search results, then with local matches, then with habr search results.
+        Habr search is skipped if too many searches are running, its result is cached
+        for the next queries even if it was not ready in time.
+
+        :param query: inline query text
+        :return: tuple with list of articles and source name
+        """
+        hub_articles = merge_articles(self.hub_snapshots(), SORT_BY_RECENCY)
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return self._found(hub_articles, SOURCE_HUBS)
+        cached_articles = self.cached_search(query)
+        if cached_articles:
+            return self._found(cached_articles, SOURCE_SEARCH_CACHE)
+
+        local_articles = merge_articles([
+            self.local_search(query, self.max_results),
+            [article for article in hub_articles if query_tokens <= tokenize(article.title)],
+        ], SORT_BY_RECENCY)
+        if len(local_articles) >= self.min_results:
+            return self._found(local_articles, SOURCE_LOCAL)
+        remote_articles = self._search_remote(query)
+        if remote_articles:
+            return self._found(remote_articles, SOURCE_REMOTE)
+        return self._found(local_articles, SOURCE_LOCAL)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Inline search counters.
+
+        :return: dict with answers by source, skipped, timed out and failed habr searches
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['remote_in_flight'] = self._remote_in_flight
+        return stats
+
+    def _found(self, articles: List[Article], source: str) -> Tuple[List[Article], str]:
+        """
+        Count answer source and limit articles.
+
+        :param articles: found articles
+        :param source: source name
+        :return: tuple with list of at most max_results articles and source name
+        """
+        with self._lock:
+            self._counters[source] += 1
+        logging.info('Inline query answered from %s with %s articles', source, len(articles))
+        return articles[:self.max_results], source
+
+    def _search_remote(self, query: str) -> List[Article]:
+        """
+        Search articles on habr within remote_timeout.
+
+        :param query: inline query text
+        :return: list with found articles, empty list if search is skipped, failed
+        or not ready in time
+        """
+        with self._lock:
+            if self._remote_in_flight >= self.remote_max_concurrent:
+                self._counters['remote_skipped'] += 1
+                return []
+            self._remote_in_flight += 1
+        future = self._executor.submit(self.remote_search, query)
+        future.add_done_callback(self._remote_done)
+        try:
+            return future.result(timeout=self.remote_timeout)
+        except FutureTimeoutError:
+            logging.warning('Habr search of inline query %s is not ready in time', query)
+            counter = 'remote_timeouts'
+        except (ConnectionError, ValueError) as exception:
+            logging.error('Habr search of inline query failed. Reason: %s', exception)
+            counter = 'remote_errors'
+        with self._lock:
+            self._counters[counter] += 1
+        return []
+
+    def _remote_done(self, _) -> None:
+        """Release habr search slot, search may finish after answer timeout"""
+        with self._lock:
+            self._remote_in_flight -= 1
+
+
+inline_debouncer = Debouncer(config['inline_mode']['debounce_seconds'])
+inline_search = InlineSearch.from_config(
+    lambda: [
+        hub_articles_cache.peek(hub_config['url']) or [] for hub_config in config['hubs'].values()
+    ],
+    lambda query: search_results_cache.peek(config['habr_articles_search_url'], query),
+    lambda query, limit: (
+        search_index.search(query, limit) if config['search_index']['enabled'] else []
+    ),
+    lambda query: search_results_cache.get(config['habr_articles_search_url'], query),
+    config['inline_mode']
+)
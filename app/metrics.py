@@ -0,0 +1,369 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.helpers import parse_config
+
+PATH_TO_CONFIG_FILE = 'config.yaml'
+config = parse_config(PATH_TO_CONFIG_FILE)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BACKGROUND_COMMAND = 'background'
+NO_HUB = 'none'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+METRIC_DESCRIPTIONS = {
+    'habr_request_seconds': 'Time to receive habr response headers',
+    'habr_requests_total': 'Habr requests by response status',
+    'parse_seconds': 'Time to parse habr page, includes download when page is streamed',
+    'render_seconds': 'Time to render articles to telegram messages',
+    'telegram_send_seconds': 'Time of telegram sendMessage request',
+    'command_seconds': 'Time to run bot command in worker pool',
+    'enrich_seconds': 'Time to fetch and parse article page for article details',
+    'errors_total': 'Errors by stage',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets"""
+
+    __slots__ = ('bucket_counts', 'sum', 'count')
+
+    def __init__(self, buckets_count: int):
+        self.bucket_counts = [0] * buckets_count
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """
+    Counters and latency histograms labelled by command, hub and stage, rendered in Prometheus
+    text format together with gauges collected from stats() of caches and queues.
+    When disabled every method returns immediately.
+    """
+
+    def __init__(self, enabled: bool, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Init empty metrics.
+
+        :raise ValueError if buckets are not sorted or empty
+        :param enabled: collect metrics if True
+        :param buckets: histogram upper bounds in seconds
+        """
+        if not buckets or list(buckets) != sorted(buckets):
+            logging.critical('Invalid metrics buckets provided: %s', buckets)
+            raise ValueError
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._collectors: List[Tuple[str, Callable[[], Dict[str, Any]], Optional[str]]] = []
+        self._lock = threading.Lock()
+        self._context = threading.local()
+
+    @classmethod
+    def from_config(cls, metrics_config: dict):
+        """
+        Create new metrics from "metrics" section of config.yaml.
+
+        :param metrics_config: dict with enabled and buckets
+        :return: new Metrics() instance
+        """
+        return cls(
+            enabled=metrics_config['enabled'],
+            buckets=tuple(metrics_config.get('buckets', DEFAULT_BUCKETS))
+        )
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """
+        Increase counter.
+
+        :param name: counter name
+        :param amount: value to add
+        :param labels: counter labels
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Add value to histogram.
+
+        :param name: histogram name
+        :param value: observed value, seconds for latency
+        :param labels: histogram labels
+        """
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        bucket_index = bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(len(self.buckets))
+            if bucket_index < len(self.buckets):
+                histogram.bucket_counts[bucket_index] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """
+        Observe duration of block, failed block also increases errors_total of histogram.
+
+        :param name: histogram name
+        :param labels: histogram labels
+        """
+        if not self.enabled:
+            yield
+            return
+        started_at = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc('errors_total', stage=name)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started_at, **labels)
+
+    @contextmanager
+    def command_context(self, command: str) -> Iterator[None]:
+        """
+        Label metrics observed in current thread with command name.
+
+        :param command: bot command name
+        """
+        previous_command = getattr(self._context, 'command', BACKGROUND_COMMAND)
+        self._context.command = command
+        try:
+            yield
+        finally:
+            self._context.command = previous_command
+
+    def current_command(self) -> str:
+        """
+        Command which is run by current thread.
+
+        :return: command name or "background" for prefetch and other background work
+        """
+        return getattr(self._context, 'command', BACKGROUND_COMMAND)
+
+    @contextmanager
+    def hub_context(self, hub: str) -> Iterator[None]:
+        """
+        Label rendering and sending of messages in current thread with hub name.
+
+        :param hub: hub name, "search" for search results
+        """
+        previous_hub = getattr(self._context, 'hub', NO_HUB)
+        self._context.hub = hub
+        try:
+            yield
+        finally:
+            self._context.hub = previous_hub
+
+    def current_hub(self) -> str:
+        """
+        Hub which articles are handled by current thread.
+
+        :return: hub name or "none" if articles are not of one hub, e.g. pages of result set
+        """
+        return getattr(self._context, 'hub', NO_HUB)
+
+    def register_collector(
+            self, prefix: str, collect: Callable[[], Dict[str, Any]], label: Optional[str] = None
+    ) -> None:
+        """
+        Export numeric values of stats() dict as gauges named "<prefix>_<key>".
+        Nested dicts, e.g. stats by command, are exported with label.
+
+        :param prefix: gauge names prefix
+        :param collect: function returning stats dict
+        :param label: label name for keys of nested dicts
+        """
+        with self._lock:
+            self._collectors.append((prefix, collect, label))
+
+    def render(self) -> str:
+        """
+        All metrics in Prometheus text format.
+
+        :return: metrics text
+        """
+        lines: List[str] = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, (list(histogram.bucket_counts), histogram.sum, histogram.count))
+                for key, histogram in self._histograms.items()
+            )
+            collectors = list(self._collectors)
+        described_names = set()
+        for (name, labels), value in counters:
+            self._describe(lines, described_names, name, 'counter')
+            lines.append(f'{name}{format_labels(labels)} {value}')
+        for (name, labels), (bucket_counts, histogram_sum, histogram_count) in histograms:
+            self._describe(lines, described_names, name, 'histogram')
+            cumulative_count = 0
+            for upper_bound, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative_count += bucket_count
+                bucket_labels = labels + (('le', str(upper_bound)),)
+                lines.append(f'{name}_bucket{format_labels(bucket_labels)} {cumulative_count}')
+            inf_labels = labels + (('le', '+Inf'),)
+            lines.append(f'{name}_bucket{format_labels(inf_labels)} {histogram_count}')
+            lines.append(f'{name}_sum{format_labels(labels)} {histogram_sum}')
+            lines.append(f'{name}_count{format_labels(labels)} {histogram_count}')
+        for prefix, collect, label in collectors:
+            try:
+                stats = collect()
+            except Exception:  # pylint: disable=broad-except
+                logging.exception('Metrics collector %s failed', prefix)
+                continue
+            for name, labels, value in flatten_stats(prefix, stats, label):
+                self._describe(lines, described_names, name, 'gauge')
+                lines.append(f'{name}{format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _describe(lines: List[str], described_names: set, name: str, metric_type: str) -> None:
+        """
+        Add HELP and TYPE lines before the first sample of metric.
+
+        :param lines: rendered lines
+        :param described_names: names of already described metrics
+        :param name: metric name
+        :param metric_type: counter, histogram or gauge
+        """
+        if name in described_names:
+            return
+        described_names.add(name)
+        if name in METRIC_DESCRIPTIONS:
+            lines.append(f'# HELP {name} {METRIC_DESCRIPTIONS[name]}')
+        lines.append(f'# TYPE {name} {metric_type}')
+
+
+def format_labels(labels: Labels) -> str:
+    """
+    Prometheus labels.
+    Example: (("command", "news"), ("hub", "python")) -> '{command="news",hub="python"}'
+
+    :param labels: tuple with label name and value tuples
+    :return: labels text, empty string if no labels
+    """
+    if not labels:
+        return ''
+    escaped_labels = ','.join(
+        f'{name}="{escape_label_value(value)}"' for name, value in labels
+    )
+    return f'{{{escaped_labels}}}'
+
+
+def escape_label_value(value: Any) -> str:
+    """
+    Escape backslash, double quote and new line in label value.
+
+    :param value: label value
+    :return: escaped value
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def flatten_stats(
+        prefix: str, stats: Dict[str, Any], label: Optional[str]
+) -> List[Tuple[str, Labels, float]]:
+    """
+    Numeric values of stats dict as gauge samples, booleans and strings are skipped.
+
+    :param prefix: gauge names prefix
+    :param stats: stats dict, values of nested dicts are labelled with their key
+    :param label: label name for keys of nested dicts
+    :return: list with gauge name, labels and value tuples
+    """
+    samples = []
+    for key, value in sorted(stats.items()):
+        if isinstance(value, dict):
+            samples.extend(
+                (name, ((label or 'key', key),) + labels, nested_value)
+                for name, labels, nested_value in flatten_stats(prefix, value, label)
+            )
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            samples.append((f'{prefix}_{key}', (), value))
+    return samples
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves metrics text on GET /metrics"""
+
+    server: 'MetricsHTTPServer'
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Render metrics"""
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        """Log scrapes on debug level"""
+        logging.debug('Metrics request from %s: %s', self.address_string(), format % args)
+
+
+class MetricsHTTPServer(ThreadingHTTPServer):
+    """HTTP server with metrics to render"""
+
+    daemon_threads = True
+
+    def __init__(self, server_address: tuple, metrics: Metrics):
+        super().__init__(server_address, MetricsRequestHandler)
+        self.metrics = metrics
+
+
+class MetricsServer:
+    """Prometheus endpoint in daemon thread"""
+
+    def __init__(self, metrics: Metrics, listen: str, port: int):
+        """
+        Bind server socket, requests are handled after start().
+
+        :param metrics: metrics to serve
+        :param listen: address to listen
+        :param port: port to listen, 0 for any free port
+        """
+        self._http_server = MetricsHTTPServer((listen, port), metrics)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def server_address(self) -> tuple:
+        """Address and port server is listening on"""
+        return self._http_server.server_address
+
+    def start(self) -> None:
+        """Handle requests in daemon thread"""
+        self._thread = threading.Thread(
+            target=self._http_server.serve_forever, name='metrics-server', daemon=True
+        )
+        self._thread.start()
+        logging.info('Metrics are served on %s:%s/metrics', *self.server_address[:2])
+
+    def stop(self) -> None:
+        """Stop handling requests and close server socket"""
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+metrics = Metrics.from_config(config['metrics'])
@@ -0,0 +1,153 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from app.parser_backends import ArticleFields, ParserBackend, get_parser_backend
+
+worker_parser_backend: Optional[ParserBackend] = None
+
+
+def init_worker(backend_name: str) -> None:
+    """
+    Worker process initializer, creates parser backend once per process.
+
+    :param backend_name: parser backend name from config.yaml
+    """
+    global worker_parser_backend  # pylint: disable=global-statement
+    worker_parser_backend = get_parser_backend(backend_name)
+
+
+def warm_up_worker() -> bool:
+    """
+    No-op task, makes pool start worker process before first page is parsed.
+
+    :return: True if worker parser backend is initialized
+    """
+    return worker_parser_backend is not None
+
+
+def parse_in_worker(html_data: str) -> List[ArticleFields]:
+    """
+    Parse page in worker process, plain tuples are returned because they are cheap to pickle.
+
+    :param html_data: habr HTML page
+    :return: list with article title, relative link, votes and views tuples
+    """
+    return worker_parser_backend.parse(html_data)
+
+
+class ParseExecutor:
+    """
+    Parses habr pages in pool of worker processes, so parsing of concurrently fetched pages
+    is not serialized by GIL. Small pages are parsed in calling thread, because sending them
+    to other process costs more than parsing.
+    """
+
+    def __init__(self, backend_name: str, max_workers: int, min_process_bytes: int = 0):
+        """
+        Init executor, worker processes are started on first use or by start().
+
+        :raise ValueError if unknown backend name provided, max_workers is not positive
+        or min_process_bytes is negative
+        :param backend_name: parser backend name from config.yaml
+        :param max_workers: number of worker processes
+        :param min_process_bytes: pages shorter than this are parsed in calling thread
+        """
+        if max_workers < 1 or min_process_bytes < 0:
+            logging.critical('Invalid parse executor params provided')
+            raise ValueError
+        self.backend_name = backend_name
+        self.max_workers = max_workers
+        self.min_process_bytes = min_process_bytes
+        self._local_backend = get_parser_backend(backend_name)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_process = 0
+        self._in_thread = 0
+
+    @classmethod
+    def from_config(cls, backend_name: str, executor_config: dict):
+        """
+        Create new executor from "parse_executor" section of config.yaml.
+
+        :param backend_name: parser backend name from config.yaml
+        :param executor_config: dict with max_workers and min_process_bytes
+        :return: new ParseExecutor() instance
+        """
+        return cls(
+            backend_name,
+            max_workers=executor_config['max_workers'],
+            min_process_bytes=executor_config.get('min_process_bytes', 0)
+        )
+
+    def start(self) -> None:
+        """Start all worker processes and create parser backend in each of them"""
+        pool = self._get_pool()
+        for future in [pool.submit(warm_up_worker) for _ in range(self.max_workers)]:
+            future.result()
+        logging.info('Parse executor started with %s worker processes', self.max_workers)
+
+    def parse(self, html_data: str) -> List[ArticleFields]:
+        """
+        Parse page in worker process, small pages are parsed in calling thread.
+        If worker process died pool is recreated and page is parsed in calling thread.
+
+        :param html_data: habr HTML page
+        :return: list with article title, relative link, votes and views tuples
+        """
+        if len(html_data) >= self.min_process_bytes:
+            try:
+                articles_fields = self._get_pool().submit(parse_in_worker, html_data).result()
+            except BrokenProcessPool:
+                logging.exception('Parse executor worker died, parse page in calling thread')
+                self._reset_pool()
+            else:
+                with self._lock:
+                    self._in_process += 1
+                return articles_fields
+        with self._lock:
+            self._in_thread += 1
+        return self._local_backend.parse(html_data)
+
+    def stats(self) -> dict:
+        """
+        Executor counters.
+
+        :return: dict with number of pages parsed in worker processes and in calling thread
+        """
+        with self._lock:
+            return {'in_process': self._in_process, 'in_thread': self._in_thread}
+
+    def shutdown(self) -> None:
+        """Stop worker processes"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """
+        Create process pool on first use. Workers are spawned, not forked, because
+        bot process runs many threads.
+
+        :return: process pool
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=init_worker,
+                    initargs=(self.backend_name,)
+                )
+            return self._pool
+
+    def _reset_pool(self) -> None:
+        """Drop broken process pool, new one is created on next use"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
@@ -0,0 +1,152 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple, Type
+
+from bs4 import BeautifulSoup, ResultSet, SoupStrainer
+
+from app.stream_parser import HabrArticlesStreamParser
+
+try:
+    import lxml  # noqa: F401 pylint: disable=unused-import
+    STRAINED_TREE_FEATURES = 'lxml'
+except ImportError:
+    STRAINED_TREE_FEATURES = 'html.parser'
+
+ARTICLES_LIST_CLASS = 'tm-articles-list'
+ArticleFields = Tuple[str, str, str, str]
+
+
+def parse_habr_maegapost(article: ResultSet) -> Tuple[str, str]:
+    """
+    Parse habr "magapost" articles.
+
+    :param article: ResultSet() class exemplar from bs4 lib
+    :return: tuple with article title and link.
+    Example: (РСХБ на рейде: собираем профессиональную гильдию тестировщиков, /ru/article/598441/)
+    """
+    article_megapost_snippet = article.find('div', attrs={'class': 'tm-megapost-snippet'})
+    megapost_snippet_wrapper = article_megapost_snippet.find(
+        'div', attrs={'class': 'tm-megapost-snippet__wrapper'}
+    )
+    title_div = megapost_snippet_wrapper.find(
+        'div', attrs={'class': 'tm-megapost-snippet__tint'}
+    )
+    article_title_link = title_div.find(
+        'a', attrs={'class': 'tm-megapost-snippet__link tm-megapost-snippet__card'}
+    )
+    article_title = article_title_link.find('h2').get_text()
+    article_link = article_title_link['href']
+
+    return article_title, article_link
+
+
+def parse_habr_article(article: ResultSet) -> ArticleFields:
+    """
+    Parse one habr article block.
+
+    :param article: ResultSet() class exemplar from bs4 lib with <article> tag
+    :return: tuple with article title, relative link, votes and views
+    """
+    article_snippet = article.find('div', attrs={'class': 'tm-article-snippet'})
+
+    if not article_snippet:
+        logging.warning('Megapost article found')
+        article_title, article_link = parse_habr_maegapost(article)
+        logging.info('Finish parsing megapost article')
+    else:
+        article_header = article_snippet.find('h2')
+        article_title = article_header.find('a').get_text()
+        article_link = article_header.find('a')['href']
+
+    article_icons = article.find('div', attrs={'class': 'tm-data-icons'})
+    article_votes = article_icons.find(
+        'div', attrs={'class': 'tm-votes-meter tm-data-icons__item'}
+    ).get_text()
+    article_views = article_icons.find(
+        'span', attrs={'class': 'tm-icon-counter tm-data-icons__item'}
+    ).get_text()
+    return article_title, article_link, article_votes, article_views
+
+
+class ParserBackend(ABC):
+    """Strategy pattern class for different habr HTML parsers"""
+
+    name = ''
+
+    @abstractmethod
+    def parse(self, html_data: str) -> List[ArticleFields]:
+        """
+        Parse articles from habr HTML page.
+
+        :param html_data: habr HTML page
+        :return: list with article title, relative link, votes and views tuples,
+        empty list if page has no articles block
+        """
+        raise NotImplementedError
+
+
+class Bs4ParserBackend(ParserBackend):
+    """Reference parser, builds full BeautifulSoup tree of the page"""
+
+    name = 'bs4'
+
+    def parse(self, html_data: str) -> List[ArticleFields]:
+        page_soup = BeautifulSoup(html_data, features='html.parser')
+        articles_page = page_soup.find('div', attrs={'class': ARTICLES_LIST_CLASS})
+        if not articles_page:
+            logging.warning("Return empty list, can't find articles block while parsing html data")
+            return []
+        return [parse_habr_article(article) for article in articles_page.find_all('article')]
+
+
+class StrainedBs4ParserBackend(ParserBackend):
+    """
+    Fast parser, builds BeautifulSoup tree only for articles list block.
+    Uses lxml tree builder if lxml is installed.
+    """
+
+    name = 'strained'
+    articles_list_strainer = SoupStrainer('div', attrs={'class': ARTICLES_LIST_CLASS})
+
+    def parse(self, html_data: str) -> List[ArticleFields]:
+        articles_soup = BeautifulSoup(
+            html_data, features=STRAINED_TREE_FEATURES, parse_only=self.articles_list_strainer
+        )
+        articles_page = articles_soup.find('div', attrs={'class': ARTICLES_LIST_CLASS})
+        if not articles_page:
+            logging.warning("Return empty list, can't find articles block while parsing html data")
+            return []
+        return [parse_habr_article(article) for article in articles_page.find_all('article')]
+
+
+class StreamParserBackend(ParserBackend):
+    """Fastest parser, no tree is built, stops at the end of articles list block"""
+
+    name = 'stream'
+
+    def parse(self, html_data: str) -> List[ArticleFields]:
+        stream_parser = HabrArticlesStreamParser()
+        stream_parser.feed(html_data)
+        if not stream_parser.found_articles_list:
+            logging.warning("Return empty list, can't find articles block while parsing html data")
+        return stream_parser.pop_articles()
+
+
+PARSER_BACKENDS: Dict[str, Type[ParserBackend]] = {
+    backend.name: backend
+    for backend in (Bs4ParserBackend, StrainedBs4ParserBackend, StreamParserBackend)
+}
+
+
+def get_parser_backend(name: str) -> ParserBackend:
+    """
+    Create parser backend by its name from config.yaml.
+
+    :raise ValueError if unknown backend name provided
+    :param name: backend name
+    :return: parser backend instance
+    """
+    if name not in PARSER_BACKENDS:
+        logging.critical('Unknown html parser backend provided: %s', name)
+        raise ValueError
+    return PARSER_BACKENDS[name]()
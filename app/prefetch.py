@@ -0,0 +1,125 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from app.articles_cache import ArticlesCache
+
+
+class HubPrefetcher:
+    """Background scheduler which keeps parsed hub pages warm in articles cache"""
+
+    def __init__(
+            self,
+            cache: ArticlesCache,
+            urls: List[str],
+            interval: float,
+            jitter: float = 0,
+            max_concurrent_refreshes: int = 1
+    ):
+        """
+        Init prefetcher, refreshing starts only after start() call.
+
+        :raise ValueError if interval or max_concurrent_refreshes is not positive,
+        or jitter is negative or not less than interval
+        :param cache: cache to keep warm
+        :param urls: hub urls to refresh
+        :param interval: seconds between refreshes
+        :param jitter: max random seconds added to or subtracted from interval
+        :param max_concurrent_refreshes: max number of hubs refreshed at the same time
+        """
+        if interval <= 0 or max_concurrent_refreshes < 1 or not 0 <= jitter < interval:
+            logging.critical('Invalid prefetcher params provided')
+            raise ValueError
+        self.cache = cache
+        self.urls = list(urls)
+        self.interval = interval
+        self.jitter = jitter
+        self.max_concurrent_refreshes = max_concurrent_refreshes
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, cache: ArticlesCache, urls: List[str], prefetch_config: dict):
+        """
+        Create new prefetcher from "prefetch" section of config.yaml.
+
+        :param cache: cache to keep warm
+        :param urls: hub urls to refresh
+        :param prefetch_config: dict with interval_seconds, jitter_seconds
+        and max_concurrent_refreshes
+        :return: new HubPrefetcher() instance
+        """
+        return cls(
+            cache,
+            urls,
+            interval=prefetch_config['interval_seconds'],
+            jitter=prefetch_config.get('jitter_seconds', 0),
+            max_concurrent_refreshes=prefetch_config.get('max_concurrent_refreshes', 1)
+        )
+
+    def start(self) -> None:
+        """Start refreshing hubs in daemon thread, first refresh is done immediately"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='hub-prefetcher', daemon=True)
+        self._thread.start()
+        logging.info('Hub prefetcher started for %s hubs', len(self.urls))
+
+    def stop(self) -> None:
+        """Stop refreshing and wait for current refresh to finish"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def refresh_all(self) -> Dict[str, bool]:
+        """
+        Refresh all hubs, not more than max_concurrent_refreshes at the same time.
+
+        :return: dict with hub url and refresh outcome
+        """
+        with ThreadPoolExecutor(
+                max_workers=self.max_concurrent_refreshes, thread_name_prefix='hub-prefetch'
+        ) as executor:
+            outcomes = executor.map(self.refresh, self.urls)
+            return dict(zip(self.urls, outcomes))
+
+    def refresh(self, url: str) -> bool:
+        """
+        Refresh one hub and log refresh duration and outcome.
+
+        :param url: hub url
+        :return: True if hub was refreshed, False otherwise
+        """
+        started_at = time.monotonic()
+        try:
+            articles = self.cache.refresh(url)
+        except Exception as exception:  # pylint: disable=broad-except
+            logging.error(
+                'Prefetch of %s failed in %.3fs. Reason: %s',
+                url, time.monotonic() - started_at, exception
+            )
+            return False
+        logging.info(
+            'Prefetch of %s finished in %.3fs, %s articles',
+            url, time.monotonic() - started_at, len(articles)
+        )
+        return True
+
+    def next_delay(self) -> float:
+        """
+        Seconds to wait before next refresh.
+
+        :return: interval with random jitter
+        """
+        return self.interval + random.uniform(-self.jitter, self.jitter)
+
+    def _run(self) -> None:
+        """Refresh hubs until stop() is called"""
+        self.refresh_all()
+        while not self._stop_event.wait(self.next_delay()):
+            self.refresh_all()
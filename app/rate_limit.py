@@ -0,0 +1,64 @@
+import logging
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter: tokens are added with constant rate up to capacity,
+    every action takes one token. Not thread safe, callers hold their own lock.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        """
+        Init full bucket.
+
+        :raise ValueError if rate or capacity is less than one token
+        :param rate: tokens added per second
+        :param capacity: max number of tokens, max burst of actions
+        :param clock: monotonic time function, used in tests
+        """
+        if rate <= 0 or capacity < 1:
+            logging.critical('Invalid token bucket params provided')
+            raise ValueError
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+
+    def wait_time(self) -> float:
+        """
+        Seconds until one token is available.
+
+        :return: 0 if token is available now
+        """
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+
+    def try_acquire(self) -> bool:
+        """
+        Take one token if available.
+
+        :return: True if token was taken
+        """
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def is_full(self) -> bool:
+        """
+        Bucket is full, so it can be dropped and created again without changing limits.
+
+        :return: True if bucket has capacity tokens
+        """
+        self._refill()
+        return self._tokens >= self.capacity
+
+    def _refill(self) -> None:
+        """Add tokens for time passed since last refill"""
+        now = self.clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
@@ -0,0 +1,315 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple, Type, TypeVar
+
+ResultType = TypeVar('ResultType')
+
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+CIRCUIT_STATE_CODES = {CIRCUIT_CLOSED: 0, CIRCUIT_HALF_OPEN: 1, CIRCUIT_OPEN: 2}
+
+
+class CircuitOpenError(ConnectionError):
+    """Request is not sent because circuit breaker of host is open"""
+
+
+class ClientStatusError(ConnectionError):
+    """Server rejected request with client error status, repeating request does not help"""
+
+    def __init__(self, status_code: int):
+        """
+        :param status_code: response status code
+        """
+        super().__init__(f'Client error status {status_code}')
+        self.status_code = status_code
+
+
+class RetryAfterError(ConnectionError):
+    """Server asked to repeat request not earlier than retry_after seconds later"""
+
+    def __init__(self, retry_after: Optional[float] = None):
+        """
+        :param retry_after: seconds from "Retry-After" header, None if header is missing
+        """
+        super().__init__(f'Retry after {retry_after} seconds')
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse "Retry-After" header, it is either number of seconds or HTTP date.
+    Example: "120" -> 120.0, "Wed, 21 Oct 2015 07:28:00 GMT" -> seconds until that time
+
+    :param value: header value
+    :return: not negative seconds or None if header is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        logging.warning('Invalid Retry-After header: %s', value)
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """Bounded retries with exponential backoff and full jitter"""
+
+    def __init__(
+            self,
+            max_attempts: int,
+            base_delay: float,
+            max_delay: float,
+            sleep: Callable[[float], None] = time.sleep,
+            random_share: Callable[[], float] = random.random
+    ):
+        """
+        Init policy.
+
+        :raise ValueError if max_attempts is not positive or delays are negative
+        :param max_attempts: max number of attempts including the first one
+        :param base_delay: max delay before the first retry in seconds, doubled for every retry
+        :param max_delay: max delay before retry in seconds
+        :param sleep: sleep function, used in tests
+        :param random_share: function returning random number from 0 to 1, used in tests
+        """
+        if max_attempts < 1 or base_delay < 0 or max_delay < 0:
+            logging.critical('Invalid retry policy params provided')
+            raise ValueError
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.random_share = random_share
+
+    @classmethod
+    def from_config(cls, policy_config: dict):
+        """
+        Create new policy from "fetch_policy" section of config.yaml.
+
+        :param policy_config: dict with max_attempts, base_delay_seconds and max_delay_seconds
+        :return: new RetryPolicy() instance
+        """
+        return cls(
+            max_attempts=policy_config['max_attempts'],
+            base_delay=policy_config['base_delay_seconds'],
+            max_delay=policy_config['max_delay_seconds']
+        )
+
+    def delay(self, retry_number: int) -> float:
+        """
+        Random delay before retry, from 0 to min(max_delay, base_delay * 2 ** retry_number).
+
+        :param retry_number: number of retry starting from 0
+        :return: seconds
+        """
+        return self.random_share() * min(self.max_delay, self.base_delay * 2 ** retry_number)
+
+    def call(
+            self,
+            function: Callable[..., ResultType],
+            *args,
+            retry_on: Tuple[Type[Exception], ...] = (ConnectionError,),
+            **kwargs
+    ) -> ResultType:
+        """
+        Call function, retry it on provided exceptions. Circuit breaker rejections
+        and client error statuses are not retried. Retry after RetryAfterError waits
+        at least its retry_after, it is not retried if retry_after is longer than max_delay.
+
+        :raise the last exception if all attempts failed
+        :param function: function to call
+        :param args: function params
+        :param retry_on: exceptions which are retried
+        :param kwargs: function keyword params
+        :return: function result
+        """
+        retry_number = 0
+        while True:
+            try:
+                return function(*args, **kwargs)
+            except (CircuitOpenError, ClientStatusError):
+                raise
+            except retry_on as exception:
+                if retry_number + 1 >= self.max_attempts:
+                    raise
+                delay = self.delay(retry_number)
+                retry_after = getattr(exception, 'retry_after', None)
+                if retry_after is not None:
+                    if retry_after > self.max_delay:
+                        logging.warning(
+                            'Attempt %s failed: %r, retry after is longer than max delay',
+                            retry_number + 1, exception
+                        )
+                        raise
+                    delay = max(delay, retry_after)
+                logging.warning(
+                    'Attempt %s failed: %r, retry in %.2f seconds',
+                    retry_number + 1, exception, delay
+                )
+                self.sleep(delay)
+                retry_number += 1
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one host. Opens after failure_threshold consecutive failures and
+    rejects requests for reset_timeout seconds, then lets one trial request through:
+    success closes circuit, failure opens it again.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            failure_threshold: int,
+            reset_timeout: float,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Init closed circuit.
+
+        :raise ValueError if failure_threshold or reset_timeout is not positive
+        :param name: breaker name for logs, usually host
+        :param failure_threshold: consecutive failures which open circuit
+        :param reset_timeout: seconds circuit stays open before trial request
+        :param clock: monotonic time function, used in tests
+        """
+        if failure_threshold < 1 or reset_timeout <= 0:
+            logging.critical('Invalid circuit breaker params provided')
+            raise ValueError
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CIRCUIT_CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._counters = {'opened': 0, 'half_opened': 0, 'closed': 0, 'rejected': 0}
+
+    def allow_request(self) -> bool:
+        """
+        Check if request may be sent. After reset_timeout only one trial request is allowed
+        until its result is recorded.
+
+        :return: True if request may be sent
+        """
+        with self._lock:
+            if self.state == CIRCUIT_OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+                self._transition(CIRCUIT_HALF_OPEN)
+            if self.state == CIRCUIT_CLOSED:
+                return True
+            if self.state == CIRCUIT_HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._counters['rejected'] += 1
+            return False
+
+    def record_success(self) -> None:
+        """Record successful request, closes half open circuit"""
+        with self._lock:
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+            if self.state != CIRCUIT_CLOSED:
+                self._transition(CIRCUIT_CLOSED)
+
+    def record_failure(self) -> None:
+        """Record failed request, opens circuit after threshold or failed trial request"""
+        with self._lock:
+            self._consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == CIRCUIT_HALF_OPEN or (
+                    self.state == CIRCUIT_CLOSED
+                    and self._consecutive_failures >= self.failure_threshold
+            ):
+                self._opened_at = self.clock()
+                self._transition(CIRCUIT_OPEN)
+
+    def stats(self) -> dict:
+        """
+        Breaker state and counters.
+
+        :return: dict with state code (0 closed, 1 half open, 2 open), number of transitions
+        to every state and rejected requests count
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['state'] = CIRCUIT_STATE_CODES[self.state]
+        return stats
+
+    def _transition(self, state: str) -> None:
+        """
+        Change state and count transition. Caller holds lock.
+
+        :param state: new state
+        """
+        logging.warning('Circuit breaker %s: %s -> %s', self.name, self.state, state)
+        self.state = state
+        self._counters[{
+            CIRCUIT_OPEN: 'opened', CIRCUIT_HALF_OPEN: 'half_opened', CIRCUIT_CLOSED: 'closed'
+        }[state]] += 1
+
+
+class CircuitBreakers:
+    """Circuit breakers by host, created on first request to host"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        :raise ValueError if failure_threshold or reset_timeout is not positive
+        :param failure_threshold: consecutive failures which open circuit
+        :param reset_timeout: seconds circuit stays open before trial request
+        """
+        if failure_threshold < 1 or reset_timeout <= 0:
+            logging.critical('Invalid circuit breaker params provided')
+            raise ValueError
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, policy_config: dict):
+        """
+        Create breakers from "fetch_policy" section of config.yaml.
+
+        :param policy_config: dict with failure_threshold and reset_timeout_seconds
+        :return: new CircuitBreakers() instance
+        """
+        return cls(policy_config['failure_threshold'], policy_config['reset_timeout_seconds'])
+
+    def get(self, host: str) -> CircuitBreaker:
+        """
+        Breaker of host.
+
+        :param host: host with port if provided in url
+        :return: circuit breaker
+        """
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(
+                    host, self.failure_threshold, self.reset_timeout
+                )
+            return breaker
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Stats of every breaker.
+
+        :return: dict with host and breaker stats
+        """
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.stats() for host, breaker in breakers.items()}
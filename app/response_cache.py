@@ -0,0 +1,154 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import namedtuple
+from typing import List, Optional
+
+from app.article import Article
+from app.helpers import parse_config
+
+PATH_TO_CONFIG_FILE = 'config.yaml'
+config = parse_config(PATH_TO_CONFIG_FILE)
+
+CachedResponse = namedtuple(
+    'CachedResponse', ['url', 'etag', 'last_modified', 'body', 'articles']
+)
+
+
+class ResponseCache:
+    """On-disk cache of habr responses with validators and parsed articles, survives restarts"""
+
+    file_extension = '.json'
+
+    def __init__(self, directory: str, max_bytes: int):
+        """
+        Init cache in provided directory, directory is created if not exists.
+
+        :raise ValueError if not string directory or not positive max_bytes provided
+        :param directory: path to directory with cached responses
+        :param max_bytes: max total size of cached files, oldest used files are evicted
+        """
+        if not isinstance(directory, str) or max_bytes < 1:
+            logging.critical('Invalid response cache params provided')
+            raise ValueError
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, cache_config: dict):
+        """
+        Create new cache from "response_cache" section of config.yaml.
+
+        :param cache_config: dict with directory and max_bytes
+        :return: new ResponseCache() instance
+        """
+        return cls(cache_config['directory'], cache_config['max_bytes'])
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """
+        Get cached response by url. Successful read marks entry as recently used.
+
+        :param url: habr url
+        :return: CachedResponse() or None if url is not cached or cache file is broken
+        """
+        path = self._path(url)
+        try:
+            with open(path, 'r', encoding='utf 8') as file:
+                data = json.load(file)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exception:
+            logging.warning('Broken response cache file %s. Reason: %s', path, exception)
+            return None
+        articles = [Article.build_from_list(fields) for fields in data['articles']]
+        return CachedResponse(
+            data['url'], data['etag'], data['last_modified'], data['body'], articles
+        )
+
+    def put(
+            self,
+            url: str,
+            etag: Optional[str],
+            last_modified: Optional[str],
+            body: Optional[str],
+            articles: List[Article]
+    ) -> None:
+        """
+        Store response with validators and parsed articles. Responses without validators
+        are not stored because they can't be revalidated.
+
+        :param url: habr url
+        :param etag: ETag response header
+        :param last_modified: Last-Modified response header
+        :param body: response HTML, None for responses parsed while streaming
+        :param articles: articles parsed from response HTML
+        """
+        if not etag and not last_modified:
+            return
+        data = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'body': body,
+            'articles': [
+                [article.title, article.link, article.votes, article.views]
+                for article in articles
+            ],
+        }
+        path = self._path(url)
+        temporary_path = f'{path}.{threading.get_ident()}.tmp'
+        with self._lock:
+            with open(temporary_path, 'w', encoding='utf 8') as file:
+                json.dump(data, file, ensure_ascii=False)
+            os.replace(temporary_path, path)
+            self._evict()
+
+    def size(self) -> int:
+        """
+        Total size of cached files.
+
+        :return: size in bytes
+        """
+        return sum(os.path.getsize(path) for path in self._cache_files())
+
+    def _evict(self) -> None:
+        """Remove least recently used files while total size is over max_bytes"""
+        files = sorted(self._cache_files(), key=os.path.getmtime)
+        total_size = sum(os.path.getsize(path) for path in files)
+        while files and total_size > self.max_bytes:
+            path = files.pop(0)
+            total_size -= os.path.getsize(path)
+            os.remove(path)
+            logging.info('Evict %s from response cache', path)
+
+    def _cache_files(self) -> List[str]:
+        """
+        Paths of all cached files.
+
+        :return: list with file paths
+        """
+        return [
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if name.endswith(self.file_extension)
+        ]
+
+    def _path(self, url: str) -> str:
+        """
+        Cache file path for url.
+
+        :param url: habr url
+        :return: file path
+        """
+        url_hash = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{url_hash}{self.file_extension}')
+
+
+response_cache = (
+    ResponseCache.from_config(config['response_cache'])
+    if config['response_cache']['enabled'] else None
+)
@@ -0,0 +1,168 @@
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.article import Article
+from app.helpers import parse_config
+
+PATH_TO_CONFIG_FILE = 'config.yaml'
+config = parse_config(PATH_TO_CONFIG_FILE)
+
+PAGE_CALLBACK_PREFIX = 'page'
+TOKEN_BYTES = 6
+
+ResultSet = namedtuple('ResultSet', ['articles', 'stored_at'])
+ResultPage = namedtuple('ResultPage', ['token', 'articles', 'number', 'pages_count'])
+
+
+class ResultPages:
+    """
+    Command results split into pages of page_size articles. Result sets are stored in memory
+    by short random token with TTL and LRU eviction, so paging buttons only carry token and
+    page number and pages are served without requests to habr.
+    """
+
+    def __init__(
+            self,
+            page_size: int,
+            ttl: float,
+            max_entries: int,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Init empty storage.
+
+        :raise ValueError if page_size, ttl or max_entries is not positive
+        :param page_size: max number of articles on one page
+        :param ttl: seconds while result set is available for paging
+        :param max_entries: max number of stored result sets, least recently used are evicted
+        :param clock: monotonic time source
+        """
+        if page_size < 1 or ttl <= 0 or max_entries < 1:
+            logging.critical('Invalid result pages params provided')
+            raise ValueError
+        self.page_size = page_size
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._result_sets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {'stored': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
+
+    @classmethod
+    def from_config(cls, pagination_config: dict):
+        """
+        Create new storage from "pagination" section of config.yaml.
+
+        :param pagination_config: dict with page_size, ttl_seconds and max_entries
+        :return: new ResultPages() instance
+        """
+        return cls(
+            page_size=pagination_config['page_size'],
+            ttl=pagination_config['ttl_seconds'],
+            max_entries=pagination_config['max_entries']
+        )
+
+    def pages_count(self, articles_count: int) -> int:
+        """
+        Number of pages.
+
+        :param articles_count: number of articles in result set
+        :return: pages count, 0 for empty result set
+        """
+        return (articles_count + self.page_size - 1) // self.page_size
+
+    def put(self, articles: List[Article]) -> ResultPage:
+        """
+        Store result set, evicting least recently used result sets over max_entries.
+
+        :param articles: list with all articles of command result
+        :return: the first page
+        """
+        with self._lock:
+            token = secrets.token_urlsafe(TOKEN_BYTES)
+            while token in self._result_sets:
+                token = secrets.token_urlsafe(TOKEN_BYTES)
+            self._result_sets[token] = ResultSet(list(articles), self._clock())
+            self._counters['stored'] += 1
+            while len(self._result_sets) > self.max_entries:
+                self._result_sets.popitem(last=False)
+                self._counters['evictions'] += 1
+        return self._page(token, articles, 0)
+
+    def get_page(self, token: str, number: int) -> Optional[ResultPage]:
+        """
+        Get page of stored result set.
+
+        :param token: result set token
+        :param number: page number starting from 0
+        :return: page or None if result set is expired, evicted or page does not exist
+        """
+        with self._lock:
+            result_set = self._result_sets.get(token)
+            if result_set is not None and self._clock() - result_set.stored_at >= self.ttl:
+                del self._result_sets[token]
+                result_set = None
+            if result_set is None or not 0 <= number < self.pages_count(len(result_set.articles)):
+                self._counters['misses'] += 1
+                return None
+            self._counters['hits'] += 1
+            self._result_sets.move_to_end(token)
+        return self._page(token, result_set.articles, number)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Storage counters.
+
+        :return: dict with stored result sets, page hits and misses, evictions and size
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats['size'] = len(self._result_sets)
+        return stats
+
+    def _page(self, token: str, articles: List[Article], number: int) -> ResultPage:
+        """
+        Cut page from result set.
+
+        :param token: result set token
+        :param articles: all articles of result set
+        :param number: page number starting from 0
+        :return: page
+        """
+        start = number * self.page_size
+        return ResultPage(
+            token, articles[start:start + self.page_size], number, self.pages_count(len(articles))
+        )
+
+
+def page_callback_data(token: str, number: int) -> str:
+    """
+    Callback data of paging button, fits telegram 64 bytes limit.
+    Example: ("Ab3_x-9Q", 2) -> "page:Ab3_x-9Q:2"
+
+    :param token: result set token
+    :param number: page number starting from 0
+    :return: callback data
+    """
+    return f'{PAGE_CALLBACK_PREFIX}:{token}:{number}'
+
+
+def parse_page_callback_data(data: str) -> Tuple[str, int]:
+    """
+    Parse callback data of paging button.
+
+    :raise ValueError if data is not paging button data
+    :param data: callback data
+    :return: tuple with result set token and page number
+    """
+    prefix, token, number = data.split(':')
+    if prefix != PAGE_CALLBACK_PREFIX or not token:
+        raise ValueError
+    return token, int(number)
+
+
+result_pages = ResultPages.from_config(config['pagination'])
@@ -0,0 +1,136 @@
+import logging
+import threading
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from app.article import Article
+from app.articles_cache import ArticlesCache
+from app.articles_parser import search_habr_articles
+from app.helpers import normalize_search_query, parse_config
+
+PATH_TO_CONFIG_FILE = 'config.yaml'
+config = parse_config(PATH_TO_CONFIG_FILE)
+
+
+class SearchResultsCache:
+    """
+    TTL + LRU cache of habr search results keyed by normalized query, with its own size budget.
+    Counts queries to report the most popular ones.
+    """
+
+    def __init__(
+            self,
+            ttl: float,
+            max_entries: int,
+            stale_ttl: float = 0,
+            tracked_queries_limit: int = 1000
+    ):
+        """
+        Init empty cache.
+
+        :raise ValueError if ttl, max_entries or tracked_queries_limit is not positive
+        or stale_ttl is negative
+        :param ttl: seconds while cached search result is considered fresh
+        :param max_entries: max number of cached search results
+        :param stale_ttl: seconds after ttl while stale result is served and refreshed in background
+        :param tracked_queries_limit: max number of distinct queries counted for popularity
+        """
+        if tracked_queries_limit < 1:
+            logging.critical('Invalid search results cache params provided')
+            raise ValueError
+        self._cache: ArticlesCache[List[Article]] = ArticlesCache(
+            self._search, ttl=ttl, max_entries=max_entries, stale_ttl=stale_ttl
+        )
+        self.tracked_queries_limit = tracked_queries_limit
+        self._queries_counter: Counter = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, cache_config: dict):
+        """
+        Create new cache from "search_cache" section of config.yaml.
+
+        :param cache_config: dict with ttl_seconds, stale_seconds, max_entries
+        and tracked_queries_limit
+        :return: new SearchResultsCache() instance
+        """
+        return cls(
+            ttl=cache_config['ttl_seconds'],
+            max_entries=cache_config['max_entries'],
+            stale_ttl=cache_config.get('stale_seconds', 0),
+            tracked_queries_limit=cache_config.get('tracked_queries_limit', 1000)
+        )
+
+    def get(self, search_url: str, user_query: str) -> List[Article]:
+        """
+        Get search results from cache, search on habr on cache miss.
+
+        :raises ValueError if not sting params provided,
+        ConnectionError if external service not available
+        :param search_url: habr search url without query
+        :param user_query: search query from user message
+        :return: list with found articles
+        """
+        query = normalize_search_query(user_query)
+        self._count_query(query)
+        return self._cache.get((search_url, query))
+
+    def peek(self, search_url: str, user_query: str) -> Optional[List[Article]]:
+        """
+        Get cached search results regardless of their age, without search on habr,
+        query popularity and cache counters are not changed.
+
+        :raises ValueError if not string query provided
+        :param search_url: habr search url without query
+        :param user_query: search query from user message
+        :return: list with found articles or None if query is not cached
+        """
+        return self._cache.peek((search_url, normalize_search_query(user_query)))
+
+    def stats(self) -> dict:
+        """
+        Cache counters.
+
+        :return: dict with articles cache counters and hit rate
+        """
+        stats = self._cache.stats()
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['hits'] + stats['stale_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def popular_queries(self, limit: int) -> List[Tuple[str, int]]:
+        """
+        Most popular normalized queries, candidates for cache pre-warming.
+
+        :param limit: max number of queries
+        :return: list with query and its count tuples
+        """
+        with self._lock:
+            return self._queries_counter.most_common(limit)
+
+    def _count_query(self, query: str) -> None:
+        """
+        Count query, the least popular queries are dropped over tracked_queries_limit.
+
+        :param query: normalized query
+        """
+        with self._lock:
+            self._queries_counter[query] += 1
+            if len(self._queries_counter) > self.tracked_queries_limit * 2:
+                self._queries_counter = Counter(
+                    dict(self._queries_counter.most_common(self.tracked_queries_limit))
+                )
+
+    @staticmethod
+    def _search(key: Tuple[str, str]) -> List[Article]:
+        """
+        Cache loader, searches articles on habr.
+
+        :param key: tuple with search url and normalized query
+        :return: list with found articles
+        """
+        search_url, query = key
+        return search_habr_articles(search_url, query)
+
+
+search_results_cache = SearchResultsCache.from_config(config['search_cache'])
@@ -0,0 +1,133 @@
+import logging
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Set
+
+from app.article import Article
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+CYRILLIC_PATTERN = re.compile(r'[а-я]')
+MIN_STEM_LENGTH = 3
+RUSSIAN_ENDINGS = sorted(
+    (
+        'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ого', 'его', 'ому', 'ему', 'ими', 'ыми',
+        'ая', 'яя', 'ое', 'ее', 'ие', 'ые', 'ой', 'ей', 'ий', 'ый', 'ом', 'ем', 'ам', 'ям', 'ах',
+        'ях', 'ую', 'юю', 'ия', 'ья', 'ов', 'ев', 'ть', 'ти', 'ся', 'сь',
+        'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+    ),
+    key=len,
+    reverse=True
+)
+ENGLISH_ENDINGS = ('ing', 'ies', 'es', 'ed', 's')
+
+
+def normalize_token(token: str) -> str:
+    """
+    Normalize one word: lowercase, "ё" to "е" and strip common russian or english ending.
+    Example: "Тестирования" -> "тестирован", "Tests" -> "test"
+
+    :param token: word
+    :return: normalized word
+    """
+    token = token.lower().replace('ё', 'е')
+    endings = RUSSIAN_ENDINGS if CYRILLIC_PATTERN.search(token) else ENGLISH_ENDINGS
+    for ending in endings:
+        if token.endswith(ending) and len(token) - len(ending) >= MIN_STEM_LENGTH:
+            return token[:-len(ending)]
+    return token
+
+
+def tokenize(text: str) -> Set[str]:
+    """
+    Split text into set of normalized words.
+
+    :param text: article title or search query
+    :return: set with normalized words
+    """
+    return {normalize_token(token) for token in TOKEN_PATTERN.findall(text)}
+
+
+def popularity(article: Article) -> float:
+    """
+    Article popularity used to rank articles with the same terms match.
+
+    :param article: article
+    :return: popularity by views and votes score
+    """
+    votes_popularity = math.copysign(math.log1p(abs(article.score)), article.score)
+    return math.log1p(article.views_count) + votes_popularity
+
+
+class SearchIndex:
+    """In-memory inverted index over titles of parsed articles"""
+
+    def __init__(self):
+        self._articles: Dict[str, Article] = {}
+        self._tokens_by_link: Dict[str, Set[str]] = {}
+        self._links_by_token: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._articles)
+
+    def add_articles(self, articles: List[Article]) -> None:
+        """
+        Add articles to index, known articles are replaced with fresh votes and views.
+
+        :param articles: parsed articles
+        """
+        with self._lock:
+            for article in articles:
+                tokens = tokenize(article.title)
+                previous_tokens = self._tokens_by_link.get(article.link, set())
+                for token in previous_tokens - tokens:
+                    self._links_by_token[token].discard(article.link)
+                    if not self._links_by_token[token]:
+                        del self._links_by_token[token]
+                for token in tokens - previous_tokens:
+                    self._links_by_token[token].add(article.link)
+                self._tokens_by_link[article.link] = tokens
+                self._articles[article.link] = article
+
+    def on_articles(self, _: str, articles: List[Article]) -> None:
+        """
+        Articles listener, adds every parsed article to index.
+
+        :param _: habr url
+        :param articles: parsed articles
+        """
+        self.add_articles(articles)
+
+    def search(self, query: str, limit: int, min_match_ratio: float = 1.0) -> List[Article]:
+        """
+        Find articles by title words. Articles are ranked by share of matched query words,
+        then by popularity.
+
+        :param query: search query
+        :param limit: max number of articles
+        :param min_match_ratio: min share of query words title must contain
+        :return: list with articles
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+        matches: Dict[str, int] = defaultdict(int)
+        with self._lock:
+            for token in query_tokens:
+                for link in self._links_by_token.get(token, ()):
+                    matches[link] += 1
+            candidates = [
+                (matched_count / len(query_tokens), self._articles[link])
+                for link, matched_count in matches.items()
+                if matched_count / len(query_tokens) >= min_match_ratio
+            ]
+        candidates.sort(
+            key=lambda candidate: (candidate[0], popularity(candidate[1])), reverse=True
+        )
+        logging.info('Found %s articles in search index by query %s', len(candidates), query)
+        return [article for _, article in candidates[:limit]]
+
+
+search_index = SearchIndex()
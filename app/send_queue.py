@@ -0,0 +1,343 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from telegram.error import RetryAfter
+
+from app.helpers import parse_config
+from app.metrics import BACKGROUND_COMMAND, NO_HUB, metrics
+from app.rate_limit import TokenBucket
+
+PATH_TO_CONFIG_FILE = 'config.yaml'
+config = parse_config(PATH_TO_CONFIG_FILE)
+
+PRIORITY_REPLY = 0
+PRIORITY_BROADCAST = 1
+PRIORITIES = (PRIORITY_REPLY, PRIORITY_BROADCAST)
+PRIORITY_NAMES = ('reply', 'broadcast')
+PRUNE_BUCKETS_THRESHOLD = 1024
+
+
+class OutgoingMessage:
+    """Message waiting in send queue"""
+
+    __slots__ = (
+        'chat_id', 'text', 'kwargs', 'priority', 'enqueued_at', 'attempts', 'command', 'hub'
+    )
+
+    def __init__(
+            self,
+            chat_id: int,
+            text: str,
+            kwargs: dict,
+            priority: int,
+            enqueued_at: float,
+            command: str = BACKGROUND_COMMAND,
+            hub: str = NO_HUB
+    ):
+        self.chat_id = chat_id
+        self.text = text
+        self.kwargs = kwargs
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+        self.attempts = 0
+        self.command = command
+        self.hub = hub
+
+
+class SendQueue:
+    """
+    Outbound telegram messages queue. Messages are sent by worker threads within global
+    and per chat rate limits, direct replies are sent before broadcasts. Messages of one
+    chat are sent in order, one at a time. On "429 Too Many Requests" chat is paused
+    for retry_after seconds and message is sent again.
+    """
+
+    def __init__(
+            self,
+            global_rate: float,
+            global_burst: float,
+            chat_rate: float,
+            chat_burst: float,
+            max_queue_size: int,
+            workers: int = 1,
+            max_retries: int = 3,
+            clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Init empty queue, messages are sent after start().
+
+        :raise ValueError if rates, max_queue_size or workers are not positive,
+        bursts are less than one message or max_retries is negative
+        :param global_rate: messages per second to all chats
+        :param global_burst: max number of messages to all chats sent at once
+        :param chat_rate: messages per second to one chat
+        :param chat_burst: max number of messages to one chat sent at once
+        :param max_queue_size: max number of waiting messages
+        :param workers: number of sending threads
+        :param max_retries: max number of resends of one message after "429 Too Many Requests"
+        :param clock: monotonic time function, used in tests
+        """
+        if (
+                chat_rate <= 0 or chat_burst < 1 or max_queue_size < 1 or workers < 1
+                or max_retries < 0
+        ):
+            logging.critical('Invalid send queue params provided')
+            raise ValueError
+        self.global_bucket = TokenBucket(global_rate, global_burst, clock)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_queue_size = max_queue_size
+        self.workers = workers
+        self.max_retries = max_retries
+        self.clock = clock
+        self._pending: List[Dict[int, Deque[OutgoingMessage]]] = [
+            OrderedDict() for _ in PRIORITIES
+        ]
+        self._pending_count = [0 for _ in PRIORITIES]
+        self._chat_buckets: Dict[int, TokenBucket] = {}
+        self._prune_buckets_threshold = PRUNE_BUCKETS_THRESHOLD
+        self._paused_until: Dict[int, float] = {}
+        self._in_flight: Set[int] = set()
+        self._condition = threading.Condition()
+        self._stopped = True
+        self._threads: List[threading.Thread] = []
+        self._send_message: Optional[Callable[..., Any]] = None
+        self._counters = {'sent': 0, 'failed': 0, 'rejected': 0, 'retry_after': 0}
+        self._total_latency = 0.0
+        self._max_latency = 0.0
+
+    @classmethod
+    def from_config(cls, queue_config: dict):
+        """
+        Create new queue from "send_queue" section of config.yaml.
+
+        :param queue_config: dict with global_rate, global_burst, chat_rate, chat_burst,
+        max_queue_size, workers and max_retries
+        :return: new SendQueue() instance
+        """
+        return cls(
+            global_rate=queue_config['global_rate'],
+            global_burst=queue_config['global_burst'],
+            chat_rate=queue_config['chat_rate'],
+            chat_burst=queue_config['chat_burst'],
+            max_queue_size=queue_config['max_queue_size'],
+            workers=queue_config.get('workers', 1),
+            max_retries=queue_config.get('max_retries', 3)
+        )
+
+    def start(self, send_message: Callable[..., Any]) -> None:
+        """
+        Start sending threads.
+
+        :param send_message: function with chat id, text and telegram send_message keyword
+        params, e.g. telegram.Bot.send_message
+        """
+        self._send_message = send_message
+        self._stopped = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f'send-queue-{index}', daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logging.info('Send queue started with %s workers', self.workers)
+
+    def stop(self) -> None:
+        """Stop sending threads, waiting messages are dropped"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        logging.info('Send queue stopped, %s messages dropped', sum(self._pending_count))
+
+    def put(self, chat_id: int, text: str, priority: int = PRIORITY_REPLY, **kwargs: Any) -> bool:
+        """
+        Queue message without waiting. Command and hub of current thread are kept
+        for send time metrics labels.
+
+        :param chat_id: telegram chat id
+        :param text: message text
+        :param priority: PRIORITY_REPLY or PRIORITY_BROADCAST
+        :param kwargs: telegram send_message keyword params, e.g. parse_mode
+        :return: True if message is queued, False if queue is full
+        """
+        with self._condition:
+            if sum(self._pending_count) >= self.max_queue_size:
+                self._counters['rejected'] += 1
+                logging.warning('Send queue is full, message to chat %s rejected', chat_id)
+                return False
+            message = OutgoingMessage(
+                chat_id, text, kwargs, priority, self.clock(),
+                command=metrics.current_command(), hub=metrics.current_hub()
+            )
+            self._pending[priority].setdefault(chat_id, deque()).append(message)
+            self._pending_count[priority] += 1
+            self._condition.notify()
+        return True
+
+    def stats(self) -> dict:
+        """
+        Queue counters.
+
+        :return: dict with waiting replies and broadcasts, sent, failed and rejected messages,
+        "429 Too Many Requests" responses count, average and max seconds from queueing to send
+        """
+        with self._condition:
+            stats = dict(self._counters)
+            stats['queued_replies'] = self._pending_count[PRIORITY_REPLY]
+            stats['queued_broadcasts'] = self._pending_count[PRIORITY_BROADCAST]
+            stats['average_latency'] = (
+                self._total_latency / stats['sent'] if stats['sent'] else 0.0
+            )
+            stats['max_latency'] = self._max_latency
+        return stats
+
+    def _run(self) -> None:
+        """Send messages until stop() is called"""
+        while True:
+            with self._condition:
+                message = self._take_next_message()
+                while message is None and not self._stopped:
+                    self._condition.wait(self._next_wait_time())
+                    message = self._take_next_message()
+                if self._stopped:
+                    if message is not None:
+                        self._requeue(message)
+                    return
+            self._send(message)
+
+    def _send(self, message: OutgoingMessage) -> None:
+        """
+        Send message, message is queued again after "429 Too Many Requests".
+
+        :param message: message taken from queue
+        """
+        message.attempts += 1
+        try:
+            with metrics.timer(
+                    'telegram_send_seconds',
+                    priority=PRIORITY_NAMES[message.priority],
+                    command=message.command,
+                    hub=message.hub
+            ):
+                self._send_message(message.chat_id, message.text, **message.kwargs)
+        except RetryAfter as exception:
+            logging.warning(
+                'Too many requests to chat %s, retry after %s seconds',
+                message.chat_id, exception.retry_after
+            )
+            with self._condition:
+                self._counters['retry_after'] += 1
+                self._paused_until[message.chat_id] = self.clock() + exception.retry_after
+                if message.attempts <= self.max_retries:
+                    self._requeue(message)
+                else:
+                    self._counters['failed'] += 1
+        except Exception:  # pylint: disable=broad-except
+            logging.exception("Can't send message to chat %s", message.chat_id)
+            with self._condition:
+                self._counters['failed'] += 1
+        else:
+            latency = self.clock() - message.enqueued_at
+            with self._condition:
+                self._counters['sent'] += 1
+                self._total_latency += latency
+                self._max_latency = max(self._max_latency, latency)
+        finally:
+            with self._condition:
+                self._in_flight.discard(message.chat_id)
+                self._condition.notify_all()
+
+    def _take_next_message(self) -> Optional[OutgoingMessage]:
+        """
+        Take first message of the first chat which can be sent to now, replies first.
+        Chats are served in round robin order. Caller holds lock.
+
+        :return: message or None if no message can be sent now
+        """
+        if self.global_bucket.wait_time() > 0:
+            return None
+        now = self.clock()
+        for priority in PRIORITIES:
+            for chat_id, chat_messages in self._pending[priority].items():
+                if not self._can_send_to(chat_id, now):
+                    continue
+                self.global_bucket.try_acquire()
+                self._chat_buckets[chat_id].try_acquire()
+                message = chat_messages.popleft()
+                if chat_messages:
+                    self._pending[priority].move_to_end(chat_id)
+                else:
+                    del self._pending[priority][chat_id]
+                self._pending_count[priority] -= 1
+                self._in_flight.add(chat_id)
+                self._paused_until.pop(chat_id, None)
+                self._prune_chat_buckets()
+                return message
+        return None
+
+    def _can_send_to(self, chat_id: int, now: float) -> bool:
+        """
+        Chat has no message being sent, is not paused and has token in its bucket.
+        Caller holds lock.
+
+        :param chat_id: telegram chat id
+        :param now: current monotonic time
+        :return: True if message can be sent to chat now
+        """
+        if chat_id in self._in_flight or self._paused_until.get(chat_id, 0) > now:
+            return False
+        if chat_id not in self._chat_buckets:
+            self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst, self.clock)
+        return self._chat_buckets[chat_id].wait_time() == 0
+
+    def _next_wait_time(self) -> Optional[float]:
+        """
+        Seconds until some waiting message may be sent. Caller holds lock.
+
+        :return: seconds or None if no messages are waiting
+        """
+        now = self.clock()
+        chat_wait_times = []
+        for pending in self._pending:
+            for chat_id in pending:
+                if chat_id in self._in_flight:
+                    continue
+                chat_wait_time = self._paused_until.get(chat_id, 0) - now
+                if chat_id in self._chat_buckets:
+                    chat_wait_time = max(chat_wait_time, self._chat_buckets[chat_id].wait_time())
+                chat_wait_times.append(chat_wait_time)
+        if not chat_wait_times:
+            # nothing is waiting or all waiting chats are being sent, notify wakes worker
+            return None
+        return max(self.global_bucket.wait_time(), min(chat_wait_times), 0.001)
+
+    def _requeue(self, message: OutgoingMessage) -> None:
+        """
+        Put message back before other messages of its chat. Caller holds lock.
+
+        :param message: message taken from queue
+        """
+        self._pending[message.priority].setdefault(message.chat_id, deque()).appendleft(message)
+        self._pending_count[message.priority] += 1
+        self._condition.notify()
+
+    def _prune_chat_buckets(self) -> None:
+        """Drop full buckets of chats without waiting messages. Caller holds lock."""
+        if len(self._chat_buckets) <= self._prune_buckets_threshold:
+            return
+        for chat_id in [
+            chat_id for chat_id, bucket in self._chat_buckets.items()
+            if bucket.is_full() and all(chat_id not in pending for pending in self._pending)
+        ]:
+            del self._chat_buckets[chat_id]
+        self._prune_buckets_threshold = max(
+            PRUNE_BUCKETS_THRESHOLD, len(self._chat_buckets) * 2
+        )
+
+
+send_queue = SendQueue.from_config(config['send_queue'])
@@ -0,0 +1,77 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class InFlightCall:
+    """Result holder of function call shared between concurrent callers"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.exception: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: first caller runs the function,
+    others wait for it and get the same result or exception.
+    """
+
+    def __init__(self, name: str = ''):
+        """
+        Init without in-flight calls.
+
+        :param name: name used in logs
+        """
+        self.name = name
+        self._calls: Dict[Hashable, InFlightCall] = {}
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {'executed': 0, 'coalesced': 0}
+
+    def do(self, key: Hashable, function: Callable, *args, **kwargs) -> Any:
+        """
+        Call function or wait for the same in-flight call.
+
+        :param key: key of call, calls with equal keys are coalesced
+        :param function: function to call
+        :param args: function positional arguments
+        :param kwargs: function keyword arguments
+        :return: function result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = InFlightCall()
+                self._calls[key] = call
+                self._counters['executed'] += 1
+            else:
+                self._counters['coalesced'] += 1
+
+        if not is_leader:
+            logging.info('Wait for in-flight %s call with key %s', self.name, key)
+            call.done.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = function(*args, **kwargs)
+            return call.result
+        except BaseException as exception:
+            call.exception = exception
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Coalescing counters.
+
+        :return: dict with executed and coalesced calls count
+        """
+        with self._lock:
+            return dict(self._counters)
@@ -0,0 +1,240 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from app.article import Article
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    link TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    votes TEXT NOT NULL,
+    views TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    views_count INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_last_seen_index ON articles (last_seen);
+CREATE INDEX IF NOT EXISTS articles_views_count_index ON articles (views_count);
+CREATE TABLE IF NOT EXISTS article_hubs (
+    hub TEXT NOT NULL,
+    link TEXT NOT NULL REFERENCES articles (link) ON DELETE CASCADE,
+    first_seen REAL NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (hub, link)
+);
+CREATE INDEX IF NOT EXISTS article_hubs_latest_index ON article_hubs (hub, first_seen, position);
+CREATE INDEX IF NOT EXISTS article_hubs_link_index ON article_hubs (link);
+"""
+UPSERT_ARTICLE_QUERY = """
+INSERT INTO articles (link, title, votes, views, score, views_count, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (link) DO UPDATE SET
+    title = excluded.title,
+    votes = excluded.votes,
+    views = excluded.views,
+    score = excluded.score,
+    views_count = excluded.views_count,
+    last_seen = excluded.last_seen
+"""
+UPSERT_ARTICLE_HUB_QUERY = """
+INSERT INTO article_hubs (hub, link, first_seen, position) VALUES (?, ?, ?, ?)
+ON CONFLICT (hub, link) DO NOTHING
+"""
+ARTICLE_COLUMNS = 'articles.title, articles.link, articles.votes, articles.views'
+
+
+class ArticleStore:
+    """Persistent SQLite storage of every parsed article with first and last seen time"""
+
+    def __init__(self, path: str):
+        """
+        Open database in WAL mode, create tables and indexes if not exist.
+
+        :raise ValueError if not string path provided
+        :param path: path to database file, ":memory:" for in-memory database
+        """
+        if not isinstance(path, str):
+            logging.critical('Not string database path provided: %s', path)
+            raise ValueError
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        self._connection.execute('PRAGMA journal_mode = WAL')
+        self._connection.execute('PRAGMA synchronous = NORMAL')
+        self._connection.execute('PRAGMA foreign_keys = ON')
+        self._connection.executescript(SCHEMA)
+
+    def upsert_articles(
+            self,
+            articles: List[Article],
+            hub: Optional[str] = None,
+            seen_at: Optional[float] = None,
+            page_offset: int = 0
+    ) -> None:
+        """
+        Insert new articles and update votes, views and last seen time of known ones
+        in single transaction. Hub position of article is its rank in hub listing.
+        Articles of hub pages after the first one are older than the first page articles,
+        so they are not seen in hub later than articles already stored in hub.
+
+        :param articles: parsed articles
+        :param hub: hub name if articles are parsed from hub page
+        :param seen_at: unix time of parsing, current time if not provided
+        :param page_offset: number of articles on previous hub pages, 0 for the first page
+        """
+        if not articles:
+            return
+        seen_at = time.time() if seen_at is None else seen_at
+        with self._lock:
+            self._connection.execute('BEGIN')
+            try:
+                hub_seen_at = seen_at
+                if hub is not None and page_offset:
+                    oldest_in_hub = self._connection.execute(
+                        'SELECT MIN(first_seen) FROM article_hubs WHERE hub = ?', (hub,)
+                    ).fetchone()[0]
+                    if oldest_in_hub is not None:
+                        hub_seen_at = min(seen_at, oldest_in_hub)
+                self._connection.executemany(
+                    UPSERT_ARTICLE_QUERY,
+                    [
+                        (
+                            article.link, article.title, article.votes, article.views,
+                            article.score, article.views_count, seen_at, seen_at
+                        )
+                        for article in articles
+                    ]
+                )
+                if hub is not None:
+                    self._connection.executemany(
+                        UPSERT_ARTICLE_HUB_QUERY,
+                        [
+                            (hub, article.link, hub_seen_at, page_offset + position)
+                            for position, article in enumerate(articles)
+                        ]
+                    )
+            except sqlite3.Error:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+        logging.info('Stored %s articles', len(articles))
+
+    def latest_in_hub(self, hub: str, limit: int) -> List[Article]:
+        """
+        Latest articles of hub: recently first seen first, then by rank in hub listing
+        at the time article was first seen.
+
+        :param hub: hub name
+        :param limit: max number of articles
+        :return: list with articles
+        """
+        return self._select(
+            f'SELECT {ARTICLE_COLUMNS} FROM article_hubs '
+            'JOIN articles ON articles.link = article_hubs.link WHERE article_hubs.hub = ? '
+            'ORDER BY article_hubs.first_seen DESC, article_hubs.position ASC LIMIT ?',
+            (hub, limit)
+        )
+
+    def seen_since(self, timestamp: float, limit: int = -1) -> List[Article]:
+        """
+        Articles seen on habr since provided time, recently seen first.
+
+        :param timestamp: unix time
+        :param limit: max number of articles, all articles if negative
+        :return: list with articles
+        """
+        return self._select(
+            f'SELECT {ARTICLE_COLUMNS} FROM articles WHERE last_seen >= ? '
+            'ORDER BY last_seen DESC LIMIT ?',
+            (timestamp, limit)
+        )
+
+    def top_by_views(self, limit: int, since: float = 0) -> List[Article]:
+        """
+        Most viewed articles.
+
+        :param limit: max number of articles
+        :param since: consider only articles seen since this unix time
+        :return: list with articles
+        """
+        return self._select(
+            f'SELECT {ARTICLE_COLUMNS} FROM articles WHERE last_seen >= ? '
+            'ORDER BY views_count DESC LIMIT ?',
+            (since, limit)
+        )
+
+    def all_articles(self) -> List[Article]:
+        """
+        All stored articles.
+
+        :return: list with articles
+        """
+        return self._select(f'SELECT {ARTICLE_COLUMNS} FROM articles', ())
+
+    def count(self) -> int:
+        """
+        Number of stored articles.
+
+        :return: articles count
+        """
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+    def compact(self, max_age: float, max_articles: int, now: Optional[float] = None) -> int:
+        """
+        Delete articles not seen for max_age seconds and the least recently seen articles
+        over max_articles, then return free pages to file system.
+
+        :param max_age: seconds since last seen to keep article
+        :param max_articles: max number of articles to keep
+        :param now: current unix time, used in tests
+        :return: number of deleted articles
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._connection.execute('BEGIN')
+            try:
+                deleted_count = self._connection.execute(
+                    'DELETE FROM articles WHERE last_seen < ?', (now - max_age,)
+                ).rowcount
+                deleted_count += self._connection.execute(
+                    'DELETE FROM articles WHERE link IN ('
+                    'SELECT link FROM articles ORDER BY last_seen DESC LIMIT -1 OFFSET ?)',
+                    (max_articles,)
+                ).rowcount
+            except sqlite3.Error:
+                self._connection.execute('ROLLBACK')
+                raise
+            self._connection.execute('COMMIT')
+            # execute() steps the pragma once and frees a single page,
+            # executescript() runs it to completion
+            self._connection.executescript('PRAGMA incremental_vacuum;')
+            self._connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        logging.info('Article store compacted, %s articles deleted', deleted_count)
+        return deleted_count
+
+    def close(self) -> None:
+        """Close database connection"""
+        with self._lock:
+            self._connection.close()
+
+    def _select(self, query: str, params: tuple) -> List[Article]:
+        """
+        Run select query returning articles columns.
+
+        :param query: SQL query
+        :param params: query params
+        :return: list with articles
+        """
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [Article(*row) for row in rows]
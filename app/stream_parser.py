@@ -0,0 +1,152 @@
+import logging
+from collections import deque
+from html.parser import HTMLParser
+from typing import Deque, Dict, List, Optional, Tuple
+
+ARTICLES_LIST_CLASS = 'tm-articles-list'
+ARTICLE_SNIPPET_CLASS = 'tm-article-snippet'
+MEGAPOST_LINK_CLASS = 'tm-megapost-snippet__link tm-megapost-snippet__card'
+VOTES_CLASS = 'tm-votes-meter tm-data-icons__item'
+VIEWS_CLASS = 'tm-icon-counter tm-data-icons__item'
+ArticleFields = Tuple[str, str, str, str]
+
+
+def has_class(attrs: List[Tuple[str, Optional[str]]], css_class: str) -> bool:
+    """
+    Check tag class the same way as bs4 find() does: single class must be one of tag classes,
+    several classes must be equal to whole class attribute.
+
+    :param attrs: tag attributes from HTMLParser
+    :param css_class: expected class
+    :return: True if tag has class
+    """
+    class_value = dict(attrs).get('class') or ''
+    if ' ' in css_class:
+        return class_value == css_class
+    return css_class in class_value.split()
+
+
+class TextCapture:
+    """Collects text of tag and all its children until tag is closed"""
+
+    def __init__(self, tag: str, field: str):
+        self.tag = tag
+        self.field = field
+        self.depth = 1
+        self.parts: List[str] = []
+
+
+class HabrArticlesStreamParser(HTMLParser):
+    """
+    Incremental parser of habr articles list. HTML can be fed by chunks, parsed articles are
+    available right after their <article> tag is closed. Everything after the end of the first
+    articles list is ignored.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.finished = False
+        self.found_articles_list = False
+        self._list_div_depth = 0
+        self._articles: Deque[ArticleFields] = deque()
+        self._article: Optional[Dict[str, str]] = None
+        self._captures: List[TextCapture] = []
+        self._in_snippet_header = False
+
+    def pop_articles(self) -> List[ArticleFields]:
+        """
+        Take articles parsed since previous call.
+
+        :return: list with article title, relative link, votes and views tuples
+        """
+        articles = list(self._articles)
+        self._articles.clear()
+        return articles
+
+    def handle_starttag(self, tag, attrs):
+        if self.finished:
+            return
+        if not self.found_articles_list:
+            if tag == 'div' and has_class(attrs, ARTICLES_LIST_CLASS):
+                self.found_articles_list = True
+                self._list_div_depth = 1
+            return
+        if tag == 'div':
+            self._list_div_depth += 1
+        for capture in self._captures:
+            if capture.tag == tag:
+                capture.depth += 1
+        if tag == 'article':
+            self._article = {}
+        elif self._article is not None:
+            self._handle_article_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if self.finished or not self.found_articles_list:
+            return
+        self._close_captures(tag)
+        if tag == 'h2':
+            self._in_snippet_header = False
+        elif tag == 'article' and self._article is not None:
+            self._finish_article()
+        elif tag == 'div':
+            self._list_div_depth -= 1
+            if self._list_div_depth == 0:
+                self.finished = True
+
+    def handle_data(self, data):
+        for capture in self._captures:
+            capture.parts.append(data)
+
+    def _handle_article_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        """
+        Find title, link, votes and views blocks inside article.
+
+        :param tag: tag name
+        :param attrs: tag attributes
+        """
+        article = self._article
+        if tag == 'div' and has_class(attrs, ARTICLE_SNIPPET_CLASS):
+            article.setdefault('snippet', '')
+        elif tag == 'h2' and 'snippet' in article and 'title' not in article:
+            self._in_snippet_header = True
+        elif tag == 'a' and self._in_snippet_header and 'link' not in article:
+            article['link'] = dict(attrs).get('href', '')
+            self._captures.append(TextCapture(tag, 'title'))
+        elif tag == 'a' and 'link' not in article and has_class(attrs, MEGAPOST_LINK_CLASS):
+            article['link'] = dict(attrs).get('href', '')
+            article['megapost'] = ''
+        elif tag == 'h2' and 'megapost' in article and 'title' not in article:
+            self._captures.append(TextCapture(tag, 'title'))
+        elif tag == 'div' and 'votes' not in article and has_class(attrs, VOTES_CLASS):
+            self._captures.append(TextCapture(tag, 'votes'))
+        elif tag == 'span' and 'views' not in article and has_class(attrs, VIEWS_CLASS):
+            self._captures.append(TextCapture(tag, 'views'))
+
+    def _close_captures(self, tag: str) -> None:
+        """
+        Decrease depth of captures with closed tag and store text of finished captures.
+
+        :param tag: closed tag name
+        """
+        for capture in list(self._captures):
+            if capture.tag != tag:
+                continue
+            capture.depth -= 1
+            if capture.depth == 0:
+                self._captures.remove(capture)
+                if self._article is not None:
+                    self._article[capture.field] = ''.join(capture.parts)
+
+    def _finish_article(self) -> None:
+        """Store parsed article fields, skip article if some of them are missing"""
+        article = self._article
+        self._article = None
+        self._captures = []
+        self._in_snippet_header = False
+        try:
+            fields = (article['title'], article['link'], article['votes'], article['views'])
+        except KeyError as exception:
+            logging.warning('Skip article without %s field while stream parsing', exception)
+            return
+        self._articles.append(fields)
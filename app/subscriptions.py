@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set
+
+from app.article import Article, prepare_messages_for_telegram
+from app.metrics import metrics
+
+
+class SubscriptionManager:
+    """
+    Hub subscribers and new articles fan-out. Every parsed hub page is compared with
+    previous snapshot of the same hub by article link, only new articles are sent to
+    subscribers, so work depends on number of hubs, not on number of subscribers.
+    """
+
+    def __init__(
+            self,
+            hubs: Dict[str, str],
+            send_message: Callable[[int, str], None],
+            batch_size: int,
+            batch_interval: float = 0,
+            storage_path: Optional[str] = None
+    ):
+        """
+        Init manager, subscriptions are loaded from storage file if it exists.
+
+        :raise ValueError if batch_size is not positive or batch_interval is negative
+        :param hubs: dict with hub name and hub url
+        :param send_message: function which sends markdown text to chat by chat id
+        :param batch_size: number of chats messages are sent to before pause
+        :param batch_interval: seconds to pause between batches
+        :param storage_path: path to json file with subscriptions, subscriptions are kept
+        in memory only if not provided
+        """
+        if batch_size < 1 or batch_interval < 0:
+            logging.critical('Invalid subscription manager params provided')
+            raise ValueError
+        self.hubs = dict(hubs)
+        self.send_message = send_message
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.storage_path = storage_path
+        self._hubs_by_url = {url: hub for hub, url in self.hubs.items()}
+        self._subscribers: Dict[str, Set[int]] = {hub: set() for hub in self.hubs}
+        self._snapshots: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._fan_out_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='subscriptions-fan-out'
+        )
+        self._load()
+
+    @classmethod
+    def from_config(
+            cls, hubs: Dict[str, str], send_message: Callable[[int, str], None],
+            subscriptions_config: dict
+    ):
+        """
+        Create new manager from "subscriptions" section of config.yaml.
+
+        :param hubs: dict with hub name and hub url
+        :param send_message: function which sends markdown text to chat by chat id
+        :param subscriptions_config: dict with batch_size, batch_interval_seconds
+        and storage_path
+        :return: new SubscriptionManager() instance
+        """
+        return cls(
+            hubs,
+            send_message,
+            batch_size=subscriptions_config['batch_size'],
+            batch_interval=subscriptions_config.get('batch_interval_seconds', 0),
+            storage_path=subscriptions_config.get('storage_path')
+        )
+
+    def subscribe(self, chat_id: int, hub: str) -> bool:
+        """
+        Subscribe chat to new articles of hub.
+
+        :raise ValueError if unknown hub provided
+        :param chat_id: telegram chat id
+        :param hub: hub name
+        :return: True if chat was subscribed, False if it was subscribed already
+        """
+        return self._update_subscription(chat_id, hub, subscribe=True)
+
+    def unsubscribe(self, chat_id: int, hub: str) -> bool:
+        """
+        Unsubscribe chat from new articles of hub.
+
+        :raise ValueError if unknown hub provided
+        :param chat_id: telegram chat id
+        :param hub: hub name
+        :return: True if chat was unsubscribed, False if it was not subscribed
+        """
+        return self._update_subscription(chat_id, hub, subscribe=False)
+
+    def subscribers(self, hub: str) -> Set[int]:
+        """
+        Chats subscribed to hub.
+
+        :param hub: hub name
+        :return: set with chat ids
+        """
+        with self._lock:
+            return set(self._subscribers.get(hub, ()))
+
+    def on_articles(self, url: str, articles: List[Article]) -> List[Article]:
+        """
+        Articles listener. Compare parsed hub page with previous snapshot and send new
+        articles to hub subscribers in background. First snapshot of hub is only remembered,
+        empty page (e.g. error page) does not replace snapshot.
+
+        :param url: habr url, pages which are not subscribable hubs are ignored
+        :param articles: parsed articles
+        :return: list with new articles
+        """
+        hub = self._hubs_by_url.get(url)
+        if hub is None:
+            return []
+        if not articles:
+            logging.warning('Empty page of %s hub, keep previous snapshot', hub)
+            return []
+        links = {article.link for article in articles}
+        with self._lock:
+            previous_links = self._snapshots.get(hub)
+            self._snapshots[hub] = links
+        if previous_links is None:
+            logging.info('First snapshot of %s hub with %s articles', hub, len(links))
+            return []
+        new_articles = [article for article in articles if article.link not in previous_links]
+        if new_articles:
+            logging.info('Found %s new articles in %s hub', len(new_articles), hub)
+            self._fan_out_executor.submit(self.fan_out, hub, new_articles)
+        return new_articles
+
+    def fan_out(self, hub: str, articles: List[Article]) -> int:
+        """
+        Send articles to all hub subscribers by batches. Messages are rendered once.
+
+        :param hub: hub name
+        :param articles: articles to send
+        :return: number of chats articles were sent to
+        """
+        with metrics.hub_context(hub):
+            messages = prepare_messages_for_telegram(articles)
+            chat_ids = sorted(self.subscribers(hub))
+            sent_count = 0
+            for batch_start in range(0, len(chat_ids), self.batch_size):
+                if batch_start and self.batch_interval:
+                    time.sleep(self.batch_interval)
+                for chat_id in chat_ids[batch_start:batch_start + self.batch_size]:
+                    try:
+                        for message in messages:
+                            self.send_message(chat_id, message)
+                        sent_count += 1
+                    except Exception as exception:  # pylint: disable=broad-except
+                        logging.error(
+                            "Can't send new %s articles to chat %s. Reason: %s",
+                            hub, chat_id, exception
+                        )
+        logging.info('New %s articles sent to %s of %s chats', hub, sent_count, len(chat_ids))
+        return sent_count
+
+    def _update_subscription(self, chat_id: int, hub: str, subscribe: bool) -> bool:
+        """
+        Add or remove chat from hub subscribers and save subscriptions.
+
+        :raise ValueError if unknown hub provided
+        :param chat_id: telegram chat id
+        :param hub: hub name
+        :param subscribe: add chat if True, remove otherwise
+        :return: True if subscriptions were changed
+        """
+        if hub not in self._subscribers:
+            logging.warning('Unknown hub provided: %s', hub)
+            raise ValueError
+        with self._lock:
+            hub_subscribers = self._subscribers[hub]
+            if (chat_id in hub_subscribers) == subscribe:
+                return False
+            if subscribe:
+                hub_subscribers.add(chat_id)
+            else:
+                hub_subscribers.discard(chat_id)
+            self._save()
+        return True
+
+    def _load(self) -> None:
+        """Load subscriptions from storage file, unknown hubs are skipped"""
+        if not self.storage_path or not os.path.exists(self.storage_path):
+            return
+        with open(self.storage_path, 'r', encoding='utf 8') as file:
+            stored_subscribers = json.load(file)
+        for hub, chat_ids in stored_subscribers.items():
+            if hub in self._subscribers:
+                self._subscribers[hub].update(chat_ids)
+
+    def _save(self) -> None:
+        """Save subscriptions to storage file. Must be called with lock acquired"""
+        if not self.storage_path:
+            return
+        directory = os.path.dirname(self.storage_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f'{self.storage_path}.tmp'
+        with open(temporary_path, 'w', encoding='utf 8') as file:
+            json.dump(
+                {hub: sorted(chat_ids) for hub, chat_ids in self._subscribers.items()}, file
+            )
+        os.replace(temporary_path, self.storage_path)
@@ -1,6 +1,11 @@
+import pickle
+
 import pytest
 
-from app.article import Article, prepare_message_for_telegram
+from app.article import (
+    Article, ArticleDetails, parse_views, parse_votes, prepare_message_for_telegram,
+    prepare_messages_for_telegram, render_article, render_messages, TELEGRAM_MESSAGE_MAX_LENGTH
+)
 
 
 @pytest.fixture(scope='function')
@@ -169,3 +174,128 @@ def test_prepare_message_for_telegram_raise_exception_if_not_list_views_param_pr
 ):
     with pytest.raises(ValueError):
         prepare_message_for_telegram(articles_list)
+
+
+@pytest.mark.parametrize(
+    'votes, expected_result',
+    [
+        pytest.param('Всего голосов 26: ↑25 и ↓1  +24', (24, 25, 1), id='positive score'),
+        pytest.param('Всего голосов 8: ↑3 и ↓5  -2', (-2, 3, 5), id='negative score'),
+        pytest.param('Всего голосов 10: ↑5 и ↓5  0', (0, 5, 5), id='zero score'),
+        pytest.param('Рейтинг  0', (0, 0, 0), id='no votes'),
+        pytest.param('test votes', (0, 0, 0), id='unknown format'),
+    ]
+)
+def test_parse_votes_can_get_score_upvotes_and_downvotes(votes, expected_result):
+    assert expected_result == parse_votes(votes)
+
+
+@pytest.mark.parametrize(
+    'views, expected_result',
+    [
+        pytest.param('Просмотры  379', 379, id='number'),
+        pytest.param('Просмотры  8.2K', 8200, id='thousands with fraction'),
+        pytest.param('Просмотры  15K', 15000, id='thousands'),
+        pytest.param('Просмотры  1.2M', 1200000, id='millions'),
+        pytest.param('test views', 0, id='unknown format'),
+    ]
+)
+def test_parse_views_can_get_views_count(views, expected_result):
+    assert expected_result == parse_views(views)
+
+
+def test_article_has_numeric_votes_and_views(articles_fixture):
+    article = articles_fixture[0]
+
+    assert (24, 25, 1, 6600) == (
+        article.score, article.upvotes, article.downvotes, article.views_count
+    )
+    assert 'Просмотры  6.6K' == article.views
+
+
+def test_article_is_immutable(articles_fixture):
+    with pytest.raises(AttributeError):
+        articles_fixture[0].title = 'new title'
+    with pytest.raises(AttributeError):
+        articles_fixture[0].new_attribute = 'value'
+
+
+def test_article_can_be_pickled_and_hashed(articles_fixture):
+    article = articles_fixture[0]
+
+    restored_article = pickle.loads(pickle.dumps(article))
+
+    assert article == restored_article
+    assert hash(article) == hash(restored_article)
+
+
+def test_prepare_messages_for_telegram_split_messages_by_length_limit():
+    articles = [
+        Article(f'Статья номер {index}', f'https://habr.com/ru/post/{index}/', 'Рейтинг  0', 'Просмотры  1')
+        for index in range(200)
+    ]
+    expected_text = prepare_message_for_telegram(articles)
+
+    messages = prepare_messages_for_telegram(articles)
+
+    assert len(messages) > 1
+    assert all(len(message) <= TELEGRAM_MESSAGE_MAX_LENGTH for message in messages)
+    assert expected_text == ''.join(messages)
+    assert all(message.startswith('[Статья номер') for message in messages), (
+        'Article must not be split between messages'
+    )
+
+
+def test_prepare_messages_for_telegram_render_same_articles_once(articles_fixture):
+    render_messages.cache_clear()
+
+    first_result = prepare_messages_for_telegram(articles_fixture)
+    second_result = prepare_messages_for_telegram(list(articles_fixture))
+
+    assert first_result == second_result
+    assert 1 == render_messages.cache_info().hits
+
+
+def test_render_article_render_escaped_details(articles_fixture):
+    details = ArticleDetails(('python', 'event_loop'), '12 мин', 'py_dev', 'Про *future* и [таски]')
+
+    result = render_article(articles_fixture[0], details)
+
+    assert result.endswith(
+        'Количество просмотров: Просмотры  6.6K\n'
+        'Автор: py\\_dev\n'
+        'Время чтения: 12 мин\n'
+        'Теги: python, event\\_loop\n'
+        'Про \\*future\\* и \\[таски]\n\n'
+    )
+
+
+def test_prepare_messages_for_telegram_render_articles_again_when_details_are_fetched(
+        articles_fixture
+):
+    details = ArticleDetails((), '5 мин', '', '')
+
+    without_details = prepare_messages_for_telegram(articles_fixture)
+    with_details = prepare_messages_for_telegram(articles_fixture, [details, None])
+
+    assert 'Время чтения' not in without_details[0]
+    assert with_details[0].count('Время чтения: 5 мин') == 1
+
+
+def test_prepare_messages_for_telegram_return_empty_list_if_empty_arg_provided():
+    assert [] == prepare_messages_for_telegram([])
+
+
+@pytest.mark.parametrize(
+    'articles_list',
+    [
+        pytest.param('some string', id='string'),
+        pytest.param((), id='tuple'),
+        pytest.param(None, id='None'),
+    ]
+)
+def test_prepare_messages_for_telegram_raise_exception_if_not_list_param_provided(
+        articles_list
+):
+    with pytest.raises(ValueError):
+        prepare_messages_for_telegram(articles_list)
@@ -0,0 +1,190 @@
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.article import Article, ArticleDetails
+from app.article_details import (
+    LEAD_MAX_LENGTH, ArticleEnricher, get_article_page_html, parse_article_details
+)
+from app.resilience import CIRCUIT_CLOSED, CIRCUIT_OPEN, CircuitBreakers, RetryPolicy
+
+HABR_ARTICLE_PAGE_DUMP_FILEPATH = 'app/tests/tests_data/habr_article_page_dump.html'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture(scope='function')
+def habr_article_page_html_fixture() -> str:
+    with open(HABR_ARTICLE_PAGE_DUMP_FILEPATH, 'r') as fio:
+        content = fio.read()
+    return content
+
+
+@pytest.fixture(scope='function')
+def articles_fixture():
+    return [
+        Article(
+            f'title {index}', f'https://habr.com/ru/post/{index}/', 'Рейтинг  0', 'Просмотры  1'
+        )
+        for index in range(3)
+    ]
+
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    event = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        event.wait(0.01)
+    return condition()
+
+
+def build_enricher(fetch_page, **params) -> ArticleEnricher:
+    enricher_params = {
+        'max_concurrent': 2,
+        'max_pending': 10,
+        'host_rate': 100,
+        'host_burst': 10,
+        'ttl': 60,
+        'max_entries': 10,
+    }
+    enricher_params.update(params)
+    return ArticleEnricher(fetch_page, **enricher_params)
+
+
+@patch('app.articles_parser.http_client.get')
+def test_get_article_page_html_failures_do_not_open_circuit_of_hub_pages(mock_http_client_get):
+    circuit_breakers = CircuitBreakers(failure_threshold=1, reset_timeout=30)
+    mock_http_client_get.return_value = Mock(status_code=503)
+
+    with patch('app.articles_parser.circuit_breakers', circuit_breakers), \
+            patch('app.articles_parser.retry_policy', RetryPolicy(1, base_delay=0, max_delay=0)):
+        with pytest.raises(ConnectionError):
+            get_article_page_html('https://habr.com/ru/post/645133/')
+
+    assert circuit_breakers.get('habr.com articles').state == CIRCUIT_OPEN
+    assert circuit_breakers.get('habr.com').state == CIRCUIT_CLOSED
+
+
+def test_parse_article_details_can_get_details_from_article_page(habr_article_page_html_fixture):
+    details = parse_article_details(habr_article_page_html_fixture)
+
+    assert details.tags == ('python', 'asyncio', 'event_loop')
+    assert details.reading_time == '12 мин'
+    assert details.author == 'py_dev'
+    assert details.lead.startswith('Разбираем, как устроен цикл событий asyncio: корутины')
+    assert details.lead.endswith('останавливает весь сервис.')
+
+
+def test_parse_article_details_shorten_long_lead():
+    html_data = f"<div id=\"post-content-body\"><p>{'слово ' * 100}</p></div>"
+
+    details = parse_article_details(html_data)
+
+    assert len(details.lead) <= LEAD_MAX_LENGTH + 1
+    assert details.lead.endswith('слово…')
+
+
+def test_parse_article_details_return_empty_fields_if_page_has_no_details():
+    assert parse_article_details('<html></html>') == ArticleDetails((), '', '', '')
+
+
+@pytest.mark.parametrize(
+    'html_data',
+    [
+        pytest.param(123, id='int'),
+        pytest.param(None, id='None'),
+        pytest.param([], id='list'),
+    ]
+)
+def test_parse_article_details_raise_exception_if_not_str_param_provided(html_data):
+    with pytest.raises(ValueError):
+        parse_article_details(html_data)
+
+
+def test_article_enricher_fetch_details_once_in_background(
+        habr_article_page_html_fixture, articles_fixture
+):
+    fetch_page = Mock(return_value=habr_article_page_html_fixture)
+    enricher = build_enricher(fetch_page)
+
+    enricher.enrich(articles_fixture)
+    enricher.shutdown()
+    enricher.enrich(articles_fixture)
+
+    assert fetch_page.call_count == 3
+    assert enricher.details(articles_fixture[0].link).author == 'py_dev'
+    stats = enricher.stats()
+    assert (stats['fetched'], stats['failed'], stats['pending'], stats['cached']) == (3, 0, 0, 3)
+    assert stats['max_fetch_time'] >= stats['average_fetch_time'] > 0
+
+
+def test_article_enricher_skip_articles_over_max_pending(articles_fixture):
+    release = threading.Event()
+    enricher = build_enricher(lambda _: release.wait(5) and '', max_concurrent=1, max_pending=2)
+
+    enricher.enrich(articles_fixture)
+    release.set()
+    enricher.shutdown()
+
+    assert enricher.stats()['scheduled'] == 2
+    assert enricher.stats()['skipped'] == 1
+    assert enricher.details(articles_fixture[2].link) is None
+
+
+def test_article_enricher_retry_failed_articles_on_next_enrich(
+        habr_article_page_html_fixture, articles_fixture
+):
+    fetch_page = Mock(side_effect=[ConnectionError, habr_article_page_html_fixture])
+    enricher = build_enricher(fetch_page)
+
+    enricher.enrich(articles_fixture[:1])
+    assert wait_for(lambda: enricher.stats()['pending'] == 0)
+    assert enricher.details(articles_fixture[0].link) is None
+    enricher.enrich(articles_fixture[:1])
+    enricher.shutdown()
+
+    assert enricher.details(articles_fixture[0].link) is not None
+    assert enricher.stats()['failed'] == 1
+    assert enricher.stats()['fetched'] == 1
+
+
+def test_article_enricher_limit_request_rate_to_host(articles_fixture):
+    clock = FakeClock()
+    enricher = build_enricher(
+        lambda _: '', max_concurrent=1, host_rate=2, host_burst=1, sleep=clock.sleep, clock=clock
+    )
+
+    enricher.enrich(articles_fixture)
+    enricher.shutdown()
+
+    assert enricher.stats()['fetched'] == 3
+    assert clock.sleeps == [0.5, 0.5]
+
+
+@pytest.mark.parametrize(
+    'enricher_params',
+    [
+        pytest.param({'max_concurrent': 0}, id='zero max concurrent'),
+        pytest.param({'max_pending': 0}, id='zero max pending'),
+        pytest.param({'host_rate': 0}, id='zero host rate'),
+        pytest.param({'host_burst': 0}, id='zero host burst'),
+        pytest.param({'ttl': 0}, id='zero ttl'),
+        pytest.param({'max_entries': 0}, id='zero max entries'),
+    ]
+)
+def test_article_enricher_raise_exception_if_invalid_params_provided(enricher_params):
+    with pytest.raises(ValueError):
+        build_enricher(Mock(), **enricher_params)
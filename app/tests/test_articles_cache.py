@@ -0,0 +1,150 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from app.article import Article
+from app.articles_cache import ArticlesCache
+
+HABR_URL = 'https://habr.com/ru/hub/python/'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = []
+        self.called = threading.Event()
+
+    def __call__(self, url):
+        self.calls.append(url)
+        self.called.set()
+        return [Article(f'title {len(self.calls)}', url, 'Рейтинг  0', 'Просмотры  1')]
+
+
+@pytest.fixture(scope='function')
+def clock_fixture():
+    return FakeClock()
+
+
+@pytest.fixture(scope='function')
+def loader_fixture():
+    return CountingLoader()
+
+
+def test_articles_cache_load_once_while_entry_is_fresh(clock_fixture, loader_fixture):
+    cache = ArticlesCache(loader_fixture, ttl=10, max_entries=2, clock=clock_fixture)
+
+    first_result = cache.get(HABR_URL)
+    clock_fixture.now = 9
+    second_result = cache.get(HABR_URL)
+
+    assert first_result is second_result
+    assert len(loader_fixture.calls) == 1
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_articles_cache_reload_expired_entry(clock_fixture, loader_fixture):
+    cache = ArticlesCache(loader_fixture, ttl=10, max_entries=2, clock=clock_fixture)
+
+    cache.get(HABR_URL)
+    clock_fixture.now = 11
+    result = cache.get(HABR_URL)
+
+    assert result[0].title == 'title 2'
+    assert cache.stats()['misses'] == 2
+
+
+def test_articles_cache_serve_stale_entry_and_refresh_it_in_background(
+        clock_fixture, loader_fixture
+):
+    cache = ArticlesCache(loader_fixture, ttl=10, max_entries=2, stale_ttl=10, clock=clock_fixture)
+
+    cache.get(HABR_URL)
+    loader_fixture.called.clear()
+    clock_fixture.now = 15
+    stale_result = cache.get(HABR_URL)
+
+    assert stale_result[0].title == 'title 1'
+    assert loader_fixture.called.wait(timeout=5), 'Background refresh was not started'
+    assert cache.stats()['stale_hits'] == 1
+    assert cache.stats()['refreshes'] == 1
+
+
+def test_articles_cache_evict_least_recently_used_entry(clock_fixture, loader_fixture):
+    cache = ArticlesCache(loader_fixture, ttl=10, max_entries=2, clock=clock_fixture)
+
+    cache.get('first')
+    cache.get('second')
+    cache.get('first')
+    cache.get('third')
+
+    assert cache.peek('second') is None
+    assert cache.peek('first') is not None
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size'] == 2
+
+
+def test_articles_cache_serve_expired_entry_if_loading_failed(clock_fixture, loader_fixture):
+    cache = ArticlesCache(loader_fixture, ttl=10, max_entries=2, clock=clock_fixture)
+    cache.get(HABR_URL)
+    cache.loader = Mock(side_effect=ConnectionError)
+    clock_fixture.now = 100
+
+    articles, age = cache.get_or_stale(HABR_URL)
+
+    assert articles[0].title == 'title 1'
+    assert age == 100
+    assert cache.stats()['stale_served'] == 1
+
+
+def test_articles_cache_get_or_stale_return_fresh_entry_without_age(clock_fixture, loader_fixture):
+    cache = ArticlesCache(loader_fixture, ttl=10, max_entries=2, clock=clock_fixture)
+
+    articles, age = cache.get_or_stale(HABR_URL)
+
+    assert articles[0].title == 'title 1'
+    assert age is None
+
+
+def test_articles_cache_get_or_stale_raise_exception_if_nothing_cached(clock_fixture):
+    cache = ArticlesCache(
+        Mock(side_effect=ConnectionError), ttl=10, max_entries=2, clock=clock_fixture
+    )
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_stale(HABR_URL)
+
+
+def test_articles_cache_report_fresh_entries_only(clock_fixture, loader_fixture):
+    cache = ArticlesCache(loader_fixture, ttl=10, max_entries=2, clock=clock_fixture)
+
+    assert not cache.is_fresh(HABR_URL)
+    cache.get(HABR_URL)
+    assert cache.is_fresh(HABR_URL)
+    clock_fixture.now = 10
+    assert not cache.is_fresh(HABR_URL)
+    assert cache.stats()['hits'] == 0
+
+
+@pytest.mark.parametrize(
+    'cache_params',
+    [
+        pytest.param({'ttl': 0}, id='zero ttl'),
+        pytest.param({'max_entries': 0}, id='zero max entries'),
+        pytest.param({'stale_ttl': -1}, id='negative stale ttl'),
+    ]
+)
+def test_articles_cache_raise_exception_if_invalid_params_provided(cache_params, loader_fixture):
+    params = {'ttl': 1, 'max_entries': 1}
+    params.update(cache_params)
+
+    with pytest.raises(ValueError):
+        ArticlesCache(loader_fixture, **params)
@@ -1,10 +1,20 @@
-from unittest.mock import patch
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
 
 import pytest
 import requests
 
-from app.articles_parser import get_habr_articles_html, parse_habr_articles_content
+from app.articles_parser import (
+    config, get_habr_articles_html, parse_habr_articles_content, fetch_habr_articles,
+    iter_habr_articles, search_habr_articles, register_articles_listener
+)
 from app.article import Article
+from app.http_client import HttpClient
+from app.resilience import (
+    CIRCUIT_CLOSED, CircuitBreakers, CircuitOpenError, ClientStatusError, RetryPolicy
+)
+from app.response_cache import ResponseCache
 
 HABR_URL_TO_PARSE = 'https://habr.com/ru/hub/python/'
 HABR_ARTICLES_DUMP_FILEPATH = 'app/tests/tests_data/habr_articles_dump.html'
@@ -25,6 +35,15 @@ def habr_empty_article_html_fixture() -> str:
     return content
 
 
+@pytest.fixture(scope='function', autouse=True)
+def fetch_policy_fixture():
+    circuit_breakers = CircuitBreakers(failure_threshold=2, reset_timeout=30)
+    retry_policy = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0, sleep=lambda _: None)
+    with patch('app.articles_parser.retry_policy', retry_policy), \
+            patch('app.articles_parser.circuit_breakers', circuit_breakers):
+        yield circuit_breakers
+
+
 @pytest.mark.integration_test
 def test_get_habr_articles_html_can_get_html_page_from_website():
     expected_word_in_search = 'python'
@@ -39,7 +58,7 @@ def test_get_habr_articles_html_can_get_html_page_from_website():
     )
 
 
-@patch('requests.get')
+@patch('app.articles_parser.http_client.get')
 def test_get_habr_articles_html_raise_exception_if_external_service_not_available(
         mock_requests_get
 ):
@@ -49,6 +68,117 @@ def test_get_habr_articles_html_raise_exception_if_external_service_not_availabl
         get_habr_articles_html(HABR_URL_TO_PARSE)
 
 
+@patch('app.articles_parser.http_client.get')
+def test_get_habr_articles_html_retry_server_errors(mock_requests_get):
+    mock_requests_get.side_effect = [
+        requests.exceptions.ConnectionError(),
+        Mock(status_code=503),
+        Mock(status_code=200, text='html'),
+    ]
+
+    html_content = get_habr_articles_html(HABR_URL_TO_PARSE)
+
+    assert html_content == 'html'
+    assert mock_requests_get.call_count == 3
+
+
+@patch('app.articles_parser.http_client.get')
+def test_get_habr_articles_html_stop_requests_while_circuit_is_open(
+        mock_requests_get, fetch_policy_fixture
+):
+    mock_requests_get.return_value = Mock(status_code=502)
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            get_habr_articles_html(HABR_URL_TO_PARSE)
+    with pytest.raises(CircuitOpenError):
+        get_habr_articles_html(HABR_URL_TO_PARSE)
+
+    assert mock_requests_get.call_count == 6
+    assert fetch_policy_fixture.stats()['habr.com']['rejected'] == 1
+
+
+@pytest.mark.parametrize(
+    'status_code',
+    [
+        pytest.param(408, id='request timeout'),
+        pytest.param(429, id='too many requests without retry after'),
+    ]
+)
+@patch('app.articles_parser.http_client.get')
+def test_get_habr_articles_html_treat_retried_client_errors_as_failures(
+        mock_requests_get, status_code, fetch_policy_fixture
+):
+    mock_requests_get.return_value = Mock(status_code=status_code, headers={})
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            get_habr_articles_html(HABR_URL_TO_PARSE)
+
+    assert mock_requests_get.call_count == 6
+    assert fetch_policy_fixture.stats()['habr.com']['opened'] == 1
+
+
+@pytest.mark.parametrize(
+    'status_code',
+    [
+        pytest.param(403, id='forbidden'),
+        pytest.param(404, id='not found'),
+    ]
+)
+@patch('app.articles_parser.http_client.get')
+def test_get_habr_articles_html_do_not_retry_permanent_client_errors(
+        mock_requests_get, status_code, fetch_policy_fixture
+):
+    mock_requests_get.return_value = Mock(status_code=status_code, headers={})
+
+    for _ in range(3):
+        with pytest.raises(ClientStatusError):
+            get_habr_articles_html(HABR_URL_TO_PARSE)
+
+    assert mock_requests_get.call_count == 3
+    assert fetch_policy_fixture.get('habr.com').state == CIRCUIT_CLOSED
+
+
+@patch('app.articles_parser.http_client.get')
+def test_get_habr_articles_html_retry_too_many_requests_after_retry_after(mock_requests_get):
+    sleeps = []
+    mock_requests_get.side_effect = [
+        Mock(status_code=429, headers={'Retry-After': '2'}),
+        Mock(status_code=200, text='html'),
+    ]
+
+    with patch(
+            'app.articles_parser.retry_policy',
+            RetryPolicy(max_attempts=3, base_delay=0, max_delay=5, sleep=sleeps.append)
+    ):
+        html_content = get_habr_articles_html(HABR_URL_TO_PARSE)
+
+    assert html_content == 'html'
+    assert sleeps == [2.0]
+
+
+@patch('app.articles_parser.http_client.get')
+def test_get_habr_articles_html_release_trial_request_after_unexpected_exception(
+        mock_requests_get, fetch_policy_fixture
+):
+    breaker = fetch_policy_fixture.get('habr.com')
+    breaker.clock = lambda: 0.0
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.clock = lambda: 30.0
+    mock_requests_get.side_effect = RuntimeError
+
+    with pytest.raises(RuntimeError):
+        get_habr_articles_html(HABR_URL_TO_PARSE)
+    breaker.clock = lambda: 60.0
+    mock_requests_get.side_effect = None
+    mock_requests_get.return_value = Mock(status_code=200, text='html')
+
+    assert get_habr_articles_html(HABR_URL_TO_PARSE) == 'html'
+    assert breaker.state == CIRCUIT_CLOSED
+
+
 @pytest.mark.parametrize(
     'url',
     [
@@ -128,3 +258,203 @@ def test_parse_habr_articles_content_return_empty_list_if_no_articles_found(
 def test_parse_habr_articles_content_raise_exception_if_not_str_param_provided(html_content):
     with pytest.raises(ValueError):
         parse_habr_articles_content(html_content)
+
+
+@pytest.fixture(scope='function')
+def response_cache_fixture(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=10 ** 7)
+    with patch('app.articles_parser.response_cache', cache):
+        yield cache
+
+
+@pytest.fixture(scope='function')
+def streaming_disabled_fixture():
+    with patch.dict(config['streaming'], enabled=False):
+        yield
+
+
+@patch('app.articles_parser.http_client.get')
+def test_fetch_habr_articles_store_response_with_validators(
+        mock_http_client_get, response_cache_fixture, streaming_disabled_fixture,
+        habr_article_html_fixture
+):
+    mock_http_client_get.return_value = Mock(
+        status_code=200, text=habr_article_html_fixture, headers={'ETag': '"v1"'}
+    )
+
+    articles = fetch_habr_articles(HABR_URL_TO_PARSE)
+
+    assert 20 == len(articles)
+    assert response_cache_fixture.get(HABR_URL_TO_PARSE).articles == articles
+    mock_http_client_get.assert_called_once_with(HABR_URL_TO_PARSE, headers={}, stream=False)
+
+
+@patch('app.articles_parser.parse_habr_articles_content')
+@patch('app.articles_parser.http_client.get')
+def test_fetch_habr_articles_reuse_cached_articles_if_page_not_modified(
+        mock_http_client_get, mock_parse_habr_articles_content, response_cache_fixture,
+        streaming_disabled_fixture
+):
+    cached_articles = [
+        Article('Эпические баги прошлого', 'https://habr.com/ru/post/645133/', 'Рейтинг  0', 'Просмотры  1')
+    ]
+    response_cache_fixture.put(
+        HABR_URL_TO_PARSE, '"v1"', 'Wed, 12 Jan 2022 10:00:00 GMT', '<html></html>', cached_articles
+    )
+    mock_http_client_get.return_value = Mock(status_code=304, text='', headers={})
+
+    articles = fetch_habr_articles(HABR_URL_TO_PARSE)
+
+    assert cached_articles == articles
+    mock_parse_habr_articles_content.assert_not_called()
+    mock_http_client_get.assert_called_once_with(
+        HABR_URL_TO_PARSE,
+        headers={'If-None-Match': '"v1"', 'If-Modified-Since': 'Wed, 12 Jan 2022 10:00:00 GMT'},
+        stream=False
+    )
+
+
+@pytest.mark.parametrize(
+    'max_drain_bytes, expected_fully_read',
+    [
+        pytest.param(10 ** 7, True, id='short rest is drained'),
+        pytest.param(4096, False, id='long rest is dropped'),
+    ]
+)
+@patch('app.articles_parser.http_client.get')
+def test_iter_habr_articles_stop_parsing_at_the_end_of_articles_list(
+        mock_http_client_get, max_drain_bytes, expected_fully_read, habr_article_html_fixture
+):
+    chunk_size = 4096
+    chunks = [
+        habr_article_html_fixture[index:index + chunk_size]
+        for index in range(0, len(habr_article_html_fixture), chunk_size)
+    ]
+    chunks_iterator = iter(chunks)
+    read_chunks = []
+
+    def iter_content(chunk_size, decode_unicode):
+        for chunk in chunks_iterator:
+            read_chunks.append(chunk)
+            yield chunk
+
+    response = Mock(status_code=200, headers={}, encoding='utf-8', iter_content=iter_content)
+    mock_http_client_get.return_value = response
+    expected_result = parse_habr_articles_content(habr_article_html_fixture)
+
+    with patch.dict(config['streaming'], max_drain_bytes=max_drain_bytes):
+        result = list(iter_habr_articles(HABR_URL_TO_PARSE))
+
+    assert expected_result == result
+    assert (len(read_chunks) == len(chunks)) == expected_fully_read
+    response.close.assert_called_once()
+
+
+def test_iter_habr_articles_reuse_keep_alive_connection(habr_article_html_fixture):
+    page_content = habr_article_html_fixture.encode('utf-8')
+    connections = []
+
+    class HabrPageHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            connections.append(self.client_address)
+            super().setup()
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page_content)))
+            self.end_headers()
+            self.wfile.write(page_content)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), HabrPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server_url = f'http://127.0.0.1:{server.server_address[1]}/'
+    client = HttpClient(pool_connections=1, pool_maxsize=1, connect_timeout=1, read_timeout=5)
+    try:
+        with patch('app.articles_parser.http_client', client):
+            for _ in range(5):
+                assert len(list(iter_habr_articles(server_url))) == 20
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+    assert len(connections) == 1
+    assert client.stats()['new_connections'] == 1
+
+
+@patch('app.articles_parser.http_client.get')
+def test_iter_habr_articles_yield_articles_before_response_is_read(
+        mock_http_client_get, habr_article_html_fixture
+):
+    article_end_index = habr_article_html_fixture.index('</article>') + len('</article>')
+    read_chunks = []
+
+    def iter_content(chunk_size, decode_unicode):
+        for chunk in (habr_article_html_fixture[:article_end_index],
+                      habr_article_html_fixture[article_end_index:]):
+            read_chunks.append(chunk)
+            yield chunk
+
+    mock_http_client_get.return_value = Mock(
+        status_code=200, headers={}, encoding='utf-8', iter_content=iter_content
+    )
+
+    first_article = next(iter_habr_articles(HABR_URL_TO_PARSE))
+
+    assert first_article.title == 'Эпические баги прошлого'
+    assert 1 == len(read_chunks)
+
+
+@patch('app.articles_parser.fetch_habr_articles')
+def test_search_habr_articles_request_habr_with_normalized_encoded_query(
+        mock_fetch_habr_articles
+):
+    mock_fetch_habr_articles.return_value = []
+
+    search_habr_articles('https://habr.com/ru/search/?q=', '  PYTHON   asyncio&C++ ')
+
+    mock_fetch_habr_articles.assert_called_once_with(
+        'https://habr.com/ru/search/?q=python%20asyncio%26c%2B%2B'
+    )
+
+
+@patch('app.articles_parser.http_client.get')
+def test_fetch_habr_articles_notify_listeners_about_parsed_articles(
+        mock_http_client_get, streaming_disabled_fixture, habr_article_html_fixture
+):
+    notifications = []
+    mock_http_client_get.return_value = Mock(
+        status_code=200, text=habr_article_html_fixture, headers={}
+    )
+
+    with patch('app.articles_parser.response_cache', None), \
+            patch('app.articles_parser.articles_listeners', []):
+        register_articles_listener(lambda url, articles: notifications.append((url, articles)))
+        articles = fetch_habr_articles(HABR_URL_TO_PARSE)
+
+    assert [(HABR_URL_TO_PARSE, articles)] == notifications
+
+
+@patch('app.articles_parser.http_client.get')
+def test_fetch_habr_articles_do_not_cache_hub_page_without_articles(
+        mock_http_client_get, response_cache_fixture, streaming_disabled_fixture,
+        habr_empty_article_html_fixture
+):
+    notifications = []
+    mock_http_client_get.return_value = Mock(
+        status_code=200, text=habr_empty_article_html_fixture, headers={'ETag': '"v1"'}
+    )
+
+    with patch('app.articles_parser.articles_listeners', []):
+        register_articles_listener(lambda url, articles: notifications.append((url, articles)))
+        with pytest.raises(ConnectionError):
+            fetch_habr_articles(HABR_URL_TO_PARSE)
+
+    assert response_cache_fixture.get(HABR_URL_TO_PARSE) is None
+    assert not notifications
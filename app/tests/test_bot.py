@@ -0,0 +1,371 @@
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from telegram.error import BadRequest
+
+from app.article import TELEGRAM_MESSAGE_MAX_LENGTH, Article
+from app.bot import (
+    EXPIRED_RESULT_TEXT, HABR_UNAVAILABLE_TEXT, PAGE_CUT_TEXT, Bot, ReplayCommandStrategy, SearchCommandStrategy,
+    config, render_articles, stale_articles_text
+)
+from app.command_executor import CommandExecutor
+from app.inline_search import Debouncer, InlineSearch
+from app.metrics import Metrics
+from app.result_pages import ResultPages, page_callback_data
+
+HUB_URL = 'https://habr.com/ru/hub/python/'
+SEARCH_URL = 'https://habr.com/ru/search/?q='
+ARTICLES = [
+    Article('Эпические баги прошлого', 'https://habr.com/ru/post/645133/', 'Рейтинг  0', 'Просмотры  1')
+]
+
+
+@pytest.fixture(scope='function')
+def send_queue_fixture():
+    send_queue = Mock()
+    send_queue.put.return_value = True
+    with patch('app.bot.send_queue', send_queue):
+        yield send_queue
+
+
+@pytest.fixture(scope='function')
+def update_fixture():
+    update = Mock()
+    update.effective_chat.id = 1
+    return update
+
+
+@pytest.fixture(scope='function')
+def result_pages_fixture():
+    result_pages = ResultPages(page_size=1, ttl=60, max_entries=10)
+    with patch('app.bot.result_pages', result_pages):
+        yield result_pages
+
+
+@pytest.fixture(scope='function')
+def bot_fixture(tmp_path):
+    with patch('app.bot.Updater'), \
+            patch.dict(config['storage'], enabled=False), \
+            patch.dict(config['subscriptions'], storage_path=str(tmp_path / 'subscriptions.json')):
+        bot = Bot('token')
+    bot.command_executor = CommandExecutor(
+        max_workers=1, max_queue_size=10, command_limits={'inline': 1}
+    )
+    yield bot
+    bot.command_executor.shutdown()
+
+
+def build_inline_search(articles, max_results=10):
+    return InlineSearch(
+        hub_snapshots=lambda: [articles],
+        cached_search=Mock(return_value=None),
+        local_search=Mock(return_value=[]),
+        remote_search=Mock(return_value=[]),
+        max_results=max_results,
+        min_results=0,
+        remote_timeout=1,
+        remote_max_concurrent=1
+    )
+
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    event = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        event.wait(0.01)
+    return condition()
+
+
+def sent_texts(send_queue):
+    return [call_args[0][1] for call_args in send_queue.put.call_args_list]
+
+
+def test_render_articles_label_render_time_with_command_and_hub():
+    metrics = Metrics(enabled=True, buckets=(1,))
+
+    with patch('app.bot.metrics', metrics):
+        with metrics.command_context('get_python_news'), metrics.hub_context('python'):
+            render_articles(ARTICLES)
+
+    assert (
+        'render_seconds_count{command="get_python_news",hub="python"} 1'
+        in metrics.render().splitlines()
+    )
+
+
+@patch('app.bot.hub_articles_cache')
+def test_replay_command_send_fresh_articles_without_warning(
+        mock_hub_articles_cache, send_queue_fixture, update_fixture
+):
+    mock_hub_articles_cache.get_or_stale.return_value = (ARTICLES, None)
+
+    ReplayCommandStrategy.bot_command(update_fixture, Mock(), HUB_URL)
+
+    texts = sent_texts(send_queue_fixture)
+    assert len(texts) == 1
+    assert ARTICLES[0].title in texts[0]
+    mock_hub_articles_cache.get_or_stale.assert_called_once_with(HUB_URL)
+
+
+@patch('app.bot.hub_articles_cache')
+def test_replay_command_warn_about_stale_articles(
+        mock_hub_articles_cache, send_queue_fixture, update_fixture
+):
+    mock_hub_articles_cache.get_or_stale.return_value = (ARTICLES, 180.0)
+
+    ReplayCommandStrategy.bot_command(update_fixture, Mock(), HUB_URL)
+
+    texts = sent_texts(send_queue_fixture)
+    assert texts[0] == stale_articles_text(180.0) == (
+        'Хабр сейчас недоступен, показаны статьи, загруженные 3 мин. назад'
+    )
+    assert ARTICLES[0].title in texts[1]
+
+
+@patch('app.bot.hub_articles_cache')
+def test_replay_command_reply_habr_unavailable_if_page_is_not_cached(
+        mock_hub_articles_cache, send_queue_fixture, update_fixture
+):
+    mock_hub_articles_cache.get_or_stale.side_effect = ConnectionError
+
+    ReplayCommandStrategy.bot_command(update_fixture, Mock(), HUB_URL)
+
+    assert sent_texts(send_queue_fixture) == [HABR_UNAVAILABLE_TEXT]
+
+
+@patch('app.bot.search_results_cache')
+@patch('app.bot.search_index')
+def test_search_command_send_search_index_results_if_habr_is_not_available(
+        mock_search_index, mock_search_results_cache, send_queue_fixture, update_fixture
+):
+    mock_search_index.search.return_value = ARTICLES
+    mock_search_results_cache.get.side_effect = ConnectionError
+
+    SearchCommandStrategy.bot_command(update_fixture, Mock(args=['баги']), SEARCH_URL)
+
+    texts = sent_texts(send_queue_fixture)
+    assert len(texts) == 1
+    assert ARTICLES[0].title in texts[0]
+    mock_search_results_cache.get.assert_called_once_with(SEARCH_URL, 'баги')
+
+
+@patch('app.bot.search_results_cache')
+@patch('app.bot.search_index')
+def test_search_command_reply_habr_unavailable_if_search_index_has_no_results(
+        mock_search_index, mock_search_results_cache, send_queue_fixture, update_fixture
+):
+    mock_search_index.search.return_value = []
+    mock_search_results_cache.get.side_effect = ConnectionError
+
+    SearchCommandStrategy.bot_command(update_fixture, Mock(args=['баги']), SEARCH_URL)
+
+    assert sent_texts(send_queue_fixture) == [HABR_UNAVAILABLE_TEXT]
+
+
+@patch('app.bot.search_results_cache')
+@patch('app.bot.search_index')
+def test_search_command_do_not_search_habr_if_search_index_has_enough_results(
+        mock_search_index, mock_search_results_cache, send_queue_fixture, update_fixture
+):
+    mock_search_index.search.return_value = ARTICLES * 5
+
+    SearchCommandStrategy.bot_command(update_fixture, Mock(args=['баги']), SEARCH_URL)
+
+    mock_search_results_cache.get.assert_not_called()
+    assert send_queue_fixture.put.called
+
+
+@patch('app.bot.hub_news_fetcher')
+def test_news_command_warn_about_stale_articles(
+        mock_hub_news_fetcher, send_queue_fixture, update_fixture
+):
+    mock_hub_news_fetcher.fetch.return_value = ([ARTICLES], 600.0)
+
+    Bot.news_command(update_fixture, Mock(args=['python']))
+
+    texts = sent_texts(send_queue_fixture)
+    assert texts[0] == stale_articles_text(600.0)
+    assert ARTICLES[0].title in texts[1]
+
+
+@patch('app.bot.hub_news_fetcher')
+def test_news_command_reply_habr_unavailable_if_all_pages_failed(
+        mock_hub_news_fetcher, send_queue_fixture, update_fixture
+):
+    mock_hub_news_fetcher.fetch.side_effect = ConnectionError
+
+    Bot.news_command(update_fixture, Mock(args=[]))
+
+    assert sent_texts(send_queue_fixture) == [HABR_UNAVAILABLE_TEXT]
+
+
+def test_page_button_edit_message_to_requested_page(result_pages_fixture):
+    token = result_pages_fixture.put(ARTICLES * 2).token
+    update = Mock()
+    update.callback_query.data = page_callback_data(token, 1)
+
+    Bot.page_button(update, Mock())
+
+    update.callback_query.answer.assert_called_once_with()
+    text = update.callback_query.edit_message_text.call_args[0][0]
+    assert ARTICLES[0].title in text
+    assert text.endswith('Страница 2 из 2')
+
+
+def test_page_button_cut_page_longer_than_telegram_message(result_pages_fixture):
+    long_articles = [
+        Article(f'{number} {"x" * 3000}', f'https://habr.com/ru/post/{number}/', '0', '1')
+        for number in range(4)
+    ]
+    result_pages_fixture.page_size = 2
+    token = result_pages_fixture.put(long_articles).token
+    update = Mock()
+    update.callback_query.data = page_callback_data(token, 1)
+
+    Bot.page_button(update, Mock())
+
+    text = update.callback_query.edit_message_text.call_args[0][0]
+    assert len(text) <= TELEGRAM_MESSAGE_MAX_LENGTH
+    assert long_articles[2].link in text
+    assert long_articles[3].link not in text
+    assert text.endswith(f'{PAGE_CUT_TEXT}Страница 2 из 2')
+
+
+def test_page_button_answer_expired_result_token(result_pages_fixture):
+    update = Mock()
+    update.callback_query.data = page_callback_data('expired', 1)
+
+    Bot.page_button(update, Mock())
+
+    update.callback_query.answer.assert_called_once_with(EXPIRED_RESULT_TEXT)
+    update.callback_query.edit_message_text.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        pytest.param('page:token', id='no page number'),
+        pytest.param('page:token:next', id='not number page'),
+        pytest.param('unknown:token:1', id='unknown prefix'),
+    ]
+)
+def test_page_button_answer_malformed_callback_data(data, result_pages_fixture):
+    update = Mock()
+    update.callback_query.data = data
+
+    Bot.page_button(update, Mock())
+
+    update.callback_query.answer.assert_called_once_with()
+    update.callback_query.edit_message_text.assert_not_called()
+
+
+def test_page_button_ignore_not_modified_message_on_repeated_press(result_pages_fixture):
+    token = result_pages_fixture.put(ARTICLES * 2).token
+    update = Mock()
+    update.callback_query.data = page_callback_data(token, 0)
+    update.callback_query.edit_message_text.side_effect = BadRequest(
+        'Message is not modified: specified new message content and reply markup are exactly '
+        'the same as a current content and reply markup of the message'
+    )
+
+    Bot.page_button(update, Mock())
+
+    update.callback_query.answer.assert_called_once_with()
+    update.callback_query.edit_message_text.assert_called_once()
+
+
+def test_answer_inline_query_with_articles_limited_by_max_results():
+    articles = [
+        Article(f'Статья {index}', f'https://habr.com/ru/post/{index}/', 'Рейтинг  +3', 'Просмотры  10')
+        for index in range(3)
+    ]
+    update = Mock()
+    update.inline_query.query = ''
+
+    with patch('app.bot.inline_search', build_inline_search(articles, max_results=2)), \
+            patch.dict(config['inline_mode'], cache_time_seconds=60, is_personal=True):
+        Bot.answer_inline_query(update, Mock())
+
+    results = update.inline_query.answer.call_args[0][0]
+    assert [result.id for result in results] == ['0', '1']
+    assert [result.url for result in results] == [articles[0].link, articles[1].link]
+    assert results[0].title == 'Статья 0'
+    assert results[0].description == 'Рейтинг 3, просмотров 10'
+    assert update.inline_query.answer.call_args[1] == {'cache_time': 60, 'is_personal': True}
+
+
+def test_answer_inline_query_ignore_answer_after_deadline():
+    update = Mock()
+    update.inline_query.query = ''
+    update.inline_query.answer.side_effect = BadRequest('Query is too old and response timeout expired')
+
+    with patch('app.bot.inline_search', build_inline_search(ARTICLES)):
+        Bot.answer_inline_query(update, Mock())
+
+    update.inline_query.answer.assert_called_once()
+
+
+def test_inline_query_answer_only_the_last_debounced_query(bot_fixture):
+    first_update, last_update = Mock(), Mock()
+    for update, text in ((first_update, 'pyt'), (last_update, 'python')):
+        update.inline_query.from_user.id = 1
+        update.inline_query.query = text
+
+    with patch('app.bot.inline_debouncer', Debouncer(delay=0.05)), \
+            patch('app.bot.inline_search', build_inline_search(ARTICLES)):
+        bot_fixture.inline_query(first_update, Mock())
+        bot_fixture.inline_query(last_update, Mock())
+        assert wait_for(lambda: last_update.inline_query.answer.called)
+
+    first_update.inline_query.answer.assert_not_called()
+
+
+def test_inline_query_do_not_answer_query_rejected_by_command_executor(bot_fixture):
+    started, release = threading.Event(), threading.Event()
+    update = Mock()
+    update.inline_query.from_user.id = 1
+    update.inline_query.query = 'python'
+
+    def blocked_callback(*_):
+        started.set()
+        release.wait(5)
+
+    bot_fixture.command_executor.submit('inline', blocked_callback, Mock(), Mock())
+    assert started.wait(timeout=5)
+    with patch('app.bot.inline_debouncer', Debouncer(delay=0)), \
+            patch('app.bot.inline_search', build_inline_search(ARTICLES)):
+        bot_fixture.inline_query(update, Mock())
+        assert wait_for(lambda: bot_fixture.command_executor.stats()['inline']['rejected'] == 1)
+    release.set()
+
+    update.inline_query.answer.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    'url, expected_params',
+    [
+        pytest.param(HUB_URL, {'hub': 'python', 'page_offset': 0}, id='hub first page'),
+        pytest.param(
+            f'{HUB_URL}page3/', {'hub': 'python', 'page_offset': 2}, id='hub page fetched by news'
+        ),
+        pytest.param(f'{SEARCH_URL}python', {}, id='search page'),
+    ]
+)
+def test_store_articles_save_articles_with_hub_of_page(url, expected_params, bot_fixture):
+    bot_fixture.article_store = Mock()
+
+    bot_fixture.store_articles(url, ARTICLES)
+
+    bot_fixture.article_store.upsert_articles.assert_called_once_with(ARTICLES, **expected_params)
+
+
+def test_poll_subscribed_hubs_refresh_only_hubs_with_subscribers(bot_fixture):
+    bot_fixture.prefetcher = Mock()
+    bot_fixture.subscriptions.subscribe(1, 'python')
+
+    bot_fixture.poll_subscribed_hubs(Mock())
+
+    bot_fixture.prefetcher.refresh.assert_called_once_with(HUB_URL)
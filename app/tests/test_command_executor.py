@@ -0,0 +1,102 @@
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.command_executor import CommandExecutor
+
+
+@pytest.fixture(scope='function')
+def blocked_callback_fixture():
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocked_callback(update, context):
+        started.set()
+        release.wait(timeout=5)
+
+    yield blocked_callback, started, release
+    release.set()
+
+
+@patch('app.command_executor.send_queue')
+def test_command_executor_reply_busy_text_if_command_limit_reached(
+        mock_send_queue, blocked_callback_fixture
+):
+    blocked_callback, started, release = blocked_callback_fixture
+    executor = CommandExecutor(max_workers=2, max_queue_size=10, command_limits={'search': 1})
+    handler = executor.wrap('search', blocked_callback)
+    first_update, second_update = Mock(), Mock()
+
+    handler(first_update, Mock())
+    assert started.wait(timeout=5)
+    handler(second_update, Mock())
+    release.set()
+    executor.shutdown()
+
+    mock_send_queue.put.assert_called_once_with(
+        second_update.effective_chat.id, executor.busy_text
+    )
+    second_update.message.reply_text.assert_not_called()
+    assert executor.stats()['search']['rejected'] == 1
+    assert executor.stats()['search']['completed'] == 1
+
+
+def test_command_executor_answer_rejected_button_press_with_busy_text(blocked_callback_fixture):
+    blocked_callback, started, release = blocked_callback_fixture
+    executor = CommandExecutor(max_workers=1, max_queue_size=10, command_limits={'page': 1})
+    handler = executor.wrap('page', blocked_callback)
+    button_update = Mock(message=None)
+
+    handler(Mock(), Mock())
+    assert started.wait(timeout=5)
+    handler(button_update, Mock())
+    release.set()
+    executor.shutdown()
+
+    button_update.callback_query.answer.assert_called_once_with(executor.busy_text)
+
+
+def test_command_executor_reject_commands_over_queue_size(blocked_callback_fixture):
+    blocked_callback, started, _ = blocked_callback_fixture
+    executor = CommandExecutor(max_workers=1, max_queue_size=2)
+
+    results = [
+        executor.submit('get_python_news', blocked_callback, Mock(), Mock()) for _ in range(3)
+    ]
+    assert started.wait(timeout=5)
+    stats = executor.stats()['get_python_news']
+
+    assert [True, True, False] == results
+    assert 1 == stats['running']
+    assert 1 == stats['queued']
+
+
+def test_command_executor_count_failed_commands():
+    executor = CommandExecutor(max_workers=1, max_queue_size=1)
+
+    def failing_callback(update, context):
+        raise ConnectionError
+
+    executor.submit('get_python_news', failing_callback, Mock(), Mock())
+    executor.shutdown()
+    stats = executor.stats()['get_python_news']
+
+    assert 1 == stats['failed']
+    assert 0 == stats['running']
+    assert stats['max_wait_time'] >= 0
+
+
+@pytest.mark.parametrize(
+    'executor_params',
+    [
+        pytest.param({'max_workers': 0}, id='zero workers'),
+        pytest.param({'max_queue_size': 0}, id='zero queue size'),
+    ]
+)
+def test_command_executor_raise_exception_if_invalid_params_provided(executor_params):
+    params = {'max_workers': 1, 'max_queue_size': 1}
+    params.update(executor_params)
+
+    with pytest.raises(ValueError):
+        CommandExecutor(**params)
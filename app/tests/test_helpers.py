@@ -1,6 +1,6 @@
 import pytest
 
-from app.helpers import parse_config
+from app.helpers import normalize_search_query, parse_config
 
 TESTING_CONFIG_FILEPATH = 'app/tests/tests_data/testing_config.yaml'
 
@@ -33,3 +33,27 @@ def test_parse_config_raise_exception_if_not_str_param_provided(path_to_config):
     with pytest.raises(ValueError):
         parse_config(path_to_config)
 
+
+@pytest.mark.parametrize(
+    'user_query',
+    [
+        pytest.param('python asyncio', id='normalized'),
+        pytest.param('PYTHON Asyncio', id='upper case'),
+        pytest.param('  python   asyncio \n', id='extra whitespaces'),
+    ]
+)
+def test_normalize_search_query_can_normalize_query(user_query):
+    assert 'python asyncio' == normalize_search_query(user_query)
+
+
+@pytest.mark.parametrize(
+    'user_query',
+    [
+        pytest.param(123, id='int'),
+        pytest.param([], id='list'),
+        pytest.param(None, id='None'),
+    ]
+)
+def test_normalize_search_query_raise_exception_if_not_str_param_provided(user_query):
+    with pytest.raises(ValueError):
+        normalize_search_query(user_query)
@@ -0,0 +1,106 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.http_client import HttpClient
+
+PAGE_CONTENT = '<html><body>python</body></html>'.encode('utf-8')
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(PAGE_CONTENT)))
+        self.end_headers()
+        self.wfile.write(PAGE_CONTENT)
+
+    def log_message(self, *args):
+        pass
+
+
+class ClosingHandler(KeepAliveHandler):
+    def do_GET(self):
+        super().do_GET()
+        self.close_connection = True
+
+
+def start_local_server(handler_class):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler_class)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture(scope='function')
+def local_server_url():
+    server = start_local_server(KeepAliveHandler)
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='function')
+def closing_server_url():
+    server = start_local_server(ClosingHandler)
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope='function')
+def http_client_fixture():
+    client = HttpClient(pool_connections=1, pool_maxsize=2, connect_timeout=1, read_timeout=1)
+    yield client
+    client.close()
+
+
+def test_http_client_reuse_connection_for_same_host(local_server_url, http_client_fixture):
+    requests_count = 3
+
+    for _ in range(requests_count):
+        response = http_client_fixture.get(local_server_url)
+        assert 'python' in response.text
+    stats = http_client_fixture.stats()
+
+    assert stats['requests'] == requests_count
+    assert stats['new_connections'] == 1, f'Expected one pooled connection, stats: {stats}'
+    assert stats['reused_connections'] == requests_count - 1
+
+
+def test_http_client_count_reconnects_of_connections_closed_by_server(
+        closing_server_url, http_client_fixture
+):
+    requests_count = 3
+
+    for _ in range(requests_count):
+        assert 'python' in http_client_fixture.get(closing_server_url).text
+    stats = http_client_fixture.stats()
+
+    assert stats['new_connections'] == requests_count, f'Expected reconnects, stats: {stats}'
+    assert stats['reused_connections'] == 0
+
+
+def test_http_client_send_compression_and_default_timeout(http_client_fixture):
+    assert 'gzip' in http_client_fixture.session.headers['Accept-Encoding']
+    assert http_client_fixture.timeout == (1, 1)
+
+
+@pytest.mark.parametrize(
+    'client_params',
+    [
+        pytest.param({'pool_connections': 0}, id='zero pool connections'),
+        pytest.param({'pool_maxsize': 0}, id='zero pool maxsize'),
+        pytest.param({'connect_timeout': 0}, id='zero connect timeout'),
+        pytest.param({'read_timeout': -1}, id='negative read timeout'),
+    ]
+)
+def test_http_client_raise_exception_if_invalid_params_provided(client_params):
+    params = {'pool_connections': 1, 'pool_maxsize': 1, 'connect_timeout': 1, 'read_timeout': 1}
+    params.update(client_params)
+
+    with pytest.raises(ValueError):
+        HttpClient(**params)
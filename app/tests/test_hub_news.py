@@ -0,0 +1,169 @@
+import threading
+import time
+
+import pytest
+
+from app.article import Article
+from app.hub_news import (
+    HubNewsFetcher, hub_page_number, hub_page_url, merge_articles, parse_news_command_args
+)
+
+PYTHON_HUB_URL = 'https://habr.com/ru/hub/python/'
+TESTING_HUB_URL = 'https://habr.com/ru/hub/it_testing/'
+HUBS_CONFIG = {
+    'python': {'url': PYTHON_HUB_URL, 'max_pages': 3},
+    'testing': {'url': TESTING_HUB_URL, 'max_pages': 5},
+}
+
+
+def make_article(link, votes='Рейтинг  0'):
+    return Article(f'title {link}', link, votes, 'Просмотры  1')
+
+
+@pytest.mark.parametrize(
+    'page_number, expected_url',
+    [
+        pytest.param(1, PYTHON_HUB_URL, id='first page'),
+        pytest.param(3, f'{PYTHON_HUB_URL}page3/', id='third page'),
+    ]
+)
+def test_hub_page_url(page_number, expected_url):
+    assert hub_page_url(PYTHON_HUB_URL, page_number) == expected_url
+
+
+@pytest.mark.parametrize(
+    'page_url, expected_number',
+    [
+        pytest.param(PYTHON_HUB_URL, 1, id='first page'),
+        pytest.param(f'{PYTHON_HUB_URL}page3/', 3, id='third page'),
+        pytest.param(TESTING_HUB_URL, 1, id='other hub'),
+    ]
+)
+def test_hub_page_number(page_url, expected_number):
+    assert hub_page_number(PYTHON_HUB_URL, page_url) == expected_number
+
+
+def test_hub_page_url_raise_exception_on_zero_page():
+    with pytest.raises(ValueError):
+        hub_page_url(PYTHON_HUB_URL, 0)
+
+
+@pytest.mark.parametrize(
+    'args, expected_result',
+    [
+        pytest.param(
+            [], ([(PYTHON_HUB_URL, 1), (TESTING_HUB_URL, 1)], 'recency'), id='all hubs by default'
+        ),
+        pytest.param(
+            ['Testing', 'pages=2', 'sort=score'],
+            ([(TESTING_HUB_URL, 2)], 'score'),
+            id='hub, pages and sort'
+        ),
+        pytest.param(
+            ['python,testing', 'pages=4'],
+            ([(PYTHON_HUB_URL, 3), (TESTING_HUB_URL, 4)], 'recency'),
+            id='pages limited by hub max pages'
+        ),
+    ]
+)
+def test_parse_news_command_args(args, expected_result):
+    assert parse_news_command_args(args, HUBS_CONFIG, default_pages=1) == expected_result
+
+
+@pytest.mark.parametrize(
+    'args',
+    [
+        pytest.param(['java'], id='unknown hub'),
+        pytest.param(['pages=0'], id='zero pages'),
+        pytest.param(['pages=many'], id='not number pages'),
+        pytest.param(['sort=title'], id='unknown sort'),
+        pytest.param([','], id='empty hubs list'),
+    ]
+)
+def test_parse_news_command_args_raise_exception_on_invalid_args(args):
+    with pytest.raises(ValueError):
+        parse_news_command_args(args, HUBS_CONFIG, default_pages=1)
+
+
+def test_merge_articles_interleave_hubs_and_dedupe_by_link():
+    python_articles = [make_article('a'), make_article('b'), make_article('c')]
+    testing_articles = [make_article('x'), make_article('b')]
+
+    merged_articles = merge_articles([python_articles, testing_articles], 'recency')
+
+    assert [article.link for article in merged_articles] == ['a', 'x', 'b', 'c']
+
+
+def test_merge_articles_sort_by_score():
+    python_articles = [make_article('a', 'Рейтинг  +1'), make_article('b', 'Рейтинг  +10')]
+    testing_articles = [make_article('x', 'Рейтинг  –3'), make_article('y', 'Рейтинг  +5')]
+
+    merged_articles = merge_articles([python_articles, testing_articles], 'score')
+
+    assert [article.link for article in merged_articles] == ['b', 'y', 'a', 'x']
+
+
+def test_fetcher_keep_hub_and_page_order():
+    fetcher = HubNewsFetcher(lambda url: ([make_article(url)], None), max_workers=4)
+
+    hubs_articles, stale_age = fetcher.fetch([(PYTHON_HUB_URL, 2), (TESTING_HUB_URL, 1)])
+
+    assert stale_age is None
+    assert [[article.link for article in articles] for articles in hubs_articles] == [
+        [PYTHON_HUB_URL, f'{PYTHON_HUB_URL}page2/'],
+        [TESTING_HUB_URL],
+    ]
+
+
+def test_fetcher_fetch_pages_concurrently():
+    pages_count = 4
+    barrier = threading.Barrier(pages_count, timeout=5)
+
+    def load_page(url):
+        barrier.wait()
+        return [make_article(url)], None
+
+    fetcher = HubNewsFetcher(load_page, max_workers=pages_count)
+    started_at = time.monotonic()
+
+    hubs_articles, _ = fetcher.fetch([(PYTHON_HUB_URL, pages_count)])
+
+    assert len(hubs_articles[0]) == pages_count
+    assert time.monotonic() - started_at < 5
+
+
+def test_fetcher_skip_failed_pages():
+    def load_page(url):
+        if url == TESTING_HUB_URL:
+            raise ConnectionError
+        return [make_article(url)], None
+
+    fetcher = HubNewsFetcher(load_page, max_workers=2)
+
+    assert fetcher.fetch([(PYTHON_HUB_URL, 1), (TESTING_HUB_URL, 1)]) == (
+        [[make_article(PYTHON_HUB_URL)], []], None
+    )
+
+
+def test_fetcher_return_age_of_the_oldest_stale_page():
+    stale_ages = {PYTHON_HUB_URL: 120.0, f'{PYTHON_HUB_URL}page2/': None, TESTING_HUB_URL: 600.0}
+    fetcher = HubNewsFetcher(lambda url: ([make_article(url)], stale_ages[url]), max_workers=2)
+
+    _, stale_age = fetcher.fetch([(PYTHON_HUB_URL, 2), (TESTING_HUB_URL, 1)])
+
+    assert stale_age == 600.0
+
+
+def test_fetcher_raise_exception_if_all_pages_failed():
+    def load_page(_):
+        raise ConnectionError
+
+    fetcher = HubNewsFetcher(load_page, max_workers=2)
+
+    with pytest.raises(ConnectionError):
+        fetcher.fetch([(PYTHON_HUB_URL, 2)])
+
+
+def test_fetcher_raise_exception_on_invalid_max_workers():
+    with pytest.raises(ValueError):
+        HubNewsFetcher(lambda url: ([], None), max_workers=0)
@@ -0,0 +1,125 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from app.article import Article
+from app.inline_search import (
+    SOURCE_HUBS, SOURCE_LOCAL, SOURCE_REMOTE, SOURCE_SEARCH_CACHE, Debouncer, InlineSearch
+)
+
+
+def build_article(title: str) -> Article:
+    return Article(title, f'https://habr.com/ru/post/{len(title)}/', 'Рейтинг  0', 'Просмотры  1')
+
+
+HUB_ARTICLES = [
+    build_article('Asyncio в Python 3.11'),
+    build_article('Тестирование API'),
+]
+REMOTE_ARTICLES = [build_article('Python asyncio internals')]
+
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    event = threading.Event()
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return True
+        event.wait(0.01)
+    return condition()
+
+
+def build_inline_search(**params) -> InlineSearch:
+    search_params = {
+        'hub_snapshots': lambda: [HUB_ARTICLES],
+        'cached_search': Mock(return_value=None),
+        'local_search': Mock(return_value=[]),
+        'remote_search': Mock(return_value=REMOTE_ARTICLES),
+        'max_results': 10,
+        'min_results': 1,
+        'remote_timeout': 5,
+        'remote_max_concurrent': 1,
+    }
+    search_params.update(params)
+    return InlineSearch(**search_params)
+
+
+def test_inline_search_answer_empty_query_with_hub_articles():
+    inline_search = build_inline_search()
+
+    assert inline_search.find('  ') == (HUB_ARTICLES, SOURCE_HUBS)
+    inline_search.remote_search.assert_not_called()
+
+
+def test_inline_search_answer_from_cached_search_results():
+    inline_search = build_inline_search(cached_search=Mock(return_value=REMOTE_ARTICLES))
+
+    assert inline_search.find('python asyncio') == (REMOTE_ARTICLES, SOURCE_SEARCH_CACHE)
+    inline_search.remote_search.assert_not_called()
+
+
+def test_inline_search_answer_from_hub_articles_matching_query():
+    inline_search = build_inline_search()
+
+    assert inline_search.find('python asyncio') == ([HUB_ARTICLES[0]], SOURCE_LOCAL)
+    inline_search.remote_search.assert_not_called()
+
+
+def test_inline_search_search_habr_if_local_data_has_not_enough_articles():
+    inline_search = build_inline_search(min_results=2)
+
+    assert inline_search.find('python asyncio') == (REMOTE_ARTICLES, SOURCE_REMOTE)
+    inline_search.remote_search.assert_called_once_with('python asyncio')
+
+
+def test_inline_search_answer_with_local_articles_if_habr_search_is_not_ready_in_time():
+    release = threading.Event()
+    inline_search = build_inline_search(
+        min_results=2, remote_timeout=0.01, remote_search=lambda _: release.wait(5)
+    )
+
+    result = inline_search.find('python asyncio')
+    busy_result = inline_search.find('python asyncio')
+    release.set()
+
+    assert result == busy_result == ([HUB_ARTICLES[0]], SOURCE_LOCAL)
+    assert inline_search.stats()['remote_timeouts'] == 1
+    assert inline_search.stats()['remote_skipped'] == 1
+
+
+def test_inline_search_limit_number_of_articles():
+    inline_search = build_inline_search(max_results=1)
+
+    assert inline_search.find('') == (HUB_ARTICLES[:1], SOURCE_HUBS)
+
+
+def test_debouncer_call_only_the_last_function_of_key():
+    calls = []
+    debouncer = Debouncer(delay=0.05)
+
+    debouncer.call(1, calls.append, 'pyt')
+    debouncer.call(1, calls.append, 'python')
+    debouncer.call(2, calls.append, 'pytest')
+
+    assert wait_for(lambda: len(calls) == 2)
+    assert sorted(calls) == ['pytest', 'python']
+    assert debouncer.stats() == {'scheduled': 3, 'superseded': 1, 'pending': 0}
+
+
+@pytest.mark.parametrize(
+    'search_params',
+    [
+        pytest.param({'max_results': 0}, id='zero max results'),
+        pytest.param({'min_results': -1}, id='negative min results'),
+        pytest.param({'remote_timeout': 0}, id='zero remote timeout'),
+        pytest.param({'remote_max_concurrent': 0}, id='zero remote concurrency'),
+    ]
+)
+def test_inline_search_raise_exception_if_invalid_params_provided(search_params):
+    with pytest.raises(ValueError):
+        build_inline_search(**search_params)
+
+
+def test_debouncer_raise_exception_if_invalid_params_provided():
+    with pytest.raises(ValueError):
+        Debouncer(delay=-1)
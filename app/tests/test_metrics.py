@@ -0,0 +1,103 @@
+import pytest
+import requests
+
+from app.metrics import Metrics, MetricsServer, format_labels
+
+
+@pytest.fixture(name='metrics')
+def metrics_fixture():
+    return Metrics(enabled=True, buckets=(0.1, 1))
+
+
+def test_metrics_render_counters_and_histograms(metrics):
+    metrics.inc('habr_requests_total', hub='python', status='200')
+    metrics.inc('habr_requests_total', hub='python', status='200')
+    metrics.observe('parse_seconds', 0.05, command='news', hub='python')
+    metrics.observe('parse_seconds', 0.5, command='news', hub='python')
+    metrics.observe('parse_seconds', 5, command='news', hub='python')
+
+    lines = metrics.render().splitlines()
+
+    assert 'habr_requests_total{hub="python",status="200"} 2' in lines
+    assert '# TYPE parse_seconds histogram' in lines
+    assert 'parse_seconds_bucket{command="news",hub="python",le="0.1"} 1' in lines
+    assert 'parse_seconds_bucket{command="news",hub="python",le="1"} 2' in lines
+    assert 'parse_seconds_bucket{command="news",hub="python",le="+Inf"} 3' in lines
+    assert 'parse_seconds_sum{command="news",hub="python"} 5.55' in lines
+    assert 'parse_seconds_count{command="news",hub="python"} 3' in lines
+
+
+def test_metrics_timer_count_errors(metrics):
+    with pytest.raises(ConnectionError):
+        with metrics.timer('habr_request_seconds', hub='python'):
+            raise ConnectionError
+
+    lines = metrics.render().splitlines()
+
+    assert 'errors_total{stage="habr_request_seconds"} 1' in lines
+    assert 'habr_request_seconds_count{hub="python"} 1' in lines
+
+
+def test_metrics_label_observations_with_current_command(metrics):
+    with metrics.command_context('news'):
+        command_in_context = metrics.current_command()
+
+    assert command_in_context == 'news'
+    assert metrics.current_command() == 'background'
+
+
+def test_metrics_keep_current_hub_in_context(metrics):
+    with metrics.hub_context('python'):
+        hub_in_context = metrics.current_hub()
+
+    assert hub_in_context == 'python'
+    assert metrics.current_hub() == 'none'
+
+
+def test_metrics_render_collected_stats_as_gauges(metrics):
+    metrics.register_collector('articles_cache', lambda: {'hits': 3, 'hit_rate': 0.75})
+    metrics.register_collector(
+        'command_executor', lambda: {'news': {'queued': 1, 'running': 2}}, 'command'
+    )
+
+    lines = metrics.render().splitlines()
+
+    assert 'articles_cache_hits 3' in lines
+    assert 'articles_cache_hit_rate 0.75' in lines
+    assert 'command_executor_queued{command="news"} 1' in lines
+    assert 'command_executor_running{command="news"} 2' in lines
+
+
+def test_disabled_metrics_do_not_collect_anything():
+    metrics = Metrics(enabled=False)
+    metrics.inc('habr_requests_total', hub='python', status='200')
+    with metrics.timer('parse_seconds', hub='python'):
+        pass
+
+    assert metrics.render() == '\n'
+
+
+def test_format_labels_escape_values():
+    assert format_labels((('query', 'say "hi"\n'),)) == '{query="say \\"hi\\"\\n"}'
+
+
+def test_metrics_server_serve_prometheus_text(metrics):
+    metrics.inc('habr_requests_total', hub='python', status='200')
+    server = MetricsServer(metrics, '127.0.0.1', 0)
+    server.start()
+    try:
+        host, port = server.server_address[:2]
+        response = requests.get(f'http://{host}:{port}/metrics', timeout=5)
+        not_found_response = requests.get(f'http://{host}:{port}/', timeout=5)
+    finally:
+        server.stop()
+
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    assert 'habr_requests_total{hub="python",status="200"} 1' in response.text
+    assert not_found_response.status_code == 404
+
+
+def test_metrics_raise_exception_on_not_sorted_buckets():
+    with pytest.raises(ValueError):
+        Metrics(enabled=True, buckets=(1, 0.1))
@@ -0,0 +1,51 @@
+import pytest
+
+from app.parse_executor import ParseExecutor
+from app.parser_backends import Bs4ParserBackend
+
+HABR_ARTICLES_DUMP_FILEPATH = 'app/tests/tests_data/habr_articles_dump.html'
+
+
+@pytest.fixture(scope='module')
+def habr_article_html_fixture() -> str:
+    with open(HABR_ARTICLES_DUMP_FILEPATH, encoding='utf-8') as file:
+        return file.read()
+
+
+@pytest.fixture(name='parse_executor')
+def parse_executor_fixture():
+    executor = ParseExecutor('stream', max_workers=1, min_process_bytes=1024)
+    yield executor
+    executor.shutdown()
+
+
+def test_parse_executor_parse_page_in_worker_process(parse_executor, habr_article_html_fixture):
+    expected_result = Bs4ParserBackend().parse(habr_article_html_fixture)
+
+    result = parse_executor.parse(habr_article_html_fixture)
+
+    assert result == expected_result
+    assert parse_executor.stats() == {'in_process': 1, 'in_thread': 0}
+
+
+def test_parse_executor_parse_small_page_in_calling_thread(parse_executor):
+    result = parse_executor.parse('<html><body></body></html>')
+
+    assert result == []
+    assert parse_executor.stats() == {'in_process': 0, 'in_thread': 1}
+
+
+@pytest.mark.parametrize(
+    'executor_params',
+    [
+        pytest.param({'backend_name': 'stream', 'max_workers': 0}, id='zero workers'),
+        pytest.param(
+            {'backend_name': 'stream', 'max_workers': 1, 'min_process_bytes': -1},
+            id='negative min process bytes'
+        ),
+        pytest.param({'backend_name': 'unknown', 'max_workers': 1}, id='unknown backend'),
+    ]
+)
+def test_parse_executor_raise_exception_on_invalid_params(executor_params):
+    with pytest.raises(ValueError):
+        ParseExecutor(**executor_params)
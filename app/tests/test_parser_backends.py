@@ -0,0 +1,61 @@
+import pytest
+
+from app.parser_backends import (
+    PARSER_BACKENDS, Bs4ParserBackend, get_parser_backend, StrainedBs4ParserBackend
+)
+
+HABR_ARTICLES_DUMP_FILEPATH = 'app/tests/tests_data/habr_articles_dump.html'
+HABR_EMPTY_ARTICLES_DUMP_FILEPATH = 'app/tests/tests_data/habr_empty_articles_dump.html'
+
+
+@pytest.fixture(scope='module')
+def habr_article_html_fixture() -> str:
+    with open(HABR_ARTICLES_DUMP_FILEPATH, 'r') as fio:
+        content = fio.read()
+    return content
+
+
+@pytest.fixture(scope='module')
+def habr_empty_article_html_fixture() -> str:
+    with open(HABR_EMPTY_ARTICLES_DUMP_FILEPATH, 'r') as fio:
+        content = fio.read()
+    return content
+
+
+@pytest.mark.parametrize('backend_name', sorted(PARSER_BACKENDS))
+def test_parser_backend_result_equal_to_reference_backend(backend_name, habr_article_html_fixture):
+    expected_result = Bs4ParserBackend().parse(habr_article_html_fixture)
+
+    result = get_parser_backend(backend_name).parse(habr_article_html_fixture)
+
+    assert 20 == len(result)
+    assert expected_result == result, (
+        f'Expected result: {expected_result} while yours: {result}'
+    )
+
+
+@pytest.mark.parametrize('backend_name', sorted(PARSER_BACKENDS))
+def test_parser_backend_return_empty_list_if_no_articles_found(
+        backend_name, habr_empty_article_html_fixture
+):
+    result = get_parser_backend(backend_name).parse(habr_empty_article_html_fixture)
+
+    assert [] == result
+
+
+def test_strained_parser_backend_parse_megapost_article(habr_article_html_fixture):
+    expected_result = (
+        'РСХБ на рейде: собираем профессиональную гильдию тестировщиков',
+        '/ru/article/598441/',
+        'Всего голосов 21: ↑18 и ↓3  +15',
+        'Просмотры  8.9K'
+    )
+
+    result = StrainedBs4ParserBackend().parse(habr_article_html_fixture)
+
+    assert expected_result in result
+
+
+def test_get_parser_backend_raise_exception_if_unknown_name_provided():
+    with pytest.raises(ValueError):
+        get_parser_backend('unknown')
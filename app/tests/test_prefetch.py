@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from app.article import Article
+from app.prefetch import HubPrefetcher
+
+PYTHON_HUB_URL = 'https://habr.com/ru/hub/python/'
+TESTING_HUB_URL = 'https://habr.com/ru/hub/it_testing/'
+
+
+class FakeCache:
+    def __init__(self, failing_urls=()):
+        self.failing_urls = failing_urls
+        self.refreshed_urls = []
+        self.refreshed = threading.Event()
+
+    def refresh(self, url):
+        self.refreshed_urls.append(url)
+        self.refreshed.set()
+        if url in self.failing_urls:
+            raise ConnectionError
+        return [Article('title', url, 'Рейтинг  0', 'Просмотры  1')]
+
+
+def test_prefetcher_refresh_all_hubs_and_report_outcome():
+    cache = FakeCache(failing_urls=(TESTING_HUB_URL,))
+    prefetcher = HubPrefetcher(
+        cache, [PYTHON_HUB_URL, TESTING_HUB_URL], interval=60, max_concurrent_refreshes=2
+    )
+
+    outcomes = prefetcher.refresh_all()
+
+    assert outcomes == {PYTHON_HUB_URL: True, TESTING_HUB_URL: False}
+    assert sorted(cache.refreshed_urls) == sorted([PYTHON_HUB_URL, TESTING_HUB_URL])
+
+
+def test_prefetcher_refresh_hubs_right_after_start():
+    cache = FakeCache()
+    prefetcher = HubPrefetcher(cache, [PYTHON_HUB_URL], interval=60)
+
+    prefetcher.start()
+    try:
+        assert cache.refreshed.wait(timeout=5), 'Hubs were not refreshed after start'
+    finally:
+        prefetcher.stop()
+
+
+def test_prefetcher_next_delay_stay_within_jitter():
+    prefetcher = HubPrefetcher(FakeCache(), [PYTHON_HUB_URL], interval=60, jitter=10)
+
+    delays = [prefetcher.next_delay() for _ in range(100)]
+
+    assert all(50 <= delay <= 70 for delay in delays)
+
+
+@pytest.mark.parametrize(
+    'prefetcher_params',
+    [
+        pytest.param({'interval': 0}, id='zero interval'),
+        pytest.param({'jitter': -1}, id='negative jitter'),
+        pytest.param({'jitter': 60}, id='jitter equal to interval'),
+        pytest.param({'max_concurrent_refreshes': 0}, id='zero concurrent refreshes'),
+    ]
+)
+def test_prefetcher_raise_exception_if_invalid_params_provided(prefetcher_params):
+    params = {'interval': 60}
+    params.update(prefetcher_params)
+
+    with pytest.raises(ValueError):
+        HubPrefetcher(FakeCache(), [PYTHON_HUB_URL], **params)
@@ -0,0 +1,47 @@
+import pytest
+
+from app.rate_limit import TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_allow_burst_then_limit_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.wait_time() == pytest.approx(0.5)
+
+    clock.now = 0.5
+
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_token_bucket_do_not_grow_over_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock)
+    bucket.try_acquire()
+
+    clock.now = 100
+
+    assert bucket.is_full()
+    assert [bucket.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+@pytest.mark.parametrize(
+    'bucket_params',
+    [
+        pytest.param({'rate': 0, 'capacity': 1}, id='zero rate'),
+        pytest.param({'rate': 1, 'capacity': 0.5}, id='capacity less than one token'),
+    ]
+)
+def test_token_bucket_raise_exception_on_invalid_params(bucket_params):
+    with pytest.raises(ValueError):
+        TokenBucket(**bucket_params)
@@ -0,0 +1,204 @@
+from unittest.mock import Mock
+
+import pytest
+
+from app.resilience import (
+    CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, CircuitBreaker, CircuitBreakers,
+    CircuitOpenError, ClientStatusError, RetryAfterError, RetryPolicy, parse_retry_after
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope='function')
+def clock_fixture():
+    return FakeClock()
+
+
+@pytest.fixture(scope='function')
+def sleeps_fixture():
+    return []
+
+
+def test_retry_policy_retry_until_success(sleeps_fixture):
+    policy = RetryPolicy(3, base_delay=1, max_delay=10, sleep=sleeps_fixture.append)
+    function = Mock(side_effect=[ConnectionError, ConnectionError, 'result'])
+
+    result = policy.call(function, 'url', stream=True)
+
+    assert result == 'result'
+    assert function.call_count == 3
+    function.assert_called_with('url', stream=True)
+    assert len(sleeps_fixture) == 2
+
+
+def test_retry_policy_raise_last_exception_after_max_attempts(sleeps_fixture):
+    policy = RetryPolicy(2, base_delay=1, max_delay=10, sleep=sleeps_fixture.append)
+    function = Mock(side_effect=ConnectionError)
+
+    with pytest.raises(ConnectionError):
+        policy.call(function)
+
+    assert function.call_count == 2
+    assert len(sleeps_fixture) == 1
+
+
+@pytest.mark.parametrize(
+    'exception',
+    [
+        pytest.param(CircuitOpenError(), id='circuit open'),
+        pytest.param(ClientStatusError(404), id='client error status'),
+        pytest.param(ValueError(), id='not retried exception'),
+    ]
+)
+def test_retry_policy_do_not_retry_exception(exception, sleeps_fixture):
+    policy = RetryPolicy(3, base_delay=1, max_delay=10, sleep=sleeps_fixture.append)
+    function = Mock(side_effect=exception)
+
+    with pytest.raises(type(exception)):
+        policy.call(function)
+
+    assert function.call_count == 1
+    assert not sleeps_fixture
+
+
+@pytest.mark.parametrize(
+    'retry_number, expected_delay',
+    [
+        pytest.param(0, 0.5, id='first retry'),
+        pytest.param(2, 2.0, id='third retry'),
+        pytest.param(10, 5.0, id='max delay'),
+    ]
+)
+def test_retry_policy_delay_is_bounded_exponential_jitter(retry_number, expected_delay):
+    policy = RetryPolicy(3, base_delay=0.5, max_delay=5, random_share=lambda: 1.0)
+
+    assert policy.delay(retry_number) == expected_delay
+
+
+def test_retry_policy_wait_retry_after_before_retry(sleeps_fixture):
+    policy = RetryPolicy(3, base_delay=0.1, max_delay=10, sleep=sleeps_fixture.append)
+    function = Mock(side_effect=[RetryAfterError(5), 'result'])
+
+    assert policy.call(function) == 'result'
+    assert sleeps_fixture == [5]
+
+
+def test_retry_policy_do_not_retry_if_retry_after_is_longer_than_max_delay(sleeps_fixture):
+    policy = RetryPolicy(3, base_delay=0.1, max_delay=10, sleep=sleeps_fixture.append)
+    function = Mock(side_effect=RetryAfterError(60))
+
+    with pytest.raises(RetryAfterError):
+        policy.call(function)
+
+    assert function.call_count == 1
+    assert not sleeps_fixture
+
+
+@pytest.mark.parametrize(
+    'header, expected_seconds',
+    [
+        pytest.param('120', 120.0, id='seconds'),
+        pytest.param('Wed, 21 Oct 2015 07:28:00 GMT', 0.0, id='past date'),
+        pytest.param(None, None, id='missing'),
+        pytest.param('soon', None, id='invalid'),
+    ]
+)
+def test_parse_retry_after_return_seconds(header, expected_seconds):
+    assert parse_retry_after(header) == expected_seconds
+
+
+def test_circuit_breaker_open_after_consecutive_failures(clock_fixture):
+    breaker = CircuitBreaker('habr.com', failure_threshold=2, reset_timeout=30, clock=clock_fixture)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+    breaker.record_failure()
+
+    assert breaker.state == CIRCUIT_OPEN
+    assert not breaker.allow_request()
+    assert breaker.stats() == {
+        'opened': 1, 'half_opened': 0, 'closed': 0, 'rejected': 1, 'state': 2
+    }
+
+
+def test_circuit_breaker_allow_one_trial_request_after_reset_timeout(clock_fixture):
+    breaker = CircuitBreaker('habr.com', failure_threshold=1, reset_timeout=30, clock=clock_fixture)
+    breaker.record_failure()
+    clock_fixture.now = 30
+
+    assert breaker.allow_request()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_success()
+
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.allow_request()
+
+
+def test_circuit_breaker_open_again_if_trial_request_failed(clock_fixture):
+    breaker = CircuitBreaker('habr.com', failure_threshold=3, reset_timeout=30, clock=clock_fixture)
+    for _ in range(3):
+        breaker.record_failure()
+    clock_fixture.now = 30
+    breaker.allow_request()
+
+    breaker.record_failure()
+
+    assert breaker.state == CIRCUIT_OPEN
+    clock_fixture.now = 59
+    assert not breaker.allow_request()
+    clock_fixture.now = 60
+    assert breaker.allow_request()
+
+
+def test_circuit_breakers_create_one_breaker_per_host():
+    breakers = CircuitBreakers(failure_threshold=1, reset_timeout=30)
+
+    breakers.get('habr.com').record_failure()
+
+    assert breakers.get('habr.com') is breakers.get('habr.com')
+    assert breakers.get('habr.com').state == CIRCUIT_OPEN
+    assert breakers.get('example.com').state == CIRCUIT_CLOSED
+    assert set(breakers.stats()) == {'habr.com', 'example.com'}
+
+
+@pytest.mark.parametrize(
+    'policy_params',
+    [
+        pytest.param({'max_attempts': 0}, id='zero attempts'),
+        pytest.param({'base_delay': -1}, id='negative base delay'),
+        pytest.param({'max_delay': -1}, id='negative max delay'),
+    ]
+)
+def test_retry_policy_raise_exception_if_invalid_params_provided(policy_params):
+    params = {'max_attempts': 1, 'base_delay': 0, 'max_delay': 0}
+    params.update(policy_params)
+
+    with pytest.raises(ValueError):
+        RetryPolicy(**params)
+
+
+@pytest.mark.parametrize(
+    'breaker_params',
+    [
+        pytest.param({'failure_threshold': 0}, id='zero failure threshold'),
+        pytest.param({'reset_timeout': 0}, id='zero reset timeout'),
+    ]
+)
+def test_circuit_breaker_raise_exception_if_invalid_params_provided(breaker_params):
+    params = {'failure_threshold': 1, 'reset_timeout': 1}
+    params.update(breaker_params)
+
+    with pytest.raises(ValueError):
+        CircuitBreaker('habr.com', **params)
+    with pytest.raises(ValueError):
+        CircuitBreakers(**params)
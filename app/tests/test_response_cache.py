@@ -0,0 +1,75 @@
+import pytest
+
+from app.article import Article
+from app.response_cache import ResponseCache
+
+HABR_URL = 'https://habr.com/ru/hub/python/'
+
+
+@pytest.fixture(scope='function')
+def articles_fixture():
+    return [
+        Article(
+            'Эпические баги прошлого',
+            'https://habr.com/ru/post/645133/',
+            'Всего голосов 26: ↑25 и ↓1  +24',
+            'Просмотры  6.6K'
+        ),
+    ]
+
+
+def test_response_cache_can_restore_response_in_new_instance(tmp_path, articles_fixture):
+    ResponseCache(str(tmp_path), max_bytes=10 ** 6).put(
+        HABR_URL, '"etag"', 'Wed, 12 Jan 2022 10:00:00 GMT', '<html></html>', articles_fixture
+    )
+
+    cached_response = ResponseCache(str(tmp_path), max_bytes=10 ** 6).get(HABR_URL)
+
+    assert cached_response.etag == '"etag"'
+    assert cached_response.last_modified == 'Wed, 12 Jan 2022 10:00:00 GMT'
+    assert cached_response.body == '<html></html>'
+    assert cached_response.articles == articles_fixture
+
+
+def test_response_cache_does_not_store_response_without_validators(tmp_path, articles_fixture):
+    cache = ResponseCache(str(tmp_path), max_bytes=10 ** 6)
+
+    cache.put(HABR_URL, None, None, '<html></html>', articles_fixture)
+
+    assert cache.get(HABR_URL) is None
+
+
+def test_response_cache_evict_oldest_files_over_size_limit(tmp_path, articles_fixture):
+    body = 'x' * 1000
+    cache = ResponseCache(str(tmp_path), max_bytes=3000)
+
+    for page_number in range(3):
+        cache.put(f'{HABR_URL}page{page_number}/', '"etag"', None, body, articles_fixture)
+
+    assert cache.size() <= 3000
+    assert cache.get(f'{HABR_URL}page0/') is None
+    assert cache.get(f'{HABR_URL}page2/') is not None
+
+
+def test_response_cache_ignore_broken_cache_file(tmp_path, articles_fixture):
+    cache = ResponseCache(str(tmp_path), max_bytes=10 ** 6)
+    cache.put(HABR_URL, '"etag"', None, '<html></html>', articles_fixture)
+    with open(cache._path(HABR_URL), 'w', encoding='utf 8') as file:
+        file.write('{broken')
+
+    assert cache.get(HABR_URL) is None
+
+
+@pytest.mark.parametrize(
+    'cache_params',
+    [
+        pytest.param({'directory': None}, id='None directory'),
+        pytest.param({'max_bytes': 0}, id='zero max bytes'),
+    ]
+)
+def test_response_cache_raise_exception_if_invalid_params_provided(tmp_path, cache_params):
+    params = {'directory': str(tmp_path), 'max_bytes': 1}
+    params.update(cache_params)
+
+    with pytest.raises(ValueError):
+        ResponseCache(**params)
@@ -0,0 +1,114 @@
+import pytest
+
+from app.article import Article
+from app.result_pages import ResultPages, page_callback_data, parse_page_callback_data
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(scope='function')
+def clock_fixture():
+    return FakeClock()
+
+
+@pytest.fixture(scope='function')
+def articles_fixture():
+    return [
+        Article(f'title {index}', f'https://habr.com/ru/post/{index}/', 'Рейтинг  0', 'Просмотры  1')
+        for index in range(7)
+    ]
+
+
+def test_result_pages_split_articles_into_pages(clock_fixture, articles_fixture):
+    pages = ResultPages(page_size=3, ttl=60, max_entries=2, clock=clock_fixture)
+
+    first_page = pages.put(articles_fixture)
+    last_page = pages.get_page(first_page.token, 2)
+
+    assert first_page.articles == articles_fixture[:3]
+    assert (first_page.number, first_page.pages_count) == (0, 3)
+    assert last_page.articles == articles_fixture[6:]
+    assert last_page.token == first_page.token
+
+
+@pytest.mark.parametrize(
+    'number',
+    [
+        pytest.param(-1, id='negative page'),
+        pytest.param(3, id='page after the last one'),
+    ]
+)
+def test_result_pages_return_none_for_missing_page(number, clock_fixture, articles_fixture):
+    pages = ResultPages(page_size=3, ttl=60, max_entries=2, clock=clock_fixture)
+    token = pages.put(articles_fixture).token
+
+    assert pages.get_page(token, number) is None
+    assert pages.stats()['misses'] == 1
+
+
+def test_result_pages_expire_result_set_after_ttl(clock_fixture, articles_fixture):
+    pages = ResultPages(page_size=3, ttl=60, max_entries=2, clock=clock_fixture)
+    token = pages.put(articles_fixture).token
+
+    clock_fixture.now = 59
+    assert pages.get_page(token, 1) is not None
+    clock_fixture.now = 60
+    assert pages.get_page(token, 1) is None
+    assert pages.stats()['size'] == 0
+
+
+def test_result_pages_evict_least_recently_used_result_set(clock_fixture, articles_fixture):
+    pages = ResultPages(page_size=3, ttl=60, max_entries=2, clock=clock_fixture)
+    first_token = pages.put(articles_fixture).token
+    second_token = pages.put(articles_fixture).token
+    pages.get_page(first_token, 1)
+
+    third_token = pages.put(articles_fixture).token
+
+    assert pages.get_page(second_token, 0) is None
+    assert pages.get_page(first_token, 0) is not None
+    assert pages.get_page(third_token, 0) is not None
+    assert pages.stats()['evictions'] == 1
+
+
+def test_page_callback_data_can_be_parsed():
+    data = page_callback_data('Ab3_x-9Q', 2)
+
+    assert len(data.encode('utf-8')) <= 64
+    assert parse_page_callback_data(data) == ('Ab3_x-9Q', 2)
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        pytest.param('subscribe:python', id='other button'),
+        pytest.param('page:Ab3_x-9Q:next', id='not number page'),
+        pytest.param('page::1', id='empty token'),
+        pytest.param('page:Ab3_x-9Q:1:2', id='extra part'),
+    ]
+)
+def test_parse_page_callback_data_raise_exception_if_invalid_data_provided(data):
+    with pytest.raises(ValueError):
+        parse_page_callback_data(data)
+
+
+@pytest.mark.parametrize(
+    'pages_params',
+    [
+        pytest.param({'page_size': 0}, id='zero page size'),
+        pytest.param({'ttl': 0}, id='zero ttl'),
+        pytest.param({'max_entries': 0}, id='zero max entries'),
+    ]
+)
+def test_result_pages_raise_exception_if_invalid_params_provided(pages_params):
+    params = {'page_size': 1, 'ttl': 1, 'max_entries': 1}
+    params.update(pages_params)
+
+    with pytest.raises(ValueError):
+        ResultPages(**params)
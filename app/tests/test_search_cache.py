@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.article import Article
+from app.search_cache import SearchResultsCache
+
+SEARCH_URL = 'https://habr.com/ru/search/?q='
+
+
+@pytest.fixture(scope='function')
+def mock_search_habr_articles():
+    with patch('app.search_cache.search_habr_articles') as mock_search:
+        mock_search.side_effect = lambda url, query: [
+            Article(query, f'{url}{query}', 'Рейтинг  0', 'Просмотры  1')
+        ]
+        yield mock_search
+
+
+def test_search_results_cache_share_result_of_trivially_different_queries(
+        mock_search_habr_articles
+):
+    cache = SearchResultsCache(ttl=60, max_entries=10)
+
+    results = [cache.get(SEARCH_URL, query) for query in ('Python', 'python ', 'PYTHON')]
+
+    mock_search_habr_articles.assert_called_once_with(SEARCH_URL, 'python')
+    assert results[0] == results[1] == results[2]
+    assert pytest.approx(2 / 3) == cache.stats()['hit_rate']
+
+
+def test_search_results_cache_report_popular_queries(mock_search_habr_articles):
+    cache = SearchResultsCache(ttl=60, max_entries=10)
+
+    for query in ('python', 'Python', 'pytest', 'asyncio', 'pytest', 'python'):
+        cache.get(SEARCH_URL, query)
+
+    assert [('python', 3), ('pytest', 2)] == cache.popular_queries(2)
+
+
+def test_search_results_cache_drop_least_popular_queries_over_limit(mock_search_habr_articles):
+    cache = SearchResultsCache(ttl=60, max_entries=10, tracked_queries_limit=1)
+
+    for query in ('python', 'python', 'pytest', 'asyncio'):
+        cache.get(SEARCH_URL, query)
+
+    assert [('python', 2)] == cache.popular_queries(10)
+
+
+def test_search_results_cache_peek_cached_results_without_search(mock_search_habr_articles):
+    cache = SearchResultsCache(ttl=60, max_entries=10)
+    cache.get(SEARCH_URL, 'python')
+
+    assert cache.peek(SEARCH_URL, ' Python ') == cache.get(SEARCH_URL, 'python')
+    assert cache.peek(SEARCH_URL, 'pytest') is None
+    mock_search_habr_articles.assert_called_once_with(SEARCH_URL, 'python')
+    assert [('python', 2)] == cache.popular_queries(2)
+
+
+def test_search_results_cache_evict_results_over_max_entries(mock_search_habr_articles):
+    cache = SearchResultsCache(ttl=60, max_entries=1)
+
+    cache.get(SEARCH_URL, 'python')
+    cache.get(SEARCH_URL, 'pytest')
+    cache.get(SEARCH_URL, 'python')
+
+    assert 3 == mock_search_habr_articles.call_count
+    assert 2 == cache.stats()['evictions']
+
+
+@pytest.mark.parametrize(
+    'cache_params',
+    [
+        pytest.param({'ttl': 0}, id='zero ttl'),
+        pytest.param({'max_entries': 0}, id='zero max entries'),
+        pytest.param({'tracked_queries_limit': 0}, id='zero tracked queries'),
+    ]
+)
+def test_search_results_cache_raise_exception_if_invalid_params_provided(cache_params):
+    params = {'ttl': 1, 'max_entries': 1}
+    params.update(cache_params)
+
+    with pytest.raises(ValueError):
+        SearchResultsCache(**params)
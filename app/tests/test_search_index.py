@@ -0,0 +1,72 @@
+import pytest
+
+from app.article import Article
+from app.search_index import normalize_token, SearchIndex, tokenize
+
+
+def build_article(post_id, title, views='Просмотры  1'):
+    return Article(title, f'https://habr.com/ru/post/{post_id}/', 'Рейтинг  0', views)
+
+
+@pytest.fixture(scope='function')
+def search_index_fixture():
+    search_index = SearchIndex()
+    search_index.add_articles(
+        [
+            build_article(1, 'Начало работы с Playwright', views='Просмотры  1.4K'),
+            build_article(2, 'Транзакционное юнит-тестирование приложений с БД', views='Просмотры  3.8K'),
+            build_article(3, 'Что такое тестирование. Курс молодого бойца', views='Просмотры  13K'),
+            build_article(4, 'Asyncio в Python для тестировщиков', views='Просмотры  379'),
+        ]
+    )
+    return search_index
+
+
+@pytest.mark.parametrize(
+    'token, expected_result',
+    [
+        pytest.param('Тестирования', 'тестирован', id='russian genitive'),
+        pytest.param('тестирование', 'тестирован', id='russian nominative'),
+        pytest.param('Ёлки', 'елк', id='yo letter'),
+        pytest.param('Tests', 'test', id='english plural'),
+        pytest.param('Python', 'python', id='english word'),
+        pytest.param('БД', 'бд', id='short word'),
+    ]
+)
+def test_normalize_token_can_normalize_words(token, expected_result):
+    assert expected_result == normalize_token(token)
+
+
+def test_tokenize_split_text_into_normalized_words():
+    assert {'юнит', 'тестирован'} == tokenize('Юнит-тестирования!')
+
+
+def test_search_index_rank_matched_articles_by_popularity(search_index_fixture):
+    result = search_index_fixture.search('ТЕСТИРОВАНИЯ', limit=10)
+
+    assert ['3', '2'] == [article.link.split('/')[-2] for article in result]
+
+
+def test_search_index_rank_articles_by_terms_match_first(search_index_fixture):
+    result = search_index_fixture.search('тестирование БД', limit=10, min_match_ratio=0.5)
+
+    assert ['2', '3'] == [article.link.split('/')[-2] for article in result]
+
+
+def test_search_index_update_known_article(search_index_fixture):
+    search_index_fixture.add_articles([build_article(1, 'Начало работы с Selenium')])
+
+    assert [] == search_index_fixture.search('playwright', limit=10)
+    assert 1 == len(search_index_fixture.search('selenium', limit=10))
+    assert 4 == len(search_index_fixture)
+
+
+@pytest.mark.parametrize(
+    'query',
+    [
+        pytest.param('kubernetes', id='unknown word'),
+        pytest.param('!!!', id='no words'),
+    ]
+)
+def test_search_index_return_empty_list_if_nothing_found(search_index_fixture, query):
+    assert [] == search_index_fixture.search(query, limit=10)
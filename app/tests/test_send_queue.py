@@ -0,0 +1,135 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from telegram.error import RetryAfter
+
+from app.metrics import Metrics
+from app.send_queue import PRIORITY_BROADCAST, SendQueue
+
+
+class RecordingSender:
+    def __init__(self, expected_messages_count, retry_after_texts=()):
+        self.expected_messages_count = expected_messages_count
+        self.retry_after_texts = set(retry_after_texts)
+        self.sent = []
+        self.all_sent = threading.Event()
+
+    def __call__(self, chat_id, text, **kwargs):
+        if text in self.retry_after_texts:
+            self.retry_after_texts.discard(text)
+            raise RetryAfter(0.05)
+        self.sent.append((chat_id, text, kwargs, time.monotonic()))
+        if len(self.sent) == self.expected_messages_count:
+            self.all_sent.set()
+
+
+def make_send_queue(**params):
+    queue_params = {
+        'global_rate': 1000,
+        'global_burst': 1000,
+        'chat_rate': 1000,
+        'chat_burst': 1000,
+        'max_queue_size': 10,
+    }
+    queue_params.update(params)
+    return SendQueue(**queue_params)
+
+
+def test_send_queue_send_replies_before_broadcasts():
+    send_queue = make_send_queue()
+    sender = RecordingSender(expected_messages_count=3)
+    send_queue.put(1, 'broadcast 1', priority=PRIORITY_BROADCAST)
+    send_queue.put(2, 'broadcast 2', priority=PRIORITY_BROADCAST)
+    send_queue.put(3, 'reply', parse_mode='Markdown')
+
+    send_queue.start(sender)
+    try:
+        assert sender.all_sent.wait(timeout=5)
+    finally:
+        send_queue.stop()
+
+    assert [(chat_id, text, kwargs) for chat_id, text, kwargs, _ in sender.sent] == [
+        (3, 'reply', {'parse_mode': 'Markdown'}),
+        (1, 'broadcast 1', {}),
+        (2, 'broadcast 2', {}),
+    ]
+
+
+def test_send_queue_label_send_time_with_command_and_hub_of_queued_message():
+    metrics = Metrics(enabled=True, buckets=(1,))
+    send_queue = make_send_queue()
+    sender = RecordingSender(expected_messages_count=1)
+
+    with patch('app.send_queue.metrics', metrics):
+        with metrics.command_context('news'), metrics.hub_context('python'):
+            send_queue.put(1, 'reply')
+        send_queue.start(sender)
+        try:
+            assert sender.all_sent.wait(timeout=5)
+        finally:
+            send_queue.stop()
+
+    assert (
+        'telegram_send_seconds_count{command="news",hub="python",priority="reply"} 1'
+        in metrics.render().splitlines()
+    )
+
+
+def test_send_queue_keep_chat_messages_order_within_chat_rate():
+    send_queue = make_send_queue(chat_rate=20, chat_burst=1, workers=2)
+    sender = RecordingSender(expected_messages_count=3)
+    for index in range(3):
+        send_queue.put(1, f'message {index}')
+
+    send_queue.start(sender)
+    try:
+        assert sender.all_sent.wait(timeout=5)
+    finally:
+        send_queue.stop()
+
+    assert [text for _, text, _, _ in sender.sent] == ['message 0', 'message 1', 'message 2']
+    assert sender.sent[-1][3] - sender.sent[0][3] >= 0.09
+
+
+def test_send_queue_resend_message_after_retry_after():
+    send_queue = make_send_queue()
+    sender = RecordingSender(expected_messages_count=2, retry_after_texts=('first',))
+    send_queue.put(1, 'first')
+    send_queue.put(1, 'second')
+
+    send_queue.start(sender)
+    try:
+        assert sender.all_sent.wait(timeout=5)
+    finally:
+        send_queue.stop()
+
+    assert [text for _, text, _, _ in sender.sent] == ['first', 'second']
+    stats = send_queue.stats()
+    assert stats['retry_after'] == 1
+    assert stats['sent'] == 2
+    assert stats['queued_replies'] == 0
+
+
+def test_send_queue_reject_message_if_queue_is_full():
+    send_queue = make_send_queue(max_queue_size=1)
+
+    assert send_queue.put(1, 'first')
+    assert not send_queue.put(2, 'second')
+    assert send_queue.stats()['rejected'] == 1
+
+
+@pytest.mark.parametrize(
+    'queue_params',
+    [
+        pytest.param({'chat_rate': 0}, id='zero chat rate'),
+        pytest.param({'global_burst': 0}, id='zero global burst'),
+        pytest.param({'max_queue_size': 0}, id='zero queue size'),
+        pytest.param({'workers': 0}, id='zero workers'),
+        pytest.param({'max_retries': -1}, id='negative retries'),
+    ]
+)
+def test_send_queue_raise_exception_on_invalid_params(queue_params):
+    with pytest.raises(ValueError):
+        make_send_queue(**queue_params)
@@ -0,0 +1,61 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.single_flight import SingleFlight
+
+CALLERS_COUNT = 5
+
+
+def test_single_flight_coalesce_concurrent_calls_with_same_key():
+    single_flight = SingleFlight()
+    release_call = threading.Event()
+    calls = []
+
+    def slow_function():
+        calls.append(1)
+        release_call.wait(timeout=5)
+        return ['article']
+
+    with ThreadPoolExecutor(max_workers=CALLERS_COUNT) as executor:
+        futures = [
+            executor.submit(single_flight.do, 'key', slow_function)
+            for _ in range(CALLERS_COUNT)
+        ]
+        while single_flight.stats()['coalesced'] < CALLERS_COUNT - 1:
+            threading.Event().wait(0.01)
+        release_call.set()
+        results = [future.result(timeout=5) for future in futures]
+
+    assert 1 == len(calls)
+    assert all(result is results[0] for result in results)
+    assert {'executed': 1, 'coalesced': CALLERS_COUNT - 1} == single_flight.stats()
+
+
+def test_single_flight_share_exception_with_waiting_callers():
+    single_flight = SingleFlight()
+    release_call = threading.Event()
+
+    def failing_function():
+        release_call.wait(timeout=5)
+        raise ConnectionError
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(single_flight.do, 'key', failing_function) for _ in range(2)]
+        while single_flight.stats()['coalesced'] < 1:
+            threading.Event().wait(0.01)
+        release_call.set()
+        for future in futures:
+            with pytest.raises(ConnectionError):
+                future.result(timeout=5)
+
+
+def test_single_flight_run_sequential_calls_separately():
+    single_flight = SingleFlight()
+
+    first_result = single_flight.do('key', lambda: 1)
+    second_result = single_flight.do('key', lambda: 2)
+
+    assert (1, 2) == (first_result, second_result)
+    assert {'executed': 2, 'coalesced': 0} == single_flight.stats()
@@ -0,0 +1,153 @@
+import os
+import sqlite3
+
+import pytest
+
+from app.article import Article
+from app.storage import ArticleStore
+
+
+def build_article(post_id, views='Просмотры  1', votes='Рейтинг  0'):
+    return Article(f'Статья {post_id}', f'https://habr.com/ru/post/{post_id}/', votes, views)
+
+
+@pytest.fixture(scope='function')
+def store_fixture(tmp_path):
+    store = ArticleStore(str(tmp_path / 'articles.sqlite3'))
+    yield store
+    store.close()
+
+
+def test_article_store_update_known_articles_on_upsert(store_fixture):
+    store_fixture.upsert_articles([build_article(1)], hub='python', seen_at=100)
+
+    store_fixture.upsert_articles(
+        [build_article(1, views='Просмотры  2K', votes='Всего голосов 3: ↑3 и ↓0  +3')],
+        hub='python',
+        seen_at=200
+    )
+
+    assert 1 == store_fixture.count()
+    article = store_fixture.all_articles()[0]
+    assert (3, 2000) == (article.score, article.views_count)
+    assert [] == store_fixture.seen_since(201)
+    assert [article] == store_fixture.seen_since(150)
+
+
+def test_article_store_return_latest_articles_in_hub(store_fixture):
+    store_fixture.upsert_articles([build_article(2), build_article(1)], hub='python', seen_at=100)
+    store_fixture.upsert_articles([build_article(3), build_article(2)], hub='python', seen_at=200)
+    store_fixture.upsert_articles([build_article(4)], hub='testing', seen_at=300)
+
+    result = store_fixture.latest_in_hub('python', limit=2)
+
+    assert [build_article(3), build_article(2)] == result
+
+
+@pytest.mark.parametrize(
+    'first_page_seen_at, second_page_seen_at',
+    [
+        pytest.param(100, 200, id='second page stored later'),
+        pytest.param(200, 100, id='second page stored earlier'),
+    ]
+)
+def test_article_store_rank_articles_of_several_hub_pages_newest_first(
+        store_fixture, first_page_seen_at, second_page_seen_at
+):
+    first_page = [build_article(f'new{index}') for index in range(2)]
+    second_page = [build_article(f'old{index}') for index in range(2)]
+    store_fixture.upsert_articles(first_page, hub='python', seen_at=first_page_seen_at)
+    store_fixture.upsert_articles(
+        second_page, hub='python', seen_at=second_page_seen_at, page_offset=len(first_page)
+    )
+
+    result = store_fixture.latest_in_hub('python', limit=4)
+
+    assert first_page + second_page == result
+
+
+def test_article_store_return_top_articles_by_views(store_fixture):
+    store_fixture.upsert_articles(
+        [
+            build_article(1, views='Просмотры  379'),
+            build_article(2, views='Просмотры  8.2K'),
+            build_article(3, views='Просмотры  15K'),
+        ],
+        seen_at=100
+    )
+
+    result = store_fixture.top_by_views(limit=2)
+
+    assert ['Статья 3', 'Статья 2'] == [article.title for article in result]
+
+
+def test_article_store_compact_delete_old_and_excess_articles(store_fixture):
+    store_fixture.upsert_articles([build_article(1)], hub='python', seen_at=100)
+    store_fixture.upsert_articles([build_article(2), build_article(3)], hub='python', seen_at=500)
+    store_fixture.upsert_articles([build_article(4)], hub='python', seen_at=600)
+
+    deleted_count = store_fixture.compact(max_age=300, max_articles=2, now=700)
+
+    assert 2 == deleted_count
+    assert 2 == store_fixture.count()
+    assert build_article(4) in store_fixture.latest_in_hub('python', limit=10)
+    assert 2 == len(store_fixture.latest_in_hub('python', limit=10))
+
+
+def test_article_store_compact_return_free_pages_to_file_system(tmp_path):
+    path = str(tmp_path / 'articles.sqlite3')
+    store = ArticleStore(path)
+    store.upsert_articles(
+        [build_article(post_id) for post_id in range(5000)], hub='python', seen_at=100
+    )
+    connection = sqlite3.connect(path)
+    page_count_before = connection.execute('PRAGMA page_count').fetchone()[0]
+
+    store.compact(max_age=300, max_articles=10, now=700)
+    store.close()
+    freelist_count = connection.execute('PRAGMA freelist_count').fetchone()[0]
+    page_count = connection.execute('PRAGMA page_count').fetchone()[0]
+    page_size = connection.execute('PRAGMA page_size').fetchone()[0]
+    connection.close()
+
+    assert freelist_count == 0
+    assert page_count < page_count_before / 10
+    assert os.path.getsize(path) == page_count * page_size
+
+
+def test_article_store_rollback_failed_compaction(tmp_path):
+    path = str(tmp_path / 'articles.sqlite3')
+    store = ArticleStore(path)
+    store.upsert_articles([build_article(1)], hub='python', seen_at=100)
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TRIGGER fail_delete BEFORE DELETE ON articles BEGIN SELECT RAISE(ABORT, 'fail'); END"
+    )
+    connection.commit()
+
+    with pytest.raises(sqlite3.Error):
+        store.compact(max_age=300, max_articles=10, now=700)
+    connection.execute('DROP TRIGGER fail_delete')
+    connection.commit()
+    connection.close()
+
+    assert 1 == store.compact(max_age=300, max_articles=10, now=700)
+    assert 0 == store.count()
+    store.close()
+
+
+def test_article_store_keep_data_after_reopen(tmp_path):
+    path = str(tmp_path / 'articles.sqlite3')
+    store = ArticleStore(path)
+    store.upsert_articles([build_article(1)], hub='python')
+    store.close()
+
+    reopened_store = ArticleStore(path)
+
+    assert [build_article(1)] == reopened_store.all_articles()
+    reopened_store.close()
+
+
+def test_article_store_raise_exception_if_not_str_path_provided():
+    with pytest.raises(ValueError):
+        ArticleStore(None)
@@ -0,0 +1,53 @@
+import pytest
+
+from app.parser_backends import Bs4ParserBackend
+from app.stream_parser import HabrArticlesStreamParser, has_class
+
+HABR_ARTICLES_DUMP_FILEPATH = 'app/tests/tests_data/habr_articles_dump.html'
+
+
+@pytest.fixture(scope='module')
+def habr_article_html_fixture() -> str:
+    with open(HABR_ARTICLES_DUMP_FILEPATH, 'r') as fio:
+        content = fio.read()
+    return content
+
+
+@pytest.mark.parametrize('chunk_size', [13, 4096])
+def test_stream_parser_result_does_not_depend_on_chunk_size(
+        chunk_size, habr_article_html_fixture
+):
+    expected_result = Bs4ParserBackend().parse(habr_article_html_fixture)
+    stream_parser = HabrArticlesStreamParser()
+    result = []
+
+    for index in range(0, len(habr_article_html_fixture), chunk_size):
+        stream_parser.feed(habr_article_html_fixture[index:index + chunk_size])
+        result.extend(stream_parser.pop_articles())
+
+    assert expected_result == result
+    assert stream_parser.finished
+
+
+def test_stream_parser_is_not_finished_before_end_of_articles_list(habr_article_html_fixture):
+    article_end_index = habr_article_html_fixture.index('</article>') + len('</article>')
+    stream_parser = HabrArticlesStreamParser()
+
+    stream_parser.feed(habr_article_html_fixture[:article_end_index])
+
+    assert 1 == len(stream_parser.pop_articles())
+    assert not stream_parser.finished
+
+
+@pytest.mark.parametrize(
+    'class_value, css_class, expected_result',
+    [
+        pytest.param('tm-articles-list', 'tm-articles-list', True, id='equal class'),
+        pytest.param('a tm-articles-list b', 'tm-articles-list', True, id='one of classes'),
+        pytest.param('tm-articles-list__item', 'tm-articles-list', False, id='class prefix'),
+        pytest.param('b a', 'a b', False, id='several classes in other order'),
+        pytest.param(None, 'a', False, id='no class'),
+    ]
+)
+def test_has_class_match_classes_like_bs4(class_value, css_class, expected_result):
+    assert expected_result == has_class([('class', class_value)], css_class)
@@ -0,0 +1,116 @@
+import pytest
+
+from app.article import Article
+from app.subscriptions import SubscriptionManager
+
+HUBS = {
+    'python': 'https://habr.com/ru/hub/python/',
+    'testing': 'https://habr.com/ru/hub/it_testing/',
+}
+
+
+def build_articles(*post_ids):
+    return [
+        Article(
+            f'Статья {post_id}', f'https://habr.com/ru/post/{post_id}/', 'Рейтинг  0', 'Просмотры  1'
+        )
+        for post_id in post_ids
+    ]
+
+
+class FakeSender:
+    def __init__(self, failing_chat_ids=()):
+        self.failing_chat_ids = failing_chat_ids
+        self.sent = []
+
+    def __call__(self, chat_id, text):
+        if chat_id in self.failing_chat_ids:
+            raise ConnectionError
+        self.sent.append((chat_id, text))
+
+
+@pytest.fixture(scope='function')
+def sender_fixture():
+    return FakeSender()
+
+
+@pytest.fixture(scope='function')
+def manager_fixture(sender_fixture):
+    return SubscriptionManager(HUBS, sender_fixture, batch_size=2)
+
+
+def test_subscription_manager_can_subscribe_and_unsubscribe_chat(manager_fixture):
+    assert manager_fixture.subscribe(1, 'python')
+    assert not manager_fixture.subscribe(1, 'python')
+    assert {1} == manager_fixture.subscribers('python')
+    assert manager_fixture.unsubscribe(1, 'python')
+    assert not manager_fixture.unsubscribe(1, 'python')
+    assert set() == manager_fixture.subscribers('python')
+
+
+def test_subscription_manager_raise_exception_if_unknown_hub_provided(manager_fixture):
+    with pytest.raises(ValueError):
+        manager_fixture.subscribe(1, 'unknown')
+
+
+def test_subscription_manager_detect_only_new_articles(manager_fixture):
+    first_snapshot_new_articles = manager_fixture.on_articles(HUBS['python'], build_articles(1, 2))
+    new_articles = manager_fixture.on_articles(HUBS['python'], build_articles(3, 1, 2))
+
+    assert [] == first_snapshot_new_articles
+    assert build_articles(3) == new_articles
+
+
+def test_subscription_manager_keep_snapshot_after_empty_page(manager_fixture):
+    manager_fixture.on_articles(HUBS['python'], build_articles(1, 2))
+
+    assert [] == manager_fixture.on_articles(HUBS['python'], [])
+    assert build_articles(3) == manager_fixture.on_articles(HUBS['python'], build_articles(3, 1, 2))
+
+
+def test_subscription_manager_ignore_not_hub_pages(manager_fixture):
+    search_url = 'https://habr.com/ru/search/?q=python'
+    manager_fixture.on_articles(search_url, build_articles(1))
+
+    assert [] == manager_fixture.on_articles(search_url, build_articles(2))
+
+
+def test_subscription_manager_fan_out_articles_to_all_subscribers():
+    manager = SubscriptionManager(HUBS, FakeSender(failing_chat_ids=(2,)), batch_size=2)
+    for chat_id in (1, 2, 3):
+        manager.subscribe(chat_id, 'python')
+    manager.subscribe(4, 'testing')
+
+    sent_count = manager.fan_out('python', build_articles(1))
+
+    assert 2 == sent_count
+    assert [1, 3] == [chat_id for chat_id, _ in manager.send_message.sent]
+    assert '[Статья 1](https://habr.com/ru/post/1/)' in manager.send_message.sent[0][1]
+
+
+def test_subscription_manager_restore_subscriptions_from_storage(tmp_path, sender_fixture):
+    storage_path = str(tmp_path / 'subscriptions.json')
+    SubscriptionManager(HUBS, sender_fixture, batch_size=1, storage_path=storage_path).subscribe(
+        1, 'testing'
+    )
+
+    manager = SubscriptionManager(HUBS, sender_fixture, batch_size=1, storage_path=storage_path)
+
+    assert {1} == manager.subscribers('testing')
+
+
+@pytest.mark.parametrize(
+    'manager_params',
+    [
+        pytest.param({'batch_size': 0}, id='zero batch size'),
+        pytest.param({'batch_interval': -1}, id='negative batch interval'),
+    ]
+)
+def test_subscription_manager_raise_exception_if_invalid_params_provided(
+        manager_params, sender_fixture
+):
+    params = {'batch_size': 1}
+    params.update(manager_params)
+
+    with pytest.raises(ValueError):
+        SubscriptionManager(HUBS, sender_fixture, **params)
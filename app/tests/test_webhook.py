@@ -0,0 +1,100 @@
+import json
+from queue import Queue
+
+import pytest
+import requests
+from telegram import Bot, Update
+
+from app.webhook import WebhookServer
+
+TELEGRAM_UPDATE_FILEPATH = 'app/tests/tests_data/telegram_update.json'
+PATH_SECRET = 'webhook-secret'
+
+
+@pytest.fixture(scope='module')
+def telegram_update_fixture() -> bytes:
+    with open(TELEGRAM_UPDATE_FILEPATH, 'rb') as file:
+        return file.read()
+
+
+@pytest.fixture(name='webhook_server')
+def webhook_server_fixture():
+    bot = Bot('123456:TEST-TOKEN')
+    server = WebhookServer(
+        '127.0.0.1',
+        0,
+        PATH_SECRET,
+        Queue(),
+        lambda data: Update.de_json(data, bot),
+        max_connections=4,
+        max_queue_size=2
+    )
+    server.start()
+    yield server
+    server.stop()
+
+
+def post_update(webhook_server, body, path=f'/{PATH_SECRET}'):
+    host, port = webhook_server.server_address[:2]
+    return requests.post(f'http://{host}:{port}{path}', data=body, timeout=5)
+
+
+def test_webhook_server_queue_posted_update(webhook_server, telegram_update_fixture):
+    response = post_update(webhook_server, telegram_update_fixture)
+
+    assert response.status_code == 200
+    update = webhook_server.update_queue.get_nowait()
+    assert update.update_id == json.loads(telegram_update_fixture)['update_id']
+    assert update.message.text == '/get_python_news'
+
+
+def test_webhook_server_reject_update_if_queue_is_full(webhook_server, telegram_update_fixture):
+    status_codes = [
+        post_update(webhook_server, telegram_update_fixture).status_code for _ in range(3)
+    ]
+
+    assert status_codes == [200, 200, 503]
+    assert webhook_server.stats() == {
+        'received': 2, 'rejected': 1, 'invalid': 0, 'not_found': 0, 'queue_size': 2
+    }
+
+
+@pytest.mark.parametrize(
+    'body, path, expected_status_code',
+    [
+        pytest.param(b'{"update_id": 1}', '/wrong-secret', 404, id='wrong path'),
+        pytest.param(b'not json', f'/{PATH_SECRET}', 400, id='invalid json'),
+        pytest.param(b'', f'/{PATH_SECRET}', 400, id='empty body'),
+    ]
+)
+def test_webhook_server_do_not_queue_invalid_requests(
+        webhook_server, body, path, expected_status_code
+):
+    response = post_update(webhook_server, body, path)
+
+    assert response.status_code == expected_status_code
+    assert webhook_server.update_queue.empty()
+
+
+@pytest.mark.parametrize(
+    'server_params',
+    [
+        pytest.param({'path_secret': ''}, id='empty secret'),
+        pytest.param({'max_connections': 0}, id='zero connections'),
+        pytest.param({'max_queue_size': 0}, id='zero queue size'),
+    ]
+)
+def test_webhook_server_raise_exception_on_invalid_params(server_params):
+    params = {
+        'listen': '127.0.0.1',
+        'port': 0,
+        'path_secret': PATH_SECRET,
+        'update_queue': Queue(),
+        'decode_update': lambda data: data,
+        'max_connections': 1,
+        'max_queue_size': 1,
+    }
+    params.update(server_params)
+
+    with pytest.raises(ValueError):
+        WebhookServer(**params)
@@ -0,0 +1,202 @@
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Full, Queue
+from typing import Any, Callable, Optional
+
+MAX_UPDATE_BYTES = 1024 * 1024
+
+
+class WebhookRequestHandler(BaseHTTPRequestHandler):
+    """Accepts POST with telegram update on secret path and puts it to update queue"""
+
+    server: 'WebhookHTTPServer'
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        """Decode update and queue it without waiting, reject update if queue is full"""
+        webhook = self.server.webhook
+        if self.path != webhook.url_path:
+            webhook.count('not_found')
+            self.send_response_only(404)
+            self.end_headers()
+            return
+        content_length = int(self.headers.get('Content-Length') or 0)
+        if not 0 < content_length <= MAX_UPDATE_BYTES:
+            webhook.count('invalid')
+            self.send_response_only(413 if content_length else 400)
+            self.end_headers()
+            return
+        try:
+            update = webhook.decode_update(json.loads(self.rfile.read(content_length)))
+        except ValueError:
+            webhook.count('invalid')
+            self.send_response_only(400)
+            self.end_headers()
+            return
+        if webhook.put_update(update):
+            self.send_response_only(200)
+        else:
+            # telegram redelivers update later on any not 2xx response
+            self.send_response_only(503)
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        """Log requests on debug level, telegram sends every update as separate request"""
+        logging.debug('Webhook request from %s: %s', self.address_string(), format % args)
+
+
+class WebhookHTTPServer(ThreadingHTTPServer):
+    """HTTP server with bounded number of requests handled at the same time"""
+
+    daemon_threads = True
+
+    def __init__(self, server_address: tuple, webhook: 'WebhookServer', max_connections: int):
+        super().__init__(server_address, WebhookRequestHandler)
+        self.webhook = webhook
+        self._connections = threading.BoundedSemaphore(max_connections)
+
+    def process_request(self, request, client_address) -> None:
+        """Wait for free connection slot, extra connections wait in listen backlog"""
+        self._connections.acquire()
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self._connections.release()
+            raise
+
+    def process_request_thread(self, request, client_address) -> None:
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._connections.release()
+
+
+class WebhookServer:
+    """
+    Built-in HTTP server for telegram webhook. Intake only decodes update and puts it
+    to dispatcher update queue, updates are rejected while queue has max_queue_size updates.
+    """
+
+    def __init__(
+            self,
+            listen: str,
+            port: int,
+            path_secret: str,
+            update_queue: Queue,
+            decode_update: Callable[[dict], Any],
+            max_connections: int,
+            max_queue_size: int
+    ):
+        """
+        Bind server socket, requests are handled after start().
+
+        :raise ValueError if path secret is empty, max_connections or max_queue_size
+        is not positive
+        :param listen: address to listen
+        :param port: port to listen, 0 for any free port
+        :param path_secret: secret url path, only updates posted to it are accepted
+        :param update_queue: dispatcher update queue
+        :param decode_update: function which creates update from decoded JSON
+        :param max_connections: max number of requests handled at the same time
+        :param max_queue_size: max number of updates waiting in update queue
+        """
+        if not path_secret or max_connections < 1 or max_queue_size < 1:
+            logging.critical('Invalid webhook server params provided')
+            raise ValueError
+        self.url_path = f'/{path_secret.strip("/")}'
+        self.update_queue = update_queue
+        self.decode_update = decode_update
+        self.max_connections = max_connections
+        self.max_queue_size = max_queue_size
+        self._lock = threading.Lock()
+        self._counters = {'received': 0, 'rejected': 0, 'invalid': 0, 'not_found': 0}
+        self._http_server = WebhookHTTPServer((listen, port), self, max_connections)
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(
+            cls,
+            webhook_config: dict,
+            path_secret: str,
+            update_queue: Queue,
+            decode_update: Callable[[dict], Any]
+    ):
+        """
+        Create new server from "webhook" section of config.yaml.
+
+        :param webhook_config: dict with listen, port, max_connections and max_queue_size
+        :param path_secret: secret url path
+        :param update_queue: dispatcher update queue
+        :param decode_update: function which creates update from decoded JSON
+        :return: new WebhookServer() instance
+        """
+        return cls(
+            webhook_config['listen'],
+            webhook_config['port'],
+            path_secret,
+            update_queue,
+            decode_update,
+            max_connections=webhook_config['max_connections'],
+            max_queue_size=webhook_config['max_queue_size']
+        )
+
+    @property
+    def server_address(self) -> tuple:
+        """Address and port server is listening on"""
+        return self._http_server.server_address
+
+    def start(self) -> None:
+        """Handle requests in daemon thread"""
+        self._thread = threading.Thread(
+            target=self._http_server.serve_forever, name='webhook-server', daemon=True
+        )
+        self._thread.start()
+        logging.info('Webhook server is listening on %s:%s', *self.server_address[:2])
+
+    def stop(self) -> None:
+        """Stop handling requests and close server socket"""
+        self._http_server.shutdown()
+        self._http_server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def put_update(self, update: Any) -> bool:
+        """
+        Put update to update queue without waiting.
+
+        :param update: decoded update
+        :return: True if update is queued, False if queue is full
+        """
+        if self.update_queue.qsize() >= self.max_queue_size:
+            self.count('rejected')
+            return False
+        try:
+            self.update_queue.put_nowait(update)
+        except Full:
+            self.count('rejected')
+            return False
+        self.count('received')
+        return True
+
+    def count(self, counter: str) -> None:
+        """
+        Increase counter by one.
+
+        :param counter: counter name
+        """
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> dict:
+        """
+        Server counters.
+
+        :return: dict with received, rejected, invalid and not found updates
+        and current update queue size
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        stats['queue_size'] = self.update_queue.qsize()
+        return stats
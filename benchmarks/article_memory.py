@@ -0,0 +1,83 @@
+"""
+Memory per 10k articles: dict based article class (before), the same class with numeric
+fields and immutable __slots__ Article.
+Run from repository root: python -m benchmarks.article_memory
+"""
+import tracemalloc
+from typing import Callable, List
+
+from app.article import Article, parse_views, parse_votes
+
+ARTICLES_COUNT = 10_000
+
+
+class DictArticle:
+    """Article class before __slots__: raw strings only, stored in instance __dict__"""
+
+    def __init__(self, title: str, link: str, votes: str, views: str):
+        self.title = title
+        self.link = link
+        self.votes = votes
+        self.views = views
+
+
+class NumericDictArticle(DictArticle):
+    """Dict based article class with the same numeric fields as Article"""
+
+    def __init__(self, title: str, link: str, votes: str, views: str):
+        super().__init__(title, link, votes, views)
+        self.score, self.upvotes, self.downvotes = parse_votes(votes)
+        self.views_count = parse_views(views)
+
+
+def build_articles_fields(articles_count: int) -> List[list]:
+    """
+    Unique article fields like on habr page.
+
+    :param articles_count: number of articles
+    :return: list with title, link, votes and views lists
+    """
+    return [
+        [
+            f'Article title number {index}',
+            f'https://habr.com/ru/post/{index}/',
+            f'Всего голосов {index % 50}: ↑{index % 40} и ↓{index % 10}  +{index % 30}',
+            f'Просмотры  {index % 100}.{index % 10}K',
+        ]
+        for index in range(articles_count)
+    ]
+
+
+def measure_memory(article_class: Callable, articles_fields: List[list]) -> int:
+    """
+    Memory allocated for article instances, field strings are allocated beforehand.
+
+    :param article_class: class to create articles with
+    :param articles_fields: list with article fields
+    :return: allocated bytes
+    """
+    tracemalloc.start()
+    articles = [article_class(*fields) for fields in articles_fields]
+    allocated_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del articles
+    return allocated_bytes
+
+
+def main() -> None:
+    articles_fields = build_articles_fields(ARTICLES_COUNT)
+    article_classes = (
+        ('dict article (before)', DictArticle),
+        ('numeric dict article', NumericDictArticle),
+        ('slots Article', Article),
+    )
+    for name, article_class in article_classes:
+        allocated_bytes = measure_memory(article_class, articles_fields)
+        print(
+            f'{name:>22}: {allocated_bytes / 1024:9.1f} KiB per {ARTICLES_COUNT} articles, '
+            f'{allocated_bytes / ARTICLES_COUNT:6.1f} bytes per article'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+"""
+Local stand-ins of habr website and telegram Bot API for end-to-end load tests.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+MAX_GET_UPDATES_WAIT = 1.0
+
+
+class FakeServer:
+    """HTTP server in daemon thread, subclasses handle requests in handle()"""
+
+    def __init__(self):
+        fake_server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # pylint: disable=invalid-name
+                fake_server.handle(self)
+
+            def do_POST(self) -> None:  # pylint: disable=invalid-name
+                fake_server.handle(self)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                pass
+
+        self._http_server = ThreadingHTTPServer(('127.0.0.1', 0), RequestHandler)
+        self._http_server.daemon_threads = True
+        self._thread = threading.Thread(target=self._http_server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Server base url without trailing slash"""
+        host, port = self._http_server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        raise NotImplementedError
+
+    @staticmethod
+    def respond(request: BaseHTTPRequestHandler, status: int, body: bytes, content_type: str):
+        """
+        Send response with body.
+
+        :param request: request handler
+        :param status: HTTP status code
+        :param body: response body
+        :param content_type: Content-Type header
+        """
+        request.send_response(status)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._http_server.shutdown()
+        self._http_server.server_close()
+
+
+class FakeHabrServer(FakeServer):
+    """
+    Serves recorded pages: search pages on /ru/search/, every other path is hub page.
+    Responses are delayed by latency seconds, error_rate share of them is "503 Service Unavailable".
+    """
+
+    def __init__(
+            self,
+            hub_html: str,
+            search_html: Optional[str] = None,
+            latency: float = 0,
+            error_rate: float = 0,
+            seed: int = 0
+    ):
+        """
+        :param hub_html: recorded hub page
+        :param search_html: recorded search page, hub page if not provided
+        :param latency: seconds before response
+        :param error_rate: share of failed responses from 0 to 1
+        :param seed: random seed of failed responses
+        """
+        super().__init__()
+        self.hub_body = hub_html.encode('utf-8')
+        self.search_body = (search_html or hub_html).encode('utf-8')
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        path = urlsplit(request.path).path
+        kind = 'search' if path.startswith('/ru/search/') else 'hub'
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+            self.requests[f'{kind}_error' if failed else kind] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            self.respond(request, 503, b'Service Unavailable', 'text/plain')
+            return
+        body = self.search_body if kind == 'search' else self.hub_body
+        self.respond(request, 200, body, 'text/html; charset=utf-8')
+
+
+class FakeTelegramServer(FakeServer):
+    """
+    Fake telegram Bot API: getUpdates returns synthetic command messages of virtual users,
+    sendMessage is recorded. Every virtual user sends next command after reply to previous one,
+    reply latency is time from command creation to the first sendMessage to user chat.
+    """
+
+    def __init__(self, users_count: int, commands: List[str], first_chat_id: int = 10_000):
+        """
+        :param users_count: number of virtual users
+        :param commands: commands with arguments, users send them in round robin order
+        :param first_chat_id: chat id of the first user
+        """
+        super().__init__()
+        self.chat_ids = [first_chat_id + index for index in range(users_count)]
+        self.commands = commands
+        self.reply_latencies: List[float] = []
+        self.sent_messages = 0
+        self.commands_sent = 0
+        self.polled = threading.Event()
+        self._running = False
+        self._updates: List[dict] = []
+        self._next_update_id = 1
+        self._waiting_since: Dict[int, float] = {}
+        self._condition = threading.Condition()
+        self._methods: Dict[str, Callable[[dict], object]] = {
+            'getMe': lambda _: {
+                'id': 1, 'is_bot': True, 'first_name': 'habr news', 'username': 'habr_news_bot'
+            },
+            'getUpdates': self._get_updates,
+            'sendMessage': self._send_message,
+        }
+
+    def start_users(self) -> None:
+        """Every virtual user sends the first command"""
+        with self._condition:
+            self._running = True
+            for chat_id in self.chat_ids:
+                self._send_command(chat_id)
+
+    def stop_users(self) -> None:
+        """Virtual users do not send new commands"""
+        with self._condition:
+            self._running = False
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        method = request.path.rstrip('/').rsplit('/', 1)[-1]
+        content_length = int(request.headers.get('Content-Length') or 0)
+        body = request.rfile.read(content_length) if content_length else b''
+        params = json.loads(body) if body else {}
+        result = self._methods.get(method, lambda _: True)(params)
+        response = json.dumps({'ok': True, 'result': result}).encode('utf-8')
+        self.respond(request, 200, response, 'application/json')
+
+    def _send_command(self, chat_id: int) -> None:
+        """
+        Create update with next command of user. Caller holds lock.
+
+        :param chat_id: user chat id
+        """
+        text = self.commands[self.commands_sent % len(self.commands)]
+        command_length = len(text.split(' ', 1)[0])
+        user = {'id': chat_id, 'is_bot': False, 'first_name': f'user {chat_id}'}
+        self._updates.append({
+            'update_id': self._next_update_id,
+            'message': {
+                'message_id': self._next_update_id,
+                'from': user,
+                'chat': {'id': chat_id, 'type': 'private', 'first_name': user['first_name']},
+                'date': int(time.time()),
+                'text': text,
+                'entities': [{'offset': 0, 'length': command_length, 'type': 'bot_command'}],
+            },
+        })
+        self._next_update_id += 1
+        self.commands_sent += 1
+        self._waiting_since[chat_id] = time.monotonic()
+        self._condition.notify_all()
+
+    def _get_updates(self, params: dict) -> List[dict]:
+        self.polled.set()
+        # telegram.Bot sends some params as strings
+        offset = int(params.get('offset') or 0)
+        timeout = min(float(params.get('timeout') or 0), MAX_GET_UPDATES_WAIT)
+        wait_until = time.monotonic() + timeout
+        with self._condition:
+            self._updates = [update for update in self._updates if update['update_id'] >= offset]
+            while not self._updates and time.monotonic() < wait_until:
+                self._condition.wait(wait_until - time.monotonic())
+            return list(self._updates)
+
+    def _send_message(self, params: dict) -> dict:
+        chat_id = int(params['chat_id'])
+        with self._condition:
+            self.sent_messages += 1
+            waiting_since = self._waiting_since.pop(chat_id, None)
+            if waiting_since is not None:
+                self.reply_latencies.append(time.monotonic() - waiting_since)
+                if self._running:
+                    self._send_command(chat_id)
+            message_id = self.sent_messages
+        return {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'text': params.get('text', ''),
+        }
@@ -0,0 +1,120 @@
+"""
+End-to-end load test: real bot process polls fake telegram Bot API, requests fake habr website
+and answers commands of N virtual users. Reports commands per second, p50/p99 reply latency
+and number of requests to habr.
+Run from repository root: python -m benchmarks.load_test --users 50 --duration 30
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import yaml
+
+from benchmarks.fake_servers import FakeHabrServer, FakeTelegramServer
+from benchmarks.suite import percentile
+
+REPOSITORY_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_FILEPATH = os.path.join(REPOSITORY_DIRECTORY, 'config.yaml')
+HUB_DUMP_FILEPATH = os.path.join(
+    REPOSITORY_DIRECTORY, 'app/tests/tests_data/habr_articles_dump.html'
+)
+BOT_TOKEN = '123456:LOAD-TEST-TOKEN'
+DEFAULT_COMMANDS = (
+    '/get_python_news',
+    '/get_testing_news',
+    '/news python,testing pages=2',
+    '/search_articles python',
+)
+
+
+def write_bot_config(directory: str, habr_url: str, telegram_url: str) -> None:
+    """
+    Write config.yaml with habr and telegram urls of fake servers to bot working directory.
+
+    :param directory: bot working directory
+    :param habr_url: fake habr server url
+    :param telegram_url: fake telegram server url
+    """
+    with open(CONFIG_FILEPATH, encoding='utf-8') as file:
+        bot_config = yaml.safe_load(file)
+    bot_config['habr_base_url'] = habr_url
+    bot_config['habr_articles_search_url'] = f'{habr_url}/ru/search/?q='
+    bot_config['telegram_api_url'] = f'{telegram_url}/bot'
+    bot_config['updates_mode'] = 'polling'
+    for hub, hub_config in bot_config['hubs'].items():
+        hub_config['url'] = f'{habr_url}/ru/hub/{hub}/'
+    with open(os.path.join(directory, 'config.yaml'), 'w', encoding='utf-8') as file:
+        yaml.safe_dump(bot_config, file, allow_unicode=True)
+
+
+def main() -> int:
+    argument_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argument_parser.add_argument('--users', type=int, default=20)
+    argument_parser.add_argument('--duration', type=float, default=20)
+    argument_parser.add_argument('--habr-latency', type=float, default=0.05)
+    argument_parser.add_argument('--habr-error-rate', type=float, default=0)
+    argument_parser.add_argument(
+        '--commands', default=';'.join(DEFAULT_COMMANDS),
+        help='semicolon separated commands sent by users in round robin order'
+    )
+    arguments = argument_parser.parse_args()
+    with open(HUB_DUMP_FILEPATH, encoding='utf-8') as file:
+        hub_html = file.read()
+
+    fake_habr = FakeHabrServer(
+        hub_html, latency=arguments.habr_latency, error_rate=arguments.habr_error_rate
+    )
+    fake_telegram = FakeTelegramServer(arguments.users, arguments.commands.split(';'))
+    with fake_habr, fake_telegram, tempfile.TemporaryDirectory() as bot_directory:
+        write_bot_config(bot_directory, fake_habr.url, fake_telegram.url)
+        log_filepath = os.path.join(bot_directory, 'bot.log')
+        with open(log_filepath, 'w', encoding='utf-8') as log_file:
+            bot_process = subprocess.Popen(
+                [sys.executable, os.path.join(REPOSITORY_DIRECTORY, 'main.py')],
+                cwd=bot_directory,
+                env=dict(os.environ, BOT_TOKEN=BOT_TOKEN),
+                stdout=log_file,
+                stderr=subprocess.STDOUT
+            )
+            try:
+                if not fake_telegram.polled.wait(timeout=30):
+                    with open(log_filepath, encoding='utf-8') as bot_log:
+                        print(bot_log.read()[-4000:])
+                    print('Bot did not start polling in 30 seconds')
+                    return 1
+                upstream_requests_before = sum(fake_habr.requests.values())
+                fake_telegram.start_users()
+                started_at = time.monotonic()
+                time.sleep(arguments.duration)
+                fake_telegram.stop_users()
+                elapsed = time.monotonic() - started_at
+            finally:
+                bot_process.send_signal(signal.SIGINT)
+                try:
+                    bot_process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    bot_process.kill()
+
+    latencies = sorted(fake_telegram.reply_latencies)
+    print(f'users: {arguments.users}, duration: {elapsed:.1f}s')
+    print(f'commands sent: {fake_telegram.commands_sent}, replied: {len(latencies)}')
+    print(f'commands/s: {len(latencies) / elapsed:.1f}')
+    if latencies:
+        print(
+            f'reply latency p50: {percentile(latencies, 0.5) * 1000:.1f}ms, '
+            f'p99: {percentile(latencies, 0.99) * 1000:.1f}ms'
+        )
+    print(f'telegram messages sent: {fake_telegram.sent_messages}')
+    print(
+        f'habr requests: {sum(fake_habr.requests.values()) - upstream_requests_before} '
+        f'during load, by kind: {dict(fake_habr.requests)}'
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Parse throughput of test dump while pages are parsed from several threads at the same time:
+in calling threads (serialized by GIL) and in parse executor with growing number of workers.
+Run from repository root: python -m benchmarks.parse_scaling [backend name] 2>/dev/null
+Throughput grows with number of worker processes up to number of CPUs.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from app.parse_executor import ParseExecutor
+from app.parser_backends import get_parser_backend
+
+HABR_ARTICLES_DUMP_FILEPATH = 'app/tests/tests_data/habr_articles_dump.html'
+PAGES_PER_WORKER = 20
+
+
+def measure_throughput(parse: Callable[[str], list], html_data: str, concurrency: int) -> float:
+    """
+    Parse pages from concurrency threads.
+
+    :param parse: function which parses HTML page
+    :param html_data: habr HTML page
+    :param concurrency: number of threads parsing pages at the same time
+    :return: parsed pages per second
+    """
+    pages_count = PAGES_PER_WORKER * concurrency
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        started_at = time.perf_counter()
+        list(executor.map(parse, [html_data] * pages_count))
+        elapsed = time.perf_counter() - started_at
+    return pages_count / elapsed
+
+
+def main() -> None:
+    backend_name = sys.argv[1] if len(sys.argv) > 1 else 'bs4'
+    with open(HABR_ARTICLES_DUMP_FILEPATH, encoding='utf-8') as file:
+        html_data = file.read()
+    max_workers = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, max_workers})
+    print(f'backend {backend_name}, {max_workers} CPUs')
+
+    in_thread_backend = get_parser_backend(backend_name)
+    for workers in worker_counts:
+        pages_per_second = measure_throughput(in_thread_backend.parse, html_data, workers)
+        print(f'{"in thread":>10}, {workers} threads: {pages_per_second:7.1f} pages/s')
+
+    for workers in worker_counts:
+        parse_executor = ParseExecutor(backend_name, max_workers=workers)
+        parse_executor.start()
+        try:
+            pages_per_second = measure_throughput(parse_executor.parse, html_data, workers)
+        finally:
+            parse_executor.shutdown()
+        print(f'{"processes":>10}, {workers} workers: {pages_per_second:7.1f} pages/s')
+
+
+if __name__ == '__main__':
+    main()
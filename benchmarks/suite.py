@@ -0,0 +1,275 @@
+"""
+Parser, rendering and fetch benchmarks over corpus of habr page dumps with regression gate.
+Corpus is test dumps plus every *.html file in benchmarks/corpus/ (hub, search and megapost
+pages saved from habr). Every case reports throughput, p50/p99 latency and peak memory.
+Run from repository root:
+    python -m benchmarks.suite --save-baseline   # save results as baseline
+    python -m benchmarks.suite                   # fail if results regressed against baseline
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+from app import articles_parser
+from app.article import Article, prepare_message_for_telegram, render_messages
+from app.article_details import parse_article_details
+from app.articles_parser import (
+    get_habr_articles_html, iter_habr_articles, parse_habr_articles_content
+)
+from app.parser_backends import PARSER_BACKENDS, get_parser_backend
+
+CORPUS_FILEPATHS = (
+    'app/tests/tests_data/habr_articles_dump.html',
+    'app/tests/tests_data/habr_empty_articles_dump.html',
+)
+ARTICLE_PAGE_FILEPATHS = ('app/tests/tests_data/habr_article_page_dump.html',)
+CORPUS_DIRECTORY = 'benchmarks/corpus'
+BASELINE_FILEPATH = 'benchmarks/baseline.json'
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_P99_THRESHOLD = 0.5
+MIN_CASE_SECONDS = 0.5
+MAX_ITERATIONS = 10_000
+Case = Tuple[str, Callable[[], object]]
+
+
+def load_corpus() -> Dict[str, str]:
+    """
+    Read corpus pages.
+
+    :return: dict with page name and HTML page
+    """
+    filepaths = list(CORPUS_FILEPATHS) + sorted(glob.glob(f'{CORPUS_DIRECTORY}/*.html'))
+    corpus = {}
+    for filepath in filepaths:
+        with open(filepath, encoding='utf-8') as file:
+            corpus[os.path.splitext(os.path.basename(filepath))[0]] = file.read()
+    return corpus
+
+
+class StubHabrServer:
+    """Local HTTP server serving corpus pages by /<page name>/ path"""
+
+    def __init__(self, corpus: Dict[str, str]):
+        pages = {f'/{name}/': html_data.encode('utf-8') for name, html_data in corpus.items()}
+
+        class PageHandler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # pylint: disable=invalid-name
+                body = pages.get(self.path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                pass
+
+        self._http_server = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+        self._http_server.daemon_threads = True
+        self._thread = threading.Thread(target=self._http_server.serve_forever, daemon=True)
+
+    def url(self, page_name: str) -> str:
+        """
+        Url of corpus page.
+
+        :param page_name: corpus page name
+        :return: page url
+        """
+        host, port = self._http_server.server_address[:2]
+        return f'http://{host}:{port}/{page_name}/'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_):
+        self._http_server.shutdown()
+        self._http_server.server_close()
+
+
+def build_cases(corpus: Dict[str, str], stub_server: StubHabrServer) -> List[Case]:
+    """
+    Benchmark cases for every corpus page and article page parsing for enrichment.
+
+    :param corpus: dict with page name and HTML page
+    :param stub_server: started stub habr server
+    :return: list with case name and function tuples
+    """
+    cases: List[Case] = []
+    for page_name, html_data in corpus.items():
+        for backend_name in PARSER_BACKENDS:
+            backend = get_parser_backend(backend_name)
+            cases.append(
+                (f'parse[{backend_name}]/{page_name}', lambda b=backend, h=html_data: b.parse(h))
+            )
+        cases.append((
+            f'parse_habr_articles_content/{page_name}',
+            lambda h=html_data: parse_habr_articles_content(h)
+        ))
+        page_url = stub_server.url(page_name)
+        cases.append((
+            f'fetch_and_parse/{page_name}',
+            lambda u=page_url: parse_habr_articles_content(get_habr_articles_html(u))
+        ))
+        cases.append((f'fetch_stream/{page_name}', lambda u=page_url: list(iter_habr_articles(u))))
+
+        articles_fields = [
+            [title, f'https://habr.com{link}', votes, views]
+            for title, link, votes, views in get_parser_backend('bs4').parse(html_data)
+        ]
+        if not articles_fields:
+            continue
+        articles = [Article.build_from_list(fields) for fields in articles_fields]
+        cases.append((
+            f'Article.build_from_list/{page_name}',
+            lambda f=articles_fields: [Article.build_from_list(fields) for fields in f]
+        ))
+        cases.append((
+            f'prepare_message_for_telegram/{page_name}',
+            lambda a=articles: prepare_message_for_telegram(a)
+        ))
+        cases.append((
+            f'render_messages_uncached/{page_name}',
+            lambda a=tuple(articles): render_messages.__wrapped__(a)
+        ))
+    for filepath in ARTICLE_PAGE_FILEPATHS:
+        with open(filepath, encoding='utf-8') as file:
+            article_html = file.read()
+        page_name = os.path.splitext(os.path.basename(filepath))[0]
+        cases.append((
+            f'parse_article_details/{page_name}',
+            lambda h=article_html: parse_article_details(h)
+        ))
+    return cases
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    """
+    Nearest rank percentile.
+
+    :param sorted_values: sorted values
+    :param share: percentile from 0 to 1
+    :return: percentile value
+    """
+    index = min(len(sorted_values) - 1, max(0, int(round(share * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_case(function: Callable[[], object]) -> Dict[str, float]:
+    """
+    Run function repeatedly for at least MIN_CASE_SECONDS, then once more under tracemalloc.
+
+    :param function: benchmark case
+    :return: dict with throughput per second, p50 and p99 latency in seconds and peak memory bytes
+    """
+    function()
+    latencies = []
+    started_at = time.perf_counter()
+    while time.perf_counter() - started_at < MIN_CASE_SECONDS and len(latencies) < MAX_ITERATIONS:
+        iteration_started_at = time.perf_counter()
+        function()
+        latencies.append(time.perf_counter() - iteration_started_at)
+    latencies.sort()
+    tracemalloc.start()
+    function()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'throughput': len(latencies) / sum(latencies),
+        'p50': percentile(latencies, 0.5),
+        'p99': percentile(latencies, 0.99),
+        'peak_memory': peak_memory,
+    }
+
+
+def find_regressions(
+        results: Dict[str, dict],
+        baseline: Dict[str, dict],
+        threshold: float,
+        p99_threshold: float
+) -> List[str]:
+    """
+    Compare results with baseline, cases missing in baseline are skipped.
+
+    :param results: dict with case name and its results
+    :param baseline: dict with case name and its baseline results
+    :param threshold: allowed relative throughput and peak memory regression, e.g. 0.2 for 20%
+    :param p99_threshold: allowed relative p99 latency regression, tail latency is noisier
+    :return: list with regression descriptions
+    """
+    regressions = []
+    for case_name, case_results in results.items():
+        case_baseline = baseline.get(case_name)
+        if case_baseline is None:
+            continue
+        if case_results['throughput'] < case_baseline['throughput'] * (1 - threshold):
+            regressions.append(
+                f"{case_name}: throughput {case_results['throughput']:.1f}/s, "
+                f"baseline {case_baseline['throughput']:.1f}/s"
+            )
+        for metric, metric_threshold in (('p99', p99_threshold), ('peak_memory', threshold)):
+            if case_results[metric] > case_baseline[metric] * (1 + metric_threshold):
+                regressions.append(
+                    f'{case_name}: {metric} {case_results[metric]:.6g}, '
+                    f'baseline {case_baseline[metric]:.6g}'
+                )
+    return regressions
+
+
+def main() -> int:
+    argument_parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    argument_parser.add_argument('--baseline', default=BASELINE_FILEPATH)
+    argument_parser.add_argument('--save-baseline', action='store_true')
+    argument_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    argument_parser.add_argument('--p99-threshold', type=float, default=DEFAULT_P99_THRESHOLD)
+    argument_parser.add_argument('--filter', default='', help='run cases containing this text')
+    arguments = argument_parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    articles_parser.response_cache = None
+
+    corpus = load_corpus()
+    results = {}
+    with StubHabrServer(corpus) as stub_server:
+        for case_name, function in build_cases(corpus, stub_server):
+            if arguments.filter not in case_name:
+                continue
+            results[case_name] = run_case(function)
+            case_results = results[case_name]
+            print(
+                f"{case_name:<55} {case_results['throughput']:10.1f}/s "
+                f"p50 {case_results['p50'] * 1000:8.3f}ms p99 {case_results['p99'] * 1000:8.3f}ms "
+                f"peak {case_results['peak_memory'] / 1024:9.1f}KiB"
+            )
+
+    if arguments.save_baseline:
+        with open(arguments.baseline, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f'Baseline saved to {arguments.baseline}')
+        return 0
+    if not os.path.exists(arguments.baseline):
+        print(f'No baseline {arguments.baseline}, save it with --save-baseline')
+        return 0
+    with open(arguments.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    regressions = find_regressions(
+        results, baseline, arguments.threshold, arguments.p99_threshold
+    )
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    print(f'{len(regressions)} regressions over {arguments.threshold:.0%} threshold')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,5 +10,5 @@ if __name__ == '__main__':
         level=logging.INFO
     )
     logging.getLogger(__name__)
-    habr_news_bot = Bot(os.environ['BOT_TOKEN'])
+    habr_news_bot = Bot(os.environ['BOT_TOKEN'], os.environ.get('WEBHOOK_SECRET'))
     habr_news_bot.start_bot()